@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class CustomerSummary:
+    """DTO for a customer's lifetime totals"""
+    
+    customer_id: str
+    lifetime_spend: str
+    points_earned: int
+    transaction_count: int
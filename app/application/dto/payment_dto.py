@@ -1,8 +1,11 @@
+import base64
+import binascii
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List
 
+from app.domain.value_objects.granularity import Granularity
 from app.domain.value_objects.payment_method import PaymentMethod
 
 
@@ -36,10 +39,32 @@ class PaymentResponse:
     points: int
 
 
+def encode_cursor(hour: str) -> str:
+    """Encode an hour bucket as an opaque pagination cursor"""
+    return base64.urlsafe_b64encode(f"hour:{hour}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> datetime:
+    """Decode a pagination cursor back into its hour bucket"""
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    
+    prefix, _, hour = value.partition(":")
+    if prefix != "hour":
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return datetime.fromisoformat(hour.replace("Z", "+00:00"))
+
+
 @dataclass
 class SalesRequest:
     start_datetime: str
     end_datetime: str
+    first: Optional[int] = None
+    after: Optional[str] = None
+    granularity: Granularity = Granularity.HOUR
+    timezone: Optional[str] = None
     
     def get_start_datetime(self) -> datetime:
         """Parse start datetime string to datetime object"""
@@ -64,4 +89,6 @@ class HourlySales:
 @dataclass
 class SalesResponse:
     sales: List[HourlySales]
+    has_next_page: bool = False
+    end_cursor: Optional[str] = None
 
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from app.domain.repositories.customer_repository import CustomerRepository
+from app.application.dto.customer_dto import CustomerSummary
+
+
+class GetCustomerSummaryUseCase:
+    """Use case for looking up a customer's lifetime totals"""
+    
+    def __init__(self, customer_repository: CustomerRepository):
+        self._customer_repository = customer_repository
+    
+    async def execute(self, customer_id: str) -> Optional[CustomerSummary]:
+        """
+        Get a customer's lifetime spend, points earned and transaction count
+        
+        Args:
+            customer_id: Customer identifier used in payments
+            
+        Returns:
+            The customer's totals, or None if they have no transactions
+        """
+        summary = await self._customer_repository.get_summary(customer_id)
+        if summary is None:
+            return None
+        
+        return CustomerSummary(
+            customer_id=customer_id,
+            lifetime_spend=str(summary["lifetime_spend"]),
+            points_earned=int(summary["points_earned"]),
+            transaction_count=int(summary["transaction_count"]),
+        )
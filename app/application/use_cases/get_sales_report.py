@@ -1,40 +1,202 @@
-from typing import List
+from datetime import datetime, tzinfo
+from typing import AsyncIterator, List, Optional, Tuple
 
 from app.domain.repositories.transaction_repository import TransactionRepository
-from app.application.dto.payment_dto import SalesRequest, SalesResponse, HourlySales
+from app.domain.services.local_buckets import local_bucket_starts, parse_timezone, rebucket
+from app.domain.value_objects.granularity import Granularity, floor_bucket, next_bucket
+from app.domain.value_objects.time_bucket import HOUR, RESOLUTION, as_utc, floor_hour
+from app.application.dto.payment_dto import (
+    SalesRequest,
+    SalesResponse,
+    HourlySales,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def _to_hourly_sales(hour_data: dict, local: bool = False) -> HourlySales:
+    # UTC buckets keep the ``Z`` suffix, local ones carry their offset
+    bucket = hour_data["datetime"]
+    return HourlySales(
+        datetime=bucket.isoformat(timespec="seconds") if local else bucket.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        sales=str(hour_data["sales"]),
+        points=int(hour_data["points"]),
+    )
+
+
+def _localize(value: datetime, tz: tzinfo) -> datetime:
+    """Read a naive datetime as wall time in ``tz`` and return it in UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz)
+    return as_utc(value)
+
+
+def _hour_runs(hours: List[datetime]) -> List[Tuple[datetime, datetime]]:
+    """Group sorted hour buckets into runs of consecutive hours"""
+    runs: List[Tuple[datetime, datetime]] = []
+    for hour in hours:
+        if runs and runs[-1][1] + HOUR == hour:
+            runs[-1] = (runs[-1][0], hour)
+        else:
+            runs.append((hour, hour))
+    return runs
 
 
 class GetSalesReportUseCase:
-    """Use case for getting hourly sales report"""
+    """Use case for getting the sales report, hourly or at another granularity"""
     
     def __init__(self, transaction_repository: TransactionRepository):
         self._transaction_repository = transaction_repository
     
     async def execute(self, request: SalesRequest) -> SalesResponse:
         """
-        Get hourly sales report for a date range
+        Get the sales report for a date range
+        
+        Sales are bucketed by ``request.granularity``, hourly by default, in
+        UTC or in the wall clock of ``request.timezone``. When
+        ``request.first`` is set, at most that many buckets are returned,
+        starting after the bucket encoded in ``request.after``.
         
         Args:
-            request: Sales request DTO with date range
+            request: Sales request DTO with date range and optional page
             
         Returns:
-            Sales response with hourly breakdown
+            Sales response with per-bucket breakdown and page info
         """
         start_datetime = request.get_start_datetime()
         end_datetime = request.get_end_datetime()
+        granularity = request.granularity
+        after = None if request.after is None else decode_cursor(request.after)
+        
+        if request.first is not None and request.first < 0:
+            raise ValueError("first must not be negative")
         
-        hourly_sales = await self._transaction_repository.get_hourly_sales(
+        # Fetch one extra bucket to learn whether another page follows
+        limit = None if request.first is None else request.first + 1
+        
+        if request.timezone is not None:
+            buckets = await self._local_sales(
+                start_datetime,
+                end_datetime,
+                granularity,
+                parse_timezone(request.timezone),
+                after,
+                limit,
+            )
+        else:
+            if after is not None:
+                after = floor_bucket(after, granularity)
+                start_datetime = max(start_datetime, next_bucket(after, granularity))
+            buckets = await self._utc_sales(start_datetime, end_datetime, granularity, limit)
+        
+        has_next_page = limit is not None and len(buckets) > request.first
+        if has_next_page:
+            buckets = buckets[:request.first]
+        
+        sales_list: List[HourlySales] = [
+            _to_hourly_sales(hour_data, local=request.timezone is not None)
+            for hour_data in buckets
+        ]
+        
+        return SalesResponse(
+            sales=sales_list,
+            has_next_page=has_next_page,
+            end_cursor=encode_cursor(sales_list[-1].datetime) if sales_list else None,
+        )
+    
+    async def _utc_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        granularity: Granularity,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        if granularity == Granularity.HOUR:
+            return await self._transaction_repository.get_hourly_sales(
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+                limit=limit,
+            )
+        return await self._transaction_repository.get_sales(
             start_datetime=start_datetime,
             end_datetime=end_datetime,
+            granularity=granularity,
+            limit=limit,
         )
+    
+    async def _local_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        granularity: Granularity,
+        tz: tzinfo,
+        after: Optional[datetime],
+        limit: Optional[int],
+    ) -> List[dict]:
+        """
+        Bucket sales by the wall clock of a timezone
+        
+        UTC aggregates are summed into local buckets in memory, so the cost
+        grows with the number of buckets rather than transactions. Naive
+        range ends are local times.
+        """
+        start = _localize(start_datetime, tz)
+        end = _localize(end_datetime, tz)
+        if after is not None:
+            # The bucket holding ``after`` is only partly read and dropped below
+            after = as_utc(after)
+            start = max(start, after)
+        
+        starts = local_bucket_starts(start, end, tz, granularity)
+        rows = await self._local_source_rows(start, end, granularity, starts)
+        buckets = rebucket(rows, tz, granularity)
         
-        sales_list: List[HourlySales] = []
-        for hour_data in hourly_sales:
-            sales_list.append(HourlySales(
-                datetime=hour_data["datetime"].strftime("%Y-%m-%dT%H:%M:%SZ"),
-                sales=str(hour_data["sales"]),
-                points=int(hour_data["points"]),
+        if after is not None:
+            buckets = [bucket for bucket in buckets if bucket["datetime"] > after]
+        return buckets if limit is None else buckets[:limit]
+    
+    async def _local_source_rows(
+        self,
+        start: datetime,
+        end: datetime,
+        granularity: Granularity,
+        starts: List[datetime],
+    ) -> List[dict]:
+        """
+        Read UTC aggregates none of which straddles a local bucket boundary
+        
+        Local buckets that coincide with UTC ones (a zero offset) are read as
+        they are. Otherwise hours are read, and hours a boundary falls inside
+        (half-hour and 45-minute offsets) are replaced by their minutes.
+        """
+        if all(floor_bucket(bucket, granularity) == bucket for bucket in starts):
+            return await self._utc_sales(start, end, granularity)
+        
+        if granularity in (Granularity.MINUTE, Granularity.FIVE_MINUTES):
+            return await self._utc_sales(start, end, Granularity.MINUTE)
+        
+        hours = await self._utc_sales(start, end, Granularity.HOUR)
+        straddled = sorted({floor_hour(bucket) for bucket in starts if floor_hour(bucket) != bucket})
+        if not straddled:
+            return hours
+        
+        skipped = set(straddled)
+        rows = [hour for hour in hours if hour["datetime"] not in skipped]
+        for first, last in _hour_runs(straddled):
+            rows.extend(await self._utc_sales(
+                max(first, start), min(last + HOUR - RESOLUTION, end), Granularity.MINUTE
             ))
+        return rows
+    
+    async def stream(self, request: SalesRequest) -> AsyncIterator[HourlySales]:
+        """
+        Stream the hourly sales report for a date range
         
-        return SalesResponse(sales=sales_list)
-
+        Hours are yielded as they are read from the repository, so memory
+        use does not depend on the size of the range.
+        """
+        async for hour_data in self._transaction_repository.stream_hourly_sales(
+            start_datetime=request.get_start_datetime(),
+            end_datetime=request.get_end_datetime(),
+        ):
+            yield _to_hourly_sales(hour_data)
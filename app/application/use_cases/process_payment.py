@@ -1,10 +1,14 @@
-from decimal import InvalidOperation
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import List
 
 from app.domain.entities.transaction import Transaction
 from app.domain.repositories.transaction_repository import TransactionRepository
-from app.domain.services.payment_service import PaymentService
+from app.domain.services.payment_service import PaymentService, ValidationError
 from app.domain.value_objects.payment_method import PaymentMethod
 from app.domain.value_objects.money import Money
+from app.domain.value_objects.cents_money import CentsMoney
 from app.domain.value_objects.additional_item import AdditionalItem
 from app.domain.exceptions import (
     ValidationException,
@@ -14,6 +18,17 @@ from app.domain.exceptions import (
 from app.application.dto.payment_dto import PaymentRequest, PaymentResponse
 
 
+@dataclass(frozen=True)
+class ParsedPayment:
+    """Payment fields parsed from a request, before business rule validation"""
+    
+    payment_method: PaymentMethod
+    price: Money
+    price_modifier: Decimal
+    additional_item: AdditionalItem
+    transaction_datetime: datetime
+
+
 class ProcessPaymentUseCase:
     """Use case for processing a payment"""
     
@@ -40,58 +55,120 @@ class ProcessPaymentUseCase:
             PaymentMethodNotSupportedException: If payment method is invalid
             InvalidPriceException: If price is invalid
         """
-        # Parse and validate payment method
-        try:
-            payment_method = PaymentMethod(request.payment_method)
-        except ValueError:
-            raise PaymentMethodNotSupportedException(request.payment_method)
+        transaction = self.build_transaction(request)
         
-        # Parse and validate price
-        try:
-            price = Money.from_string(request.price)
-        except (InvalidOperation, ValueError):
-            raise InvalidPriceException(f"Invalid price format: {request.price}")
+        await self._transaction_repository.save(transaction)
         
-        # Parse price modifier
-        try:
-            price_modifier = request.get_modifier_decimal()
-        except (InvalidOperation, ValueError):
-            raise InvalidPriceException("Invalid price modifier format")
+        return PaymentResponse(
+            final_price=transaction.final_price.to_string(),
+            points=transaction.points,
+        )
+    
+    def build_transaction(self, request: PaymentRequest) -> Transaction:
+        """
+        Validate a payment request and build the transaction to persist
         
-        # Parse additional item
-        additional_item = AdditionalItem.from_dict(request.additional_item)
+        Args:
+            request: Payment request DTO
+            
+        Returns:
+            Priced transaction entity, not yet saved
+            
+        Raises:
+            ValidationException: If request validation fails
+            PaymentMethodNotSupportedException: If payment method is invalid
+            InvalidPriceException: If price is invalid
+        """
+        payment = parse_payment_request(request)
         
         # Validate payment against business rules
         validation_errors = self._payment_service.validate_payment(
-            payment_method=payment_method,
-            price_modifier=price_modifier,
-            additional_item=additional_item,
+            payment_method=payment.payment_method,
+            price_modifier=payment.price_modifier,
+            additional_item=payment.additional_item,
         )
         
         if validation_errors:
-            raise ValidationException([
-                {"field": e.field, "message": e.message}
-                for e in validation_errors
-            ])
+            raise to_validation_exception(validation_errors)
 
-        final_price = self._payment_service.calculate_final_price(price, price_modifier)
-        points = self._payment_service.calculate_points(price, payment_method)
+        return price_transaction(request, payment, self._payment_service)
+
+
+def parse_payment_request(request: PaymentRequest) -> ParsedPayment:
+    """
+    Parse the payment method, price, modifier, additional item and datetime of a request
+    
+    Raises:
+        ValidationException: If the datetime is malformed
+        PaymentMethodNotSupportedException: If payment method is invalid
+        InvalidPriceException: If price is invalid
+    """
+    # Parse and validate payment method
+    try:
+        payment_method = PaymentMethod(request.payment_method)
+    except ValueError:
+        raise PaymentMethodNotSupportedException(request.payment_method)
+    
+    # Parse and validate price
+    try:
+        price = Money.from_string(request.price)
+    except (InvalidOperation, ValueError):
+        raise InvalidPriceException(f"Invalid price format: {request.price}")
+    
+    # Parse price modifier
+    try:
+        price_modifier = request.get_modifier_decimal()
+    except (InvalidOperation, ValueError):
+        raise InvalidPriceException("Invalid price modifier format")
+    
+    # Parse datetime
+    try:
+        transaction_datetime = request.get_datetime()
+    except ValueError:
+        raise ValidationException([
+            {"field": "datetime", "message": f"Invalid datetime format: {request.datetime}"}
+        ])
+    
+    return ParsedPayment(
+        payment_method=payment_method,
+        price=price,
+        price_modifier=price_modifier,
+        additional_item=AdditionalItem.from_dict(request.additional_item),
+        transaction_datetime=transaction_datetime,
+    )
+
+
+def price_transaction(
+    request: PaymentRequest,
+    payment: ParsedPayment,
+    payment_service: PaymentService,
+) -> Transaction:
+    """Price an already validated payment and build its transaction"""
+    try:
+        price = CentsMoney.from_money(payment.price)
+    except ValueError:
+        # Prices with more than two decimal places have no integer-cent form
+        final_price = payment_service.calculate_final_price(payment.price, payment.price_modifier)
+        points = payment_service.calculate_points(payment.price, payment.payment_method)
+    else:
+        final_price = payment_service.calculate_final_price_cents(price, payment.price_modifier).to_money()
+        points = payment_service.calculate_points_cents(price, payment.payment_method)
+
+    return Transaction(
+        customer_id=request.customer_id,
+        price=payment.price,
+        price_modifier=payment.price_modifier,
+        payment_method=payment.payment_method,
+        transaction_datetime=payment.transaction_datetime,
+        final_price=final_price,
+        points=points,
+        additional_item=payment.additional_item,
+    )
 
-        transaction = Transaction(
-            customer_id=request.customer_id,
-            price=price,
-            price_modifier=price_modifier,
-            payment_method=payment_method,
-            transaction_datetime=request.get_datetime(),
-            final_price=final_price,
-            points=points,
-            additional_item=additional_item,
-        )
-        
-        await self._transaction_repository.save(transaction)
-        
-        return PaymentResponse(
-            final_price=final_price.to_string(),
-            points=points,
-        )
 
+def to_validation_exception(errors: List[ValidationError]) -> ValidationException:
+    """Wrap business rule violations in the exception reported to clients"""
+    return ValidationException([
+        {"field": e.field, "message": e.message}
+        for e in errors
+    ])
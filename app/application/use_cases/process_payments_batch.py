@@ -0,0 +1,90 @@
+from typing import List, Tuple
+
+from app.domain.entities.transaction import Transaction
+from app.domain.repositories.transaction_repository import TransactionRepository
+from app.domain.services.payment_service import PaymentService
+from app.domain.exceptions import DomainException
+from app.application.dto.payment_dto import PaymentRequest, PaymentResponse
+from app.application.use_cases.process_payment import (
+    ParsedPayment,
+    parse_payment_request,
+    price_transaction,
+    to_validation_exception,
+)
+
+
+class ProcessPaymentsBatchUseCase:
+    """Use case for processing a batch of payments in one round trip"""
+
+    def __init__(
+        self,
+        transaction_repository: TransactionRepository,
+        payment_service: PaymentService,
+    ):
+        self._transaction_repository = transaction_repository
+        self._payment_service = payment_service
+
+    async def execute(
+        self,
+        requests: List[PaymentRequest],
+    ) -> List[PaymentResponse | DomainException]:
+        """
+        Process a batch of payment requests
+
+        Requests are priced with ``price_payments``; all valid transactions
+        are then persisted with a single bulk insert.
+
+        Args:
+            requests: Payment request DTOs
+
+        Returns:
+            One entry per request, in request order: a payment response for
+            accepted payments or the domain exception that rejected the item
+        """
+        priced = price_payments(requests, self._payment_service)
+        transactions = [t for t in priced if isinstance(t, Transaction)]
+
+        await self._transaction_repository.save_many(transactions)
+
+        return [
+            PaymentResponse(final_price=t.final_price.to_string(), points=t.points)
+            if isinstance(t, Transaction) else t
+            for t in priced
+        ]
+
+
+def price_payments(
+    requests: List[PaymentRequest],
+    payment_service: PaymentService,
+) -> List[Transaction | DomainException]:
+    """
+    Parse, validate and price payment requests without persisting them
+
+    Requests are parsed one by one and validated together in a single call
+    to the compiled rules engine.
+
+    Returns:
+        One entry per request, in request order: the priced transaction or
+        the domain exception that rejected the request
+    """
+    results: List[Transaction | DomainException | None] = [None] * len(requests)
+    parsed: List[Tuple[int, PaymentRequest, ParsedPayment]] = []
+
+    for index, request in enumerate(requests):
+        try:
+            parsed.append((index, request, parse_payment_request(request)))
+        except DomainException as e:
+            results[index] = e
+
+    validation_errors = payment_service.validate_payments(
+        (p.payment_method, p.price_modifier, p.additional_item)
+        for _, _, p in parsed
+    )
+
+    for (index, request, payment), errors in zip(parsed, validation_errors):
+        if errors:
+            results[index] = to_validation_exception(errors)
+        else:
+            results[index] = price_transaction(request, payment, payment_service)
+
+    return results
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Optional
 from uuid import UUID, uuid4
@@ -26,8 +26,11 @@ class Transaction:
     
     @property
     def hour_bucket(self) -> datetime:
-        """Get the hourly bucket for this transaction"""
-        return self.transaction_datetime.replace(
+        """Get the hourly bucket for this transaction (UTC when timezone-aware)"""
+        transaction_datetime = self.transaction_datetime
+        if transaction_datetime.tzinfo is not None:
+            transaction_datetime = transaction_datetime.astimezone(timezone.utc)
+        return transaction_datetime.replace(
             minute=0, second=0, microsecond=0
         )
     
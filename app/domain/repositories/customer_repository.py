@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class CustomerRepository(ABC):
+    """Abstract repository interface for per-customer aggregates"""
+    
+    @abstractmethod
+    async def get_summary(self, customer_id: str) -> Optional[dict]:
+        """
+        Get a customer's lifetime spend, points earned and transaction count
+        
+        Returns None for a customer without transactions.
+        """
+        pass
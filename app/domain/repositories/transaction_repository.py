@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, List, Optional
 
 from app.domain.entities.transaction import Transaction
+from app.domain.value_objects.granularity import Granularity, floor_bucket, nests_in
 
 
 class TransactionRepository(ABC):
@@ -13,12 +14,53 @@ class TransactionRepository(ABC):
         """Save a transaction to the repository"""
         pass
     
+    @abstractmethod
+    async def save_many(self, transactions: List[Transaction]) -> List[Transaction]:
+        """Save a batch of transactions in a single round trip"""
+        pass
+    
     @abstractmethod
     async def get_hourly_sales(
         self,
         start_datetime: datetime,
         end_datetime: datetime,
+        limit: Optional[int] = None,
     ) -> List[dict]:
-        """Get aggregated hourly sales within a date range"""
+        """Get aggregated hourly sales within a date range, oldest hour first"""
         pass
-
+    
+    async def stream_hourly_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+    ) -> AsyncIterator[dict]:
+        """Stream aggregated hourly sales within a date range, oldest hour first"""
+        for hour in await self.get_hourly_sales(start_datetime, end_datetime):
+            yield hour
+    
+    async def get_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        granularity: Granularity,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Get aggregated sales per bucket of ``granularity``, oldest bucket first
+        
+        The default sums hourly sales, so it supports hours and coarser buckets
+        only; repositories with finer aggregates override it.
+        """
+        if not nests_in(Granularity.HOUR, granularity):
+            raise ValueError(f"{granularity.value} buckets cannot be built from hourly sales")
+        
+        buckets: dict = {}
+        for hour in await self.get_hourly_sales(start_datetime, end_datetime):
+            bucket = floor_bucket(hour["datetime"], granularity)
+            if bucket in buckets:
+                buckets[bucket]["sales"] += hour["sales"]
+                buckets[bucket]["points"] += hour["points"]
+            else:
+                buckets[bucket] = {**hour, "datetime": bucket}
+        result = list(buckets.values())
+        return result if limit is None else result[:limit]
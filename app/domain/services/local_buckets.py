@@ -0,0 +1,74 @@
+from collections import defaultdict
+from datetime import datetime, timezone, tzinfo
+from decimal import Decimal
+from typing import Iterable, List
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.domain.value_objects.granularity import Granularity, floor_bucket, next_bucket
+
+
+def parse_timezone(name: str) -> tzinfo:
+    """Resolve an IANA timezone name such as ``Asia/Tokyo``"""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def floor_local(value: datetime, tz: tzinfo, granularity: Granularity) -> datetime:
+    """
+    Start of the local bucket containing a UTC instant, as a UTC instant
+
+    Buckets follow the wall clock of ``tz``. An hour repeated when clocks go
+    back is two buckets, and a day whose midnight is skipped starts at its
+    first existing instant.
+    """
+    local = floor_bucket(value.astimezone(tz), granularity)
+    return local.astimezone(timezone.utc)
+
+
+def _next_local(bucket: datetime, tz: tzinfo, granularity: Granularity) -> datetime:
+    if granularity in (Granularity.DAY, Granularity.WEEK, Granularity.MONTH):
+        # Calendar buckets advance on the wall clock, so DST days keep their 23 or 25 hours
+        wall = floor_bucket(bucket.astimezone(tz).replace(tzinfo=None), granularity)
+        return next_bucket(wall, granularity).replace(tzinfo=tz).astimezone(timezone.utc)
+
+    # Shorter buckets last their nominal length unless the offset changes inside one
+    candidate = next_bucket(bucket, granularity)
+    floored = floor_local(candidate, tz, granularity)
+    return floored if floored > bucket else candidate
+
+
+def local_bucket_starts(
+    start: datetime,
+    end: datetime,
+    tz: tzinfo,
+    granularity: Granularity,
+) -> List[datetime]:
+    """UTC start instants of the local buckets overlapping an inclusive UTC range"""
+    starts = []
+    bucket = floor_local(start, tz, granularity)
+    while bucket <= end:
+        starts.append(bucket)
+        bucket = _next_local(bucket, tz, granularity)
+    return starts
+
+
+def rebucket(rows: Iterable[dict], tz: tzinfo, granularity: Granularity) -> List[dict]:
+    """
+    Sum UTC-bucketed sales into local buckets, oldest first
+
+    Every row must lie within a single local bucket, i.e. come from a level
+    whose buckets do not straddle local bucket boundaries. Results carry the
+    local bucket start in ``tz``.
+    """
+    totals: dict = defaultdict(lambda: [Decimal("0"), 0])
+    for row in rows:
+        total = totals[floor_local(row["datetime"], tz, granularity)]
+        total[0] += row["sales"]
+        total[1] += row["points"]
+
+    return [
+        {"datetime": bucket.astimezone(tz), "sales": sales, "points": points}
+        for bucket, (sales, points) in sorted(totals.items())
+    ]
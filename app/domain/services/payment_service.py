@@ -1,19 +1,18 @@
-from dataclasses import dataclass
 from decimal import Decimal
-from typing import List
+from typing import Iterable, List, Tuple
 
 from app.domain.value_objects.payment_method import (
     PaymentMethod,
     get_payment_config,
 )
 from app.domain.value_objects.money import Money
-from app.domain.value_objects.additional_item import AdditionalItem, CourierService
-
-
-@dataclass
-class ValidationError:   
-    field: str
-    message: str
+from app.domain.value_objects.cents_money import CentsMoney
+from app.domain.value_objects.additional_item import AdditionalItem
+from app.domain.services.payment_validator import (
+    PAYMENT_VALIDATORS,
+    ValidationError,
+    validate_payments,
+)
 
 
 class PaymentService:
@@ -25,48 +24,15 @@ class PaymentService:
         price_modifier: Decimal,
         additional_item: AdditionalItem | None,
     ) -> List[ValidationError]:
-        errors: List[ValidationError] = []
-        config = get_payment_config(payment_method)
-        
-        # Validate price modifier range
-        if not config.is_valid_price_modifier(price_modifier):
-            errors.append(ValidationError(
-                field="priceModifier",
-                message=f"Price modifier must be between {config.min_price_modifier} "
-                        f"and {config.max_price_modifier} for {payment_method.value}"
-            ))
-        
-        # Validate additional items based on payment method
-        if additional_item is None:
-            additional_item = AdditionalItem()
-        
-        if config.requires_last4 and not additional_item.validate_last4():
-            errors.append(ValidationError(
-                field="additionalItem.last4",
-                message="Card last 4 digits are required and must be exactly 4 digits"
-            ))
-        
-        if config.requires_courier:
-            if not additional_item.validate_courier():
-                errors.append(ValidationError(
-                    field="additionalItem.courier",
-                    message=f"Courier service is required. "
-                            f"Allowed values: {[c.value for c in CourierService]}"
-                ))
-        
-        if config.requires_bank_info and not additional_item.validate_bank_info():
-            errors.append(ValidationError(
-                field="additionalItem",
-                message="Bank name and account number are required for bank transfer"
-            ))
-        
-        if config.requires_cheque_info and not additional_item.validate_cheque_info():
-            errors.append(ValidationError(
-                field="additionalItem",
-                message="Bank name and cheque number are required for cheque payment"
-            ))
-        
-        return errors
+        """Validate a payment against the compiled rules of its method"""
+        return PAYMENT_VALIDATORS[payment_method].validate(price_modifier, additional_item)
+    
+    def validate_payments(
+        self,
+        payments: Iterable[Tuple[PaymentMethod, Decimal, AdditionalItem | None]],
+    ) -> List[List[ValidationError]]:
+        """Validate a batch of (method, modifier, additional item) payments"""
+        return validate_payments(payments)
     
     def calculate_final_price(
         self,
@@ -84,4 +50,19 @@ class PaymentService:
         """Calculate points earned based on payment method"""
         config = get_payment_config(payment_method)
         return config.calculate_points(price.amount)
-
+    
+    def calculate_final_price_cents(
+        self,
+        price: CentsMoney,
+        price_modifier: Decimal,
+    ) -> CentsMoney:
+        """Integer-cent variant of calculate_final_price with identical rounding"""
+        return price.apply_modifier(price_modifier)
+    
+    def calculate_points_cents(
+        self,
+        price: CentsMoney,
+        payment_method: PaymentMethod,
+    ) -> int:
+        """Integer-cent variant of calculate_points with identical truncation"""
+        return price.points(get_payment_config(payment_method).point_rate)
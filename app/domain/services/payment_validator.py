@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.domain.value_objects.additional_item import AdditionalItem, CourierService
+from app.domain.value_objects.payment_method import (
+    PAYMENT_METHOD_CONFIGS,
+    PaymentMethod,
+    PaymentMethodConfig,
+)
+
+
+@dataclass
+class ValidationError:
+    field: str
+    message: str
+
+
+LAST4_MESSAGE = "Card last 4 digits are required and must be exactly 4 digits"
+COURIER_MESSAGE = (
+    f"Courier service is required. "
+    f"Allowed values: {[c.value for c in CourierService]}"
+)
+BANK_INFO_MESSAGE = "Bank name and account number are required for bank transfer"
+CHEQUE_INFO_MESSAGE = "Bank name and cheque number are required for cheque payment"
+
+
+def _has_last4(item: Optional[AdditionalItem]) -> bool:
+    return item is not None and item.validate_last4()
+
+
+def _has_courier(item: Optional[AdditionalItem]) -> bool:
+    return item is not None and item.validate_courier()
+
+
+def _has_bank_info(item: Optional[AdditionalItem]) -> bool:
+    return item is not None and item.validate_bank_info()
+
+
+def _has_cheque_info(item: Optional[AdditionalItem]) -> bool:
+    return item is not None and item.validate_cheque_info()
+
+
+# A check passes when its predicate returns True; otherwise (field, message)
+Check = Tuple[Callable[[Optional[AdditionalItem]], bool], str, str]
+
+
+class CompiledPaymentValidator:
+    """
+    Validation rules of one payment method, compiled once
+
+    The additional item checks the method requires are kept as a flat tuple
+    of predicates with their error messages already formatted, so validating
+    a payment only runs the checks and allocates nothing unless one fails.
+    """
+
+    __slots__ = ("min_price_modifier", "max_price_modifier", "modifier_message", "checks")
+
+    def __init__(self, config: PaymentMethodConfig):
+        self.min_price_modifier = config.min_price_modifier
+        self.max_price_modifier = config.max_price_modifier
+        self.modifier_message = (
+            f"Price modifier must be between {config.min_price_modifier} "
+            f"and {config.max_price_modifier} for {config.method.value}"
+        )
+
+        checks: List[Check] = []
+        if config.requires_last4:
+            checks.append((_has_last4, "additionalItem.last4", LAST4_MESSAGE))
+        if config.requires_courier:
+            checks.append((_has_courier, "additionalItem.courier", COURIER_MESSAGE))
+        if config.requires_bank_info:
+            checks.append((_has_bank_info, "additionalItem", BANK_INFO_MESSAGE))
+        if config.requires_cheque_info:
+            checks.append((_has_cheque_info, "additionalItem", CHEQUE_INFO_MESSAGE))
+        self.checks: Tuple[Check, ...] = tuple(checks)
+
+    def validate(
+        self,
+        price_modifier: Decimal,
+        additional_item: Optional[AdditionalItem],
+    ) -> List[ValidationError]:
+        """Validate one payment, returning its errors in rule order"""
+        errors: List[ValidationError] = []
+        if not self.min_price_modifier <= price_modifier <= self.max_price_modifier:
+            errors.append(ValidationError(field="priceModifier", message=self.modifier_message))
+        for passes, field, message in self.checks:
+            if not passes(additional_item):
+                errors.append(ValidationError(field=field, message=message))
+        return errors
+
+
+PAYMENT_VALIDATORS: Dict[PaymentMethod, CompiledPaymentValidator] = {
+    method: CompiledPaymentValidator(config)
+    for method, config in PAYMENT_METHOD_CONFIGS.items()
+}
+
+
+def validate_payments(
+    payments: Iterable[Tuple[PaymentMethod, Decimal, Optional[AdditionalItem]]],
+) -> List[List[ValidationError]]:
+    """Validate many ``(method, price_modifier, additional_item)`` payments"""
+    validators = PAYMENT_VALIDATORS
+    return [
+        validators[payment_method].validate(price_modifier, additional_item)
+        for payment_method, price_modifier, additional_item in payments
+    ]
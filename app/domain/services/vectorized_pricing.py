@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable
+
+import numpy as np
+
+from app.domain.value_objects.cents_money import decimal_ratio
+from app.domain.value_objects.payment_method import (
+    PAYMENT_METHOD_CODES,
+    PAYMENT_METHOD_CONFIGS,
+)
+
+
+# Modifiers are passed as integers scaled by this factor (0.95 is 9500)
+MODIFIER_SCALE = 10_000
+
+# Products must stay below this to be computed exactly in int64
+_INT64_SAFE = 2 ** 62
+
+
+def _build_tables():
+    size = max(PAYMENT_METHOD_CODES.values()) + 1
+    known = np.zeros(size, dtype=bool)
+    min_modifier = np.zeros(size, dtype=np.int64)
+    max_modifier = np.zeros(size, dtype=np.int64)
+    rate_numerator = np.zeros(size, dtype=np.int64)
+    # Cents to points: points = cents * numerator // (100 * denominator)
+    rate_divisor = np.ones(size, dtype=np.int64)
+
+    for method, code in PAYMENT_METHOD_CODES.items():
+        config = PAYMENT_METHOD_CONFIGS[method]
+        known[code] = True
+        min_modifier[code] = to_modifier_units([config.min_price_modifier])[0]
+        max_modifier[code] = to_modifier_units([config.max_price_modifier])[0]
+        numerator, denominator = decimal_ratio(config.point_rate)
+        rate_numerator[code] = numerator
+        rate_divisor[code] = 100 * denominator
+    return known, min_modifier, max_modifier, rate_numerator, rate_divisor
+
+
+def to_modifier_units(modifiers: Iterable[Decimal]) -> np.ndarray:
+    """
+    Convert Decimal modifiers to scaled integers
+
+    Raises:
+        ValueError: If a modifier has more decimal places than the scale holds
+    """
+    units = []
+    for modifier in modifiers:
+        scaled = Decimal(modifier) * MODIFIER_SCALE
+        if scaled != scaled.to_integral_value():
+            raise ValueError(f"Modifier {modifier} is finer than 1/{MODIFIER_SCALE}")
+        units.append(int(scaled))
+    return np.array(units, dtype=np.int64)
+
+
+@dataclass
+class BatchPricing:
+    """Result of pricing a batch of payments"""
+
+    final_price_cents: np.ndarray
+    points: np.ndarray
+    # True where the modifier is outside the payment method's allowed range;
+    # prices and points are still computed for those rows
+    invalid_modifier: np.ndarray
+
+
+def price_batch(
+    price_cents: np.ndarray,
+    modifier_units: np.ndarray,
+    method_codes: np.ndarray,
+) -> BatchPricing:
+    """
+    Compute final prices and points for many payments in one pass
+
+    Uses exact integer arithmetic that matches the scalar path: final prices
+    round half up to the cent like ``Money.apply_modifier`` and points
+    truncate like ``PaymentMethodConfig.calculate_points``.
+
+    Args:
+        price_cents: Non-negative prices in integer cents
+        modifier_units: Non-negative modifiers scaled by MODIFIER_SCALE
+        method_codes: PAYMENT_METHOD_CODES of each payment
+
+    Returns:
+        Final prices in cents, points and the out-of-range modifier mask
+
+    Raises:
+        ValueError: On mismatched shapes, unknown method codes, negative
+            inputs or values too large for exact int64 arithmetic
+    """
+    prices = np.asarray(price_cents, dtype=np.int64)
+    modifiers = np.asarray(modifier_units, dtype=np.int64)
+    codes = np.asarray(method_codes, dtype=np.int64)
+
+    if not prices.shape == modifiers.shape == codes.shape:
+        raise ValueError("price_cents, modifier_units and method_codes must have the same shape")
+    if prices.size == 0:
+        empty = np.zeros(prices.shape, dtype=np.int64)
+        return BatchPricing(empty, empty.copy(), np.zeros(prices.shape, dtype=bool))
+
+    if prices.min() < 0 or modifiers.min() < 0:
+        raise ValueError("Prices and modifiers must not be negative")
+    if codes.min() < 0 or codes.max() >= _KNOWN.size or not _KNOWN[codes].all():
+        raise ValueError("Unknown payment method code")
+    largest = int(prices.max())
+    if 2 * largest * int(modifiers.max()) + MODIFIER_SCALE >= _INT64_SAFE \
+            or largest * int(_RATE_NUMERATOR.max()) >= _INT64_SAFE:
+        raise ValueError("Values too large for exact int64 arithmetic")
+
+    # round(p * m / S) half up == (2 * p * m + S) // (2 * S) for p, m >= 0
+    final = (2 * prices * modifiers + MODIFIER_SCALE) // (2 * MODIFIER_SCALE)
+    points = prices * _RATE_NUMERATOR[codes] // _RATE_DIVISOR[codes]
+    invalid = (modifiers < _MIN_MODIFIER[codes]) | (modifiers > _MAX_MODIFIER[codes])
+
+    return BatchPricing(final_price_cents=final, points=points, invalid_modifier=invalid)
+
+
+_KNOWN, _MIN_MODIFIER, _MAX_MODIFIER, _RATE_NUMERATOR, _RATE_DIVISOR = _build_tables()
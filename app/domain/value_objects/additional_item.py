@@ -4,6 +4,9 @@ from typing import Optional
 import re
 
 
+_LAST4_PATTERN = re.compile(r"^\d{4}$")
+
+
 class CourierService(str, Enum):
     """Supported courier services for cash on delivery"""
     
@@ -25,7 +28,7 @@ class AdditionalItem:
         """Validate that last4 is exactly 4 digits"""
         if self.last4 is None:
             return False
-        return bool(re.match(r"^\d{4}$", self.last4))
+        return _LAST4_PATTERN.match(self.last4) is not None
     
     def validate_courier(self) -> bool:
         """Validate courier is a valid service"""
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from enum import Enum
+
+import strawberry
+
+
+@strawberry.enum
+class Granularity(str, Enum):
+    """Bucket size of a sales report; buckets are aligned in UTC, weeks start on Monday"""
+
+    MINUTE = "MINUTE"
+    FIVE_MINUTES = "FIVE_MINUTES"
+    HOUR = "HOUR"
+    DAY = "DAY"
+    WEEK = "WEEK"
+    MONTH = "MONTH"
+
+
+_FIXED_LENGTHS = {
+    Granularity.MINUTE: timedelta(minutes=1),
+    Granularity.FIVE_MINUTES: timedelta(minutes=5),
+    Granularity.HOUR: timedelta(hours=1),
+    Granularity.DAY: timedelta(days=1),
+    Granularity.WEEK: timedelta(weeks=1),
+}
+
+# Granularities whose every bucket lies inside a single bucket of the key;
+# weeks and months do not nest in one another
+_NESTS_IN = {
+    Granularity.MINUTE: set(Granularity),
+    Granularity.FIVE_MINUTES: set(Granularity) - {Granularity.MINUTE},
+    Granularity.HOUR: {Granularity.HOUR, Granularity.DAY, Granularity.WEEK, Granularity.MONTH},
+    Granularity.DAY: {Granularity.DAY, Granularity.WEEK, Granularity.MONTH},
+    Granularity.WEEK: {Granularity.WEEK},
+    Granularity.MONTH: {Granularity.MONTH},
+}
+
+
+def nests_in(finer: Granularity, coarser: Granularity) -> bool:
+    """Whether buckets of ``coarser`` can be summed from buckets of ``finer``"""
+    return coarser in _NESTS_IN[finer]
+
+
+def floor_bucket(value: datetime, granularity: Granularity) -> datetime:
+    """Start of the bucket containing a datetime"""
+    if granularity == Granularity.MINUTE:
+        return value.replace(second=0, microsecond=0)
+    if granularity == Granularity.FIVE_MINUTES:
+        return value.replace(minute=value.minute - value.minute % 5, second=0, microsecond=0)
+    if granularity == Granularity.HOUR:
+        return value.replace(minute=0, second=0, microsecond=0)
+
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == Granularity.DAY:
+        return day
+    if granularity == Granularity.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_bucket(bucket: datetime, granularity: Granularity) -> datetime:
+    """Start of the bucket following the one starting at ``bucket``"""
+    if granularity == Granularity.MONTH:
+        if bucket.month == 12:
+            return bucket.replace(year=bucket.year + 1, month=1)
+        return bucket.replace(month=bucket.month + 1)
+    return bucket + _FIXED_LENGTHS[granularity]
+
+
+def ceil_bucket(value: datetime, granularity: Granularity) -> datetime:
+    """Round a datetime up to the next bucket boundary unless already on one"""
+    floored = floor_bucket(value, granularity)
+    return floored if floored == value else next_bucket(floored, granularity)
@@ -23,6 +23,27 @@ class PaymentMethod(str, Enum):
     CHEQUE = "CHEQUE"
 
 
+# Stable numeric codes for compact storage and array processing; never renumber
+PAYMENT_METHOD_CODES: dict[PaymentMethod, int] = {
+    PaymentMethod.CASH: 1,
+    PaymentMethod.CASH_ON_DELIVERY: 2,
+    PaymentMethod.VISA: 3,
+    PaymentMethod.MASTERCARD: 4,
+    PaymentMethod.AMEX: 5,
+    PaymentMethod.JCB: 6,
+    PaymentMethod.LINE_PAY: 7,
+    PaymentMethod.PAYPAY: 8,
+    PaymentMethod.POINTS: 9,
+    PaymentMethod.GRAB_PAY: 10,
+    PaymentMethod.BANK_TRANSFER: 11,
+    PaymentMethod.CHEQUE: 12,
+}
+
+PAYMENT_METHODS_BY_CODE: dict[int, PaymentMethod] = {
+    code: method for method, code in PAYMENT_METHOD_CODES.items()
+}
+
+
 @dataclass(frozen=True)
 class PaymentMethodConfig:
     """Configuration for a payment method including price modifier range and point rate"""
@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta, timezone
+
+
+HOUR = timedelta(hours=1)
+
+# Smallest step between two datetimes; turns inclusive range ends into exclusive ones
+RESOLUTION = timedelta(microseconds=1)
+
+
+def as_utc(value: datetime) -> datetime:
+    """Normalize a datetime to UTC, treating naive values as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def floor_hour(value: datetime) -> datetime:
+    """Truncate a datetime to the start of its hour"""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(value: datetime) -> datetime:
+    """Round a datetime up to the next hour boundary unless already on one"""
+    floored = floor_hour(value)
+    return floored if floored == value else floored + HOUR
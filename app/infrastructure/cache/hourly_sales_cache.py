@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from app.domain.value_objects.time_bucket import HOUR
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.monitoring.metrics import get_metrics_registry
+
+
+SALES_CACHE_EVENTS = get_metrics_registry().counter(
+    "sales_cache_events_total",
+    "Hourly sales cache hits, misses, evictions, expiries and invalidations",
+    ("event",),
+)
+
+# Marks an hour that is not in the cache, as opposed to a cached hour without sales
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Counters for cache effectiveness"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expiries: int = 0
+    invalidations: int = 0
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class HourlySalesCache:
+    """
+    LRU cache of per-hour sales aggregates for closed hours
+
+    An hour is closed once it ended more than ``grace_seconds`` ago; late
+    transactions are not expected for it any more, so its aggregate can be
+    cached. Hours without sales are cached as ``None``. Entries are dropped
+    by LRU eviction, by an explicit invalidation and ``ttl_seconds`` after
+    they were cached (``0`` keeps them until evicted): writes from other
+    processes, such as a backdated payment handled by another worker or a
+    bulk import followed by a rollup rebuild, cannot invalidate this cache
+    and only show up once the entries have expired.
+
+    Writes are bracketed by ``begin_write`` and ``end_write``, the latter
+    once the write's database transaction has ended. A reader takes a
+    ``write_token`` before reading and passes it to ``put``; the value is
+    not cached if a write to that hour is in flight or started or ended
+    since the token was taken, as it may predate the write's commit.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        grace_seconds: float = 300.0,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], datetime] = _utc_now,
+    ):
+        self._max_entries = max_entries
+        self._grace = timedelta(seconds=grace_seconds)
+        self._ttl = timedelta(seconds=ttl_seconds) if ttl_seconds > 0 else None
+        self._clock = clock
+        # Hour -> (aggregate, expiry time or None)
+        self._entries: "OrderedDict[datetime, Tuple[Optional[dict], Optional[datetime]]]" = OrderedDict()
+        self._write_seq = 0
+        self._writes_in_flight: Dict[datetime, int] = {}
+        # Sequence number of the last write to each hour, bounded like the
+        # entries; hours dropped from it count as written at the floor
+        self._last_write: "OrderedDict[datetime, int]" = OrderedDict()
+        self._last_write_floor = 0
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_closed(self, hour_bucket: datetime) -> bool:
+        """Whether an hour is old enough for its aggregate to be cached"""
+        return hour_bucket + HOUR + self._grace <= self._clock()
+
+    def get(self, hour_bucket: datetime):
+        """Return the cached aggregate for an hour, or ``MISSING``"""
+        entry = self._entries.get(hour_bucket)
+        if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+            del self._entries[hour_bucket]
+            self.stats.expiries += 1
+            SALES_CACHE_EVENTS.inc(("expiry",))
+            entry = None
+        if entry is None:
+            self.stats.misses += 1
+            SALES_CACHE_EVENTS.inc(("miss",))
+            return MISSING
+
+        value = entry[0]
+        self._entries.move_to_end(hour_bucket)
+        self.stats.hits += 1
+        SALES_CACHE_EVENTS.inc(("hit",))
+        return value
+
+    def put(self, hour_bucket: datetime, value: Optional[dict], token: Optional[int] = None) -> None:
+        """Cache the aggregate of a closed hour, read after ``token`` was taken"""
+        if not self.is_closed(hour_bucket) or hour_bucket in self._writes_in_flight:
+            return
+        if token is not None and self._last_write.get(hour_bucket, self._last_write_floor) > token:
+            return
+
+        self._entries[hour_bucket] = (value, self._clock() + self._ttl if self._ttl is not None else None)
+        self._entries.move_to_end(hour_bucket)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+            SALES_CACHE_EVENTS.inc(("eviction",))
+
+    def write_token(self) -> int:
+        """Take before reading aggregates that will be passed to ``put``"""
+        return self._write_seq
+
+    def begin_write(self, hour_buckets: Iterable[datetime]) -> None:
+        """Mark hours as being written until ``end_write``"""
+        for hour_bucket in hour_buckets:
+            self._writes_in_flight[hour_bucket] = self._writes_in_flight.get(hour_bucket, 0) + 1
+            self._record_write(hour_bucket)
+
+    def end_write(self, hour_buckets: Iterable[datetime]) -> None:
+        """Mark the end of a write's database transaction, committed or not"""
+        for hour_bucket in hour_buckets:
+            remaining = self._writes_in_flight.pop(hour_bucket, 1) - 1
+            if remaining:
+                self._writes_in_flight[hour_bucket] = remaining
+            self._record_write(hour_bucket)
+
+    def _record_write(self, hour_bucket: datetime) -> None:
+        self._write_seq += 1
+        self._last_write[hour_bucket] = self._write_seq
+        self._last_write.move_to_end(hour_bucket)
+        while len(self._last_write) > self._max_entries:
+            _, write_seq = self._last_write.popitem(last=False)
+            self._last_write_floor = max(self._last_write_floor, write_seq)
+        self.invalidate(hour_bucket)
+
+    def invalidate(self, hour_bucket: datetime) -> None:
+        """Drop an hour whose aggregate changed"""
+        if self._entries.pop(hour_bucket, MISSING) is not MISSING:
+            self.stats.invalidations += 1
+            SALES_CACHE_EVENTS.inc(("invalidation",))
+
+    def invalidate_all(self) -> None:
+        """Drop every hour, e.g. once the rollups were rebuilt; reads taken before are not cached"""
+        self._write_seq += 1
+        self._last_write.clear()
+        self._last_write_floor = self._write_seq
+        if self._entries:
+            self.stats.invalidations += len(self._entries)
+            SALES_CACHE_EVENTS.inc(("invalidation",), len(self._entries))
+            self._entries.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+@lru_cache
+def get_sales_cache() -> HourlySalesCache:
+    """Get the shared in-process sales cache"""
+    settings = get_settings()
+    return HourlySalesCache(
+        max_entries=settings.sales_cache_max_entries,
+        grace_seconds=settings.sales_cache_grace_seconds,
+        ttl_seconds=settings.sales_cache_ttl_seconds,
+    )
@@ -0,0 +1,164 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.application.dto.payment_dto import PaymentResponse
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.monitoring.metrics import get_metrics_registry
+from app.infrastructure.persistence.database import get_session_context
+from app.infrastructure.repositories.idempotency_repository import (
+    SqlAlchemyIdempotencyRepository,
+)
+
+
+IDEMPOTENT_REPLAYS = get_metrics_registry().counter(
+    "payment_idempotent_replays_total",
+    "Payments answered with the stored result of an earlier request with the same key",
+    ("source",),
+)
+IDEMPOTENT_EXECUTIONS = get_metrics_registry().counter(
+    "payment_idempotent_executions_total",
+    "Payments with an idempotency key that were run rather than replayed",
+)
+IDEMPOTENCY_CACHE_EVICTIONS = get_metrics_registry().counter(
+    "payment_idempotency_cache_evictions_total",
+    "Payment results dropped from the in-process idempotency cache",
+)
+
+
+@dataclass
+class IdempotencyStats:
+    """Counters for how retried payments were answered"""
+
+    executions: int = 0
+    cache_hits: int = 0
+    stored_hits: int = 0
+    collapsed: int = 0
+    evictions: int = 0
+
+
+class PaymentIdempotencyCache:
+    """
+    Runs each payment at most once per idempotency key
+
+    Results are looked up in a bounded LRU first and then, through ``load``,
+    in the idempotency table, so a retry returns the original result without
+    running the payment again. Requests for a key that is already executing
+    wait for that execution instead of starting their own. Failures are not
+    remembered; nothing was persisted for them, so a retry runs again.
+
+    ``execute`` expects the operation to store the key in the idempotency
+    table; if that insert hits the unique index because another instance
+    got there first, the stored result is returned instead.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[str], Awaitable[Optional[PaymentResponse]]],
+        max_entries: int = 100_000,
+    ):
+        self._load = load
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, PaymentResponse]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.stats = IdempotencyStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, idempotency_key: str) -> Optional[PaymentResponse]:
+        """Return the cached result for a key, if any"""
+        response = self._entries.get(idempotency_key)
+        if response is not None:
+            self._entries.move_to_end(idempotency_key)
+        return response
+
+    def put(self, idempotency_key: str, response: PaymentResponse) -> None:
+        self._entries[idempotency_key] = response
+        self._entries.move_to_end(idempotency_key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+            IDEMPOTENCY_CACHE_EVICTIONS.inc()
+
+    async def execute(
+        self,
+        idempotency_key: str,
+        operation: Callable[[], Awaitable[PaymentResponse]],
+    ) -> PaymentResponse:
+        """Return the result of the payment for a key, running it only if needed"""
+        response = self.get(idempotency_key)
+        if response is not None:
+            self.stats.cache_hits += 1
+            IDEMPOTENT_REPLAYS.inc(("cache",))
+            return response
+
+        in_flight = self._in_flight.get(idempotency_key)
+        if in_flight is not None:
+            self.stats.collapsed += 1
+            IDEMPOTENT_REPLAYS.inc(("in_flight",))
+            # Shielded so a cancelled waiter does not cancel the execution
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[idempotency_key] = future
+        try:
+            response = await self._run(idempotency_key, operation)
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise it; without any the failure is only the caller's
+            future.exception()
+            raise
+        else:
+            self.put(idempotency_key, response)
+            future.set_result(response)
+            return response
+        finally:
+            del self._in_flight[idempotency_key]
+
+    async def _run(
+        self,
+        idempotency_key: str,
+        operation: Callable[[], Awaitable[PaymentResponse]],
+    ) -> PaymentResponse:
+        response = await self._load(idempotency_key)
+        if response is not None:
+            self.stats.stored_hits += 1
+            IDEMPOTENT_REPLAYS.inc(("database",))
+            return response
+
+        try:
+            response = await operation()
+        except IntegrityError:
+            # Another instance stored the key first
+            response = await self._load(idempotency_key)
+            if response is None:
+                raise
+            self.stats.stored_hits += 1
+            IDEMPOTENT_REPLAYS.inc(("database",))
+            return response
+
+        self.stats.executions += 1
+        IDEMPOTENT_EXECUTIONS.inc()
+        return response
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+async def _load_stored_response(idempotency_key: str) -> Optional[PaymentResponse]:
+    async with get_session_context() as session:
+        return await SqlAlchemyIdempotencyRepository(session).get(idempotency_key)
+
+
+@lru_cache
+def get_idempotency_cache() -> PaymentIdempotencyCache:
+    """Get the shared in-process idempotency cache"""
+    return PaymentIdempotencyCache(
+        load=_load_stored_response,
+        max_entries=get_settings().idempotency_cache_max_entries,
+    )
@@ -3,6 +3,14 @@ from dataclasses import dataclass
 from functools import lru_cache
 
 
+def _get_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass
 class Settings:
     """Application settings loaded from environment variables"""
@@ -15,6 +23,81 @@ class Settings:
     host: str = "0.0.0.0"
     port: int = 8000
     
+    # Group commit: coalesce concurrent payment writes into one DB transaction
+    group_commit_enabled: bool = False
+    group_commit_max_wait_ms: float = 5.0
+    group_commit_max_batch_size: int = 100
+    
+    # Sales report cache for closed hours. The cache is per process: only
+    # writes made by this process invalidate it, so payments written by other
+    # workers, bulk imports and rollup rebuilds run by the tools show up once
+    # the cached hours expire after sales_cache_ttl_seconds (0: never expire)
+    sales_cache_enabled: bool = False
+    sales_cache_max_entries: int = 100_000
+    sales_cache_grace_seconds: float = 300.0
+    sales_cache_ttl_seconds: float = 300.0
+    sales_cache_warmup_hours: int = 168
+    
+    # Payment results remembered in process per idempotency key
+    idempotency_cache_max_entries: int = 100_000
+    
+    # Counter rows per customer aggregate; writes for one customer spread over them
+    customer_aggregate_shards: int = 8
+    
+    # Range partitioning of the transactions table (PostgreSQL only):
+    # "day", "week", "month", "year" or "none"
+    transaction_partition_interval: str = "month"
+    transaction_partitions_ahead: int = 3
+    
+    # Apply pending schema migrations at startup instead of in a deploy step
+    db_migrate_on_startup: bool = False
+    
+    # Prometheus metrics on /metrics plus per-resolver instrumentation
+    metrics_enabled: bool = True
+    
+    # SQL profiling: per-request statement stats, slow-query log and plan
+    # capture for the named queries (e.g. "hourly_sales_rollup,sales_raw")
+    sql_profiler_enabled: bool = True
+    slow_query_threshold_ms: float = 200.0
+    sql_explain_queries: frozenset = frozenset()
+    
+    # GraphQL documents: parsed-document cache and persisted queries; with
+    # persisted_queries_only set, only registered documents are executed
+    document_cache_max_entries: int = 1000
+    persisted_queries_dir: str = ""
+    persisted_queries_only: bool = False
+    
+    # Connection pool (PostgreSQL). db_pool_min_connections are opened at
+    # startup; with db_pool_adaptive the overflow allowance is tuned between
+    # db_max_overflow and db_pool_adaptive_max_overflow from checkout waits
+    # and statement latency
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = -1
+    db_pool_pre_ping: bool = False
+    db_pool_min_connections: int = 5
+    db_pool_adaptive: bool = False
+    db_pool_adaptive_max_overflow: int = 50
+    db_pool_target_wait_ms: float = 10.0
+    db_pool_max_latency_ms: float = 100.0
+    db_pool_adjust_interval_seconds: float = 5.0
+    
+    # Read replicas for reporting queries (sales reports, exports); payments
+    # always go to the primary. Replicas lagging more than the staleness
+    # tolerance or failing health checks are skipped in favour of the primary
+    read_replica_urls: tuple = ()
+    replica_strategy: str = "round_robin"
+    replica_max_staleness_seconds: float = 5.0
+    replica_health_check_interval_seconds: float = 10.0
+    
+    # Streaming CSV/NDJSON/Arrow export of transactions and hourly sales.
+    # Exports include payment details, so requests must send export_token
+    # as a bearer token; without a token every request is refused
+    export_enabled: bool = False
+    export_token: str = ""
+    export_batch_size: int = 10_000
+    
     @classmethod
     def from_env(cls) -> "Settings":
         """Load settings from environment variables"""
@@ -26,6 +109,54 @@ class Settings:
             app_name=os.getenv("APP_NAME", "POS E-commerce Platform"),
             host=os.getenv("HOST", "0.0.0.0"),
             port=int(os.getenv("PORT", "8000")),
+            group_commit_enabled=_get_bool("GROUP_COMMIT_ENABLED", False),
+            group_commit_max_wait_ms=float(os.getenv("GROUP_COMMIT_MAX_WAIT_MS", "5.0")),
+            group_commit_max_batch_size=int(os.getenv("GROUP_COMMIT_MAX_BATCH_SIZE", "100")),
+            sales_cache_enabled=_get_bool("SALES_CACHE_ENABLED", False),
+            sales_cache_max_entries=int(os.getenv("SALES_CACHE_MAX_ENTRIES", "100000")),
+            sales_cache_grace_seconds=float(os.getenv("SALES_CACHE_GRACE_SECONDS", "300")),
+            sales_cache_ttl_seconds=float(os.getenv("SALES_CACHE_TTL_SECONDS", "300")),
+            sales_cache_warmup_hours=int(os.getenv("SALES_CACHE_WARMUP_HOURS", "168")),
+            idempotency_cache_max_entries=int(os.getenv("IDEMPOTENCY_CACHE_MAX_ENTRIES", "100000")),
+            customer_aggregate_shards=int(os.getenv("CUSTOMER_AGGREGATE_SHARDS", "8")),
+            transaction_partition_interval=os.getenv("TRANSACTION_PARTITION_INTERVAL", "month").lower(),
+            transaction_partitions_ahead=int(os.getenv("TRANSACTION_PARTITIONS_AHEAD", "3")),
+            db_migrate_on_startup=_get_bool("DB_MIGRATE_ON_STARTUP", False),
+            metrics_enabled=_get_bool("METRICS_ENABLED", True),
+            sql_profiler_enabled=_get_bool("SQL_PROFILER_ENABLED", True),
+            slow_query_threshold_ms=float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200")),
+            sql_explain_queries=frozenset(
+                name.strip()
+                for name in os.getenv("SQL_EXPLAIN_QUERIES", "").split(",")
+                if name.strip()
+            ),
+            document_cache_max_entries=int(os.getenv("DOCUMENT_CACHE_MAX_ENTRIES", "1000")),
+            persisted_queries_dir=os.getenv("PERSISTED_QUERIES_DIR", ""),
+            persisted_queries_only=_get_bool("PERSISTED_QUERIES_ONLY", False),
+            db_pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            db_pool_timeout_seconds=float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30")),
+            db_pool_recycle_seconds=int(os.getenv("DB_POOL_RECYCLE_SECONDS", "-1")),
+            db_pool_pre_ping=_get_bool("DB_POOL_PRE_PING", False),
+            db_pool_min_connections=int(os.getenv("DB_POOL_MIN_CONNECTIONS", "5")),
+            db_pool_adaptive=_get_bool("DB_POOL_ADAPTIVE", False),
+            db_pool_adaptive_max_overflow=int(os.getenv("DB_POOL_ADAPTIVE_MAX_OVERFLOW", "50")),
+            db_pool_target_wait_ms=float(os.getenv("DB_POOL_TARGET_WAIT_MS", "10")),
+            db_pool_max_latency_ms=float(os.getenv("DB_POOL_MAX_LATENCY_MS", "100")),
+            db_pool_adjust_interval_seconds=float(os.getenv("DB_POOL_ADJUST_INTERVAL_SECONDS", "5")),
+            read_replica_urls=tuple(
+                url.strip()
+                for url in os.getenv("READ_REPLICA_URLS", "").split(",")
+                if url.strip()
+            ),
+            replica_strategy=os.getenv("REPLICA_STRATEGY", "round_robin").lower(),
+            replica_max_staleness_seconds=float(os.getenv("REPLICA_MAX_STALENESS_SECONDS", "5")),
+            replica_health_check_interval_seconds=float(
+                os.getenv("REPLICA_HEALTH_CHECK_INTERVAL_SECONDS", "10")
+            ),
+            export_enabled=_get_bool("EXPORT_ENABLED", False),
+            export_token=os.getenv("EXPORT_TOKEN", ""),
+            export_batch_size=int(os.getenv("EXPORT_BATCH_SIZE", "10000")),
         )
 
 
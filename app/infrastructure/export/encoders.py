@@ -0,0 +1,242 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+from app.domain.value_objects.time_bucket import as_utc
+
+
+EXPORT_FORMATS = ("csv", "ndjson", "arrow")
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+FILE_EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "arrow": "arrows"}
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    """An exported column; ``kind`` is string, decimal, integer, datetime or json"""
+
+    name: str
+    kind: str
+    precision: int = 0
+    scale: int = 0
+
+
+TRANSACTION_COLUMNS: Tuple[ExportColumn, ...] = (
+    ExportColumn("id", "string"),
+    ExportColumn("customer_id", "string"),
+    ExportColumn("price", "decimal", 12, 2),
+    ExportColumn("price_modifier", "decimal", 5, 2),
+    ExportColumn("payment_method", "string"),
+    ExportColumn("transaction_datetime", "datetime"),
+    ExportColumn("final_price", "decimal", 12, 2),
+    ExportColumn("points", "integer"),
+    ExportColumn("additional_item", "json"),
+    ExportColumn("created_at", "datetime"),
+)
+
+SALES_COLUMNS: Tuple[ExportColumn, ...] = (
+    ExportColumn("datetime", "datetime"),
+    ExportColumn("sales", "decimal", 18, 2),
+    ExportColumn("points", "integer"),
+)
+
+
+def _text_value(value: Any, kind: str) -> Any:
+    """Value as written to CSV and NDJSON; None stays None"""
+    if value is None:
+        return None
+    if kind == "datetime":
+        return as_utc(value).isoformat()
+    if kind in ("decimal", "string"):
+        return str(value)
+    return value
+
+
+class CsvEncoder:
+    """Encodes row batches as CSV with a header line"""
+
+    def __init__(self, columns: Sequence[ExportColumn]):
+        self._columns = columns
+
+    def header(self) -> bytes:
+        return self._write([[column.name for column in self._columns]])
+
+    def encode(self, rows: List[Sequence[Any]]) -> bytes:
+        kinds = [column.kind for column in self._columns]
+        return self._write(
+            [
+                [
+                    json.dumps(value) if kind == "json" and value is not None else _text_value(value, kind)
+                    for value, kind in zip(row, kinds)
+                ]
+                for row in rows
+            ]
+        )
+
+    def footer(self) -> bytes:
+        return b""
+
+    @staticmethod
+    def _write(rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+
+class NdjsonEncoder:
+    """Encodes row batches as one JSON object per line"""
+
+    def __init__(self, columns: Sequence[ExportColumn]):
+        self._names = [column.name for column in columns]
+        self._kinds = [column.kind for column in columns]
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[Sequence[Any]]) -> bytes:
+        names, kinds = self._names, self._kinds
+        lines = [
+            json.dumps({
+                name: _text_value(value, kind)
+                for name, value, kind in zip(names, row, kinds)
+            })
+            for row in rows
+        ]
+        return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class _ChunkSink:
+    """Write-only file object collecting what the Arrow writer produces"""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ArrowEncoder:
+    """Encodes row batches as record batches of one Arrow IPC stream"""
+
+    def __init__(self, columns: Sequence[ExportColumn]):
+        try:
+            import pyarrow
+        except ImportError as e:
+            raise ValueError("Arrow export requires the pyarrow package") from e
+
+        self._pa = pyarrow
+        self._columns = columns
+        self._types = [self._arrow_type(column) for column in columns]
+        self._schema = pyarrow.schema(
+            [(column.name, arrow_type) for column, arrow_type in zip(columns, self._types)]
+        )
+        self._sink = _ChunkSink()
+        self._writer = None
+
+    def _arrow_type(self, column: ExportColumn):
+        pa = self._pa
+        if column.kind == "decimal":
+            return pa.decimal128(column.precision, column.scale)
+        if column.kind == "integer":
+            return pa.int64()
+        if column.kind == "datetime":
+            return pa.timestamp("us", tz="UTC")
+        return pa.string()
+
+    def header(self) -> bytes:
+        self._writer = self._pa.ipc.new_stream(self._sink, self._schema)
+        return self._sink.drain()
+
+    def encode(self, rows: List[Sequence[Any]]) -> bytes:
+        if not rows:
+            return b""
+        arrays = []
+        for index, (column, arrow_type) in enumerate(zip(self._columns, self._types)):
+            values = [row[index] for row in rows]
+            if column.kind == "json":
+                values = [None if value is None else json.dumps(value) for value in values]
+            elif column.kind == "string":
+                values = [None if value is None else str(value) for value in values]
+            elif column.kind == "datetime":
+                values = [None if value is None else as_utc(value) for value in values]
+            arrays.append(self._pa.array(values, type=arrow_type))
+        self._writer.write_batch(self._pa.record_batch(arrays, schema=self._schema))
+        return self._sink.drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+_ENCODERS = {"csv": CsvEncoder, "ndjson": NdjsonEncoder, "arrow": ArrowEncoder}
+
+
+def get_encoder(export_format: str, columns: Sequence[ExportColumn]):
+    """
+    Create the encoder of an export format
+
+    Raises:
+        ValueError: If the format is unknown or its dependency is missing
+    """
+    try:
+        encoder_class = _ENCODERS[export_format]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported export format '{export_format}'. Allowed values: {list(EXPORT_FORMATS)}"
+        )
+    return encoder_class(columns)
+
+
+async def encode_batches(
+    batches: AsyncIterator[List[Sequence[Any]]],
+    encoder,
+) -> AsyncIterator[bytes]:
+    """Encode row batches as they arrive, holding one batch in memory at a time"""
+    header = encoder.header()
+    if header:
+        yield header
+    async for rows in batches:
+        data = encoder.encode(rows)
+        if data:
+            yield data
+    footer = encoder.footer()
+    if footer:
+        yield footer
+
+
+async def sales_batches(
+    hours: AsyncIterator[Dict[str, Any]],
+    batch_size: int,
+) -> AsyncIterator[List[Tuple[datetime, Decimal, int]]]:
+    """Group streamed hourly sales into row batches in SALES_COLUMNS order"""
+    batch: List[Tuple[datetime, Decimal, int]] = []
+    async for hour in hours:
+        batch.append((hour["datetime"], hour["sales"], hour["points"]))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
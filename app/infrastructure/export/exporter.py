@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import AsyncIterator, Callable, Sequence
+
+from app.infrastructure.export.encoders import (
+    SALES_COLUMNS,
+    TRANSACTION_COLUMNS,
+    ExportColumn,
+    encode_batches,
+    sales_batches,
+)
+from app.infrastructure.persistence.database import get_read_session_context
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+
+
+EXPORT_DATASETS = ("transactions", "sales")
+
+
+def export_columns(dataset: str) -> Sequence[ExportColumn]:
+    """
+    Columns of an exportable dataset
+
+    Raises:
+        ValueError: If the dataset is unknown
+    """
+    if dataset == "transactions":
+        return TRANSACTION_COLUMNS
+    if dataset == "sales":
+        return SALES_COLUMNS
+    raise ValueError(f"Unsupported export dataset '{dataset}'. Allowed values: {list(EXPORT_DATASETS)}")
+
+
+async def stream_export(
+    dataset: str,
+    encoder,
+    start_datetime: datetime,
+    end_datetime: datetime,
+    batch_size: int,
+    session_context: Callable = get_read_session_context,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a dataset for a time range as encoded chunks
+
+    Transactions come straight from a server-side cursor and hourly sales
+    from the rollup, so memory use depends on the batch size only.
+    """
+    async with session_context() as session:
+        repository = SqlAlchemyTransactionRepository(session)
+        if dataset == "transactions":
+            batches = repository.stream_transaction_rows(start_datetime, end_datetime, batch_size)
+        else:
+            batches = sales_batches(
+                repository.stream_hourly_sales(start_datetime, end_datetime, batch_size),
+                batch_size,
+            )
+        async for chunk in encode_batches(batches, encoder):
+            yield chunk
@@ -0,0 +1,175 @@
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+plan_logger = logging.getLogger("app.sql.plan")
+
+# Execution option naming a statement for profiling, e.g. "hourly_sales_rollup"
+QUERY_NAME_OPTION = "query_name"
+
+_EXPLAIN_PREFIX = {
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+_EXPLAIN_ANALYZE_PREFIX = {
+    "postgresql": "EXPLAIN (ANALYZE, BUFFERS) ",
+}
+
+_START_ATTRIBUTE = "_profiler_started_at"
+_INTERNAL_OPTION = "_profiler_internal"
+
+
+@dataclass
+class QueryProfile:
+    """Statements executed on behalf of one request"""
+
+    statement_count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statement_count += 1
+        self.total_seconds += duration
+        if duration > self.slowest_seconds:
+            self.slowest_seconds = duration
+            self.slowest_statement = statement
+
+    def to_dict(self) -> dict:
+        return {
+            "statement_count": self.statement_count,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "slowest_ms": round(self.slowest_seconds * 1000, 3),
+            "slowest_statement": self.slowest_statement,
+        }
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+
+def current_profile() -> Optional[QueryProfile]:
+    """Get the profile of the request being handled, if any"""
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """Collect the statements executed inside the block into a new profile"""
+    profile = QueryProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def parameter_shapes(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Describe bound parameters by type only
+
+    Values are never logged: they can hold customer data such as card digits
+    or account numbers.
+    """
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": parameter_shapes(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def explain_prefix(dialect_name: str, statement: str) -> Optional[str]:
+    """EXPLAIN prefix for a statement; only SELECT statements are analyzed, as ANALYZE runs them again"""
+    if statement.lstrip().upper().startswith("SELECT"):
+        prefix = _EXPLAIN_ANALYZE_PREFIX.get(dialect_name)
+        if prefix is not None:
+            return prefix
+    return _EXPLAIN_PREFIX.get(dialect_name)
+
+
+class SqlProfiler:
+    """
+    Engine event hooks measuring every statement
+
+    Each statement is added to the current request's ``QueryProfile``;
+    statements slower than ``slow_query_threshold_ms`` are logged as JSON
+    with the shapes of their bound parameters. When ``explain_queries`` names
+    statements (through the ``query_name`` execution option), their plans
+    are captured after they run and logged as well.
+    """
+
+    def __init__(
+        self,
+        slow_query_threshold_ms: float = 200.0,
+        explain_queries: frozenset = frozenset(),
+    ):
+        self._slow_threshold = slow_query_threshold_ms / 1000
+        self._explain_queries = explain_queries
+
+    def install(self, engine: Engine) -> None:
+        """Register the hooks on a (sync) engine"""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            setattr(context, _START_ATTRIBUTE, perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, _START_ATTRIBUTE, None)
+        if started is None:
+            return
+        duration = perf_counter() - started
+
+        options = context.execution_options
+        if options.get(_INTERNAL_OPTION):
+            return
+
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record(statement, duration)
+
+        query_name = options.get(QUERY_NAME_OPTION)
+        if duration >= self._slow_threshold:
+            slow_query_logger.warning(json.dumps({
+                "event": "slow_query",
+                "query_name": query_name,
+                "duration_ms": round(duration * 1000, 3),
+                "statement": statement,
+                "parameters": parameter_shapes(parameters, executemany),
+            }))
+
+        if query_name in self._explain_queries and not executemany:
+            self._explain(conn, query_name, statement, parameters)
+
+    def _explain(self, conn, query_name: str, statement: str, parameters: Any) -> None:
+        prefix = explain_prefix(conn.dialect.name, statement)
+        if prefix is None:
+            return
+        try:
+            result = conn.exec_driver_sql(
+                prefix + statement,
+                parameters,
+                execution_options={_INTERNAL_OPTION: True},
+            )
+            plan = "\n".join(" ".join(str(column) for column in row) for row in result)
+        except Exception as e:
+            plan_logger.warning("Could not capture plan for %s: %s", query_name, e)
+            return
+        plan_logger.info(json.dumps({
+            "event": "query_plan",
+            "query_name": query_name,
+            "statement": statement,
+            "plan": plan,
+        }))
@@ -0,0 +1,21 @@
+from functools import lru_cache
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.infrastructure.persistence.models import CustomerAggregateShardModel
+
+
+@lru_cache
+def customer_upsert(dialect_name: str):
+    """Build the (cached) customer aggregate shard upsert statement for a dialect"""
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    table = CustomerAggregateShardModel.__table__
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.customer_id, table.c.shard],
+        set_={
+            "lifetime_spend": table.c.lifetime_spend + stmt.excluded.lifetime_spend,
+            "points_earned": table.c.points_earned + stmt.excluded.points_earned,
+            "transaction_count": table.c.transaction_count + stmt.excluded.transaction_count,
+        },
+    )
@@ -9,6 +9,14 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import DeclarativeBase
 
 from app.infrastructure.config.settings import get_settings
+from app.infrastructure.monitoring.sql_profiler import SqlProfiler
+from app.infrastructure.persistence.partitioning import ensure_partitions
+from app.infrastructure.persistence.pool import (
+    AdaptivePoolController,
+    InstrumentedAsyncQueuePool,
+    prewarm_pool,
+)
+from app.infrastructure.persistence.replicas import Replica, ReplicaRouter
 
 
 class Base(DeclarativeBase):
@@ -16,20 +24,34 @@ class Base(DeclarativeBase):
     pass
 
 
-# Create async engine
 settings = get_settings()
 
-# Configure engine based on database type
-engine_kwargs = {}
-if not settings.database_url.startswith("sqlite"):
-    # PostgreSQL-specific pool settings
-    engine_kwargs["pool_size"] = 10
-    engine_kwargs["max_overflow"] = 20
 
-engine = create_async_engine(
-    settings.database_url,
-    **engine_kwargs,
-)
+def _create_engine(database_url: str, name: str = "primary"):
+    """Create an engine configured based on database type"""
+    engine_kwargs = {}
+    if not database_url.startswith("sqlite"):
+        # PostgreSQL-specific pool settings
+        engine_kwargs["pool_size"] = settings.db_pool_size
+        engine_kwargs["max_overflow"] = settings.db_max_overflow
+        engine_kwargs["pool_timeout"] = settings.db_pool_timeout_seconds
+        engine_kwargs["pool_recycle"] = settings.db_pool_recycle_seconds
+        engine_kwargs["pool_pre_ping"] = settings.db_pool_pre_ping
+        engine_kwargs["pool_logging_name"] = name
+        engine_kwargs["poolclass"] = InstrumentedAsyncQueuePool
+
+    created = create_async_engine(database_url, **engine_kwargs)
+
+    if settings.sql_profiler_enabled:
+        SqlProfiler(
+            slow_query_threshold_ms=settings.slow_query_threshold_ms,
+            explain_queries=settings.sql_explain_queries,
+        ).install(created.sync_engine)
+    return created
+
+
+# Create async engine
+engine = _create_engine(settings.database_url)
 
 # Create async session factory
 async_session_factory = async_sessionmaker(
@@ -38,6 +60,31 @@ async_session_factory = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Reporting reads go to replicas when any are configured
+replica_router = ReplicaRouter(
+    async_session_factory,
+    replicas=[
+        Replica(name=f"replica{index}", engine=_create_engine(url, name=f"replica{index}"))
+        for index, url in enumerate(settings.read_replica_urls)
+    ],
+    strategy=settings.replica_strategy,
+    max_staleness_seconds=settings.replica_max_staleness_seconds,
+    health_check_interval_seconds=settings.replica_health_check_interval_seconds,
+)
+
+pool_controllers = [
+    AdaptivePoolController(
+        pooled_engine,
+        min_overflow=settings.db_max_overflow,
+        max_overflow=settings.db_pool_adaptive_max_overflow,
+        target_wait_ms=settings.db_pool_target_wait_ms,
+        max_db_latency_ms=settings.db_pool_max_latency_ms,
+        interval_seconds=settings.db_pool_adjust_interval_seconds,
+    )
+    for pooled_engine in [engine, *(replica.engine for replica in replica_router.replicas)]
+    if settings.db_pool_adaptive and isinstance(pooled_engine.pool, InstrumentedAsyncQueuePool)
+]
+
 
 @asynccontextmanager
 async def get_session_context() -> AsyncGenerator[AsyncSession, None]:
@@ -51,10 +98,32 @@ async def get_session_context() -> AsyncGenerator[AsyncSession, None]:
             raise e
 
 
-async def create_tables():
-    """Create all database tables"""
+def get_read_session_context():
+    """
+    Get a read-only session context, on a read replica when one is available
+
+    Use for reporting queries that tolerate replication lag; writes must
+    keep using ``get_session_context``.
+    """
+    return replica_router.session()
+
+
+async def ensure_upcoming_partitions():
+    """Create transaction partitions for the current and upcoming periods"""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await ensure_partitions(
+            conn,
+            table_name="transactions",
+            interval=settings.transaction_partition_interval,
+            ahead=settings.transaction_partitions_ahead,
+        )
+
+
+async def prewarm_connections():
+    """Open the minimum number of pooled connections before traffic arrives"""
+    for pooled_engine in [engine, *(replica.engine for replica in replica_router.replicas)]:
+        if isinstance(pooled_engine.pool, InstrumentedAsyncQueuePool):
+            await prewarm_pool(pooled_engine, settings.db_pool_min_connections)
 
 
 async def drop_tables():
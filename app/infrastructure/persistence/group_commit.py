@@ -0,0 +1,246 @@
+import asyncio
+import contextvars
+from dataclasses import dataclass, field
+from functools import lru_cache
+from time import perf_counter
+from typing import Callable, List, Optional
+
+from app.application.dto.payment_dto import PaymentResponse
+from app.domain.entities.transaction import Transaction
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.monitoring.metrics import get_metrics_registry
+from app.infrastructure.persistence.database import get_session_context
+from app.infrastructure.repositories.idempotency_repository import (
+    SqlAlchemyIdempotencyRepository,
+)
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+
+
+_registry = get_metrics_registry()
+
+GROUP_COMMIT_BATCH_SIZE = _registry.histogram(
+    "group_commit_batch_size",
+    "Transactions written per shared commit",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+GROUP_COMMIT_QUEUE_DELAY = _registry.histogram(
+    "group_commit_queue_delay_seconds",
+    "Time a write waited in the group commit queue before its batch was written",
+)
+GROUP_COMMIT_FAILED_BATCHES = _registry.counter(
+    "group_commit_failed_batches_total",
+    "Shared commits that failed and were retried write by write",
+)
+
+
+@dataclass
+class GroupCommitMetrics:
+    """Counters describing how well concurrent writes are being coalesced"""
+
+    batches: int = 0
+    transactions: int = 0
+    failed_batches: int = 0
+    max_batch_size: int = 0
+    total_queue_delay_seconds: float = 0.0
+    max_queue_delay_seconds: float = 0.0
+    writes: int = 0
+
+    def record_batch(self, size: int, queue_delays: List[float], failed: bool) -> None:
+        self.batches += 1
+        self.transactions += size
+        self.failed_batches += int(failed)
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.writes += len(queue_delays)
+        self.total_queue_delay_seconds += sum(queue_delays)
+        self.max_queue_delay_seconds = max(self.max_queue_delay_seconds, *queue_delays)
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.transactions / self.batches if self.batches else 0.0
+
+    @property
+    def average_queue_delay_seconds(self) -> float:
+        return self.total_queue_delay_seconds / self.writes if self.writes else 0.0
+
+
+@dataclass
+class _PendingWrite:
+    transactions: List[Transaction]
+    future: asyncio.Future
+    idempotency_key: Optional[str] = None
+    enqueued_at: float = field(default_factory=perf_counter)
+
+
+class GroupCommitter:
+    """
+    Coalesces concurrent transaction writes into shared database commits
+
+    Callers hand over their transactions and await the result; a background
+    worker collects pending writes for up to ``max_wait_ms`` or until
+    ``max_batch_size`` transactions are queued, persists them with one bulk
+    insert in a single database transaction and only then resolves every
+    caller. If a shared commit fails, each write is retried on its own so one
+    bad transaction does not fail its neighbours.
+
+    A payment's idempotency key is inserted in the same database transaction
+    as the payment, so a reused key rolls the payment back with it.
+    """
+
+    def __init__(
+        self,
+        session_context: Callable = get_session_context,
+        max_batch_size: int = 100,
+        max_wait_ms: float = 5.0,
+    ):
+        self._session_context = session_context
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.metrics = GroupCommitMetrics()
+
+    @property
+    def session_context(self) -> Callable:
+        return self._session_context
+
+    async def submit(self, transaction: Transaction, idempotency_key: Optional[str] = None) -> Transaction:
+        """
+        Persist a transaction, returning once its commit is durable
+
+        Raises:
+            IntegrityError: If ``idempotency_key`` was already used; the
+                transaction is then not persisted
+        """
+        await self._enqueue([transaction], idempotency_key)
+        return transaction
+
+    async def submit_many(self, transactions: List[Transaction]) -> List[Transaction]:
+        """Persist transactions atomically, returning once the commit is durable"""
+        if not transactions:
+            return transactions
+
+        await self._enqueue(transactions)
+        return transactions
+
+    async def _enqueue(self, transactions: List[Transaction], idempotency_key: Optional[str] = None) -> None:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_PendingWrite(
+            transactions=transactions,
+            future=future,
+            idempotency_key=idempotency_key,
+        ))
+        await future
+
+    async def close(self) -> None:
+        """Flush pending writes and stop the background worker"""
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._queue = None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            # A fresh context so the long-lived worker is not tied to the
+            # request that happened to start it (e.g. its query profile)
+            self._worker = contextvars.Context().run(asyncio.create_task, self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0].transactions)
+            deadline = loop.time() + self._max_wait
+
+            while size < self._max_batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        pending = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    pending = self._queue.get_nowait()
+                batch.append(pending)
+                size += len(pending.transactions)
+
+            try:
+                await self._commit(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit(self, batch: List[_PendingWrite]) -> None:
+        started = perf_counter()
+        transactions = [t for pending in batch for t in pending.transactions]
+        queue_delays = [started - pending.enqueued_at for pending in batch]
+
+        GROUP_COMMIT_BATCH_SIZE.observe(len(transactions))
+        for queue_delay in queue_delays:
+            GROUP_COMMIT_QUEUE_DELAY.observe(queue_delay)
+
+        try:
+            await self._write(batch)
+        except Exception as e:
+            self.metrics.record_batch(len(transactions), queue_delays, failed=True)
+            GROUP_COMMIT_FAILED_BATCHES.inc()
+            if len(batch) == 1:
+                _resolve(batch[0].future, e)
+                return
+            for pending in batch:
+                try:
+                    await self._write([pending])
+                except Exception as retry_error:
+                    _resolve(pending.future, retry_error)
+                else:
+                    _resolve(pending.future)
+            return
+
+        self.metrics.record_batch(len(transactions), queue_delays, failed=False)
+        for pending in batch:
+            _resolve(pending.future)
+
+    async def _write(self, batch: List[_PendingWrite]) -> None:
+        async with self._session_context() as session:
+            repository = SqlAlchemyTransactionRepository(session)
+            await repository.save_many([t for pending in batch for t in pending.transactions])
+
+            idempotency = SqlAlchemyIdempotencyRepository(session)
+            for pending in batch:
+                if pending.idempotency_key is not None:
+                    transaction = pending.transactions[0]
+                    await idempotency.save(
+                        pending.idempotency_key,
+                        PaymentResponse(final_price=transaction.final_price.to_string(), points=transaction.points),
+                    )
+
+
+def _resolve(future: asyncio.Future, error: Optional[Exception] = None) -> None:
+    # The caller may have been cancelled while its write was in flight
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+
+@lru_cache
+def get_group_committer() -> GroupCommitter:
+    """Get the shared in-process group committer"""
+    settings = get_settings()
+    return GroupCommitter(
+        max_batch_size=settings.group_commit_max_batch_size,
+        max_wait_ms=settings.group_commit_max_wait_ms,
+    )
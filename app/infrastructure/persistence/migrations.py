@@ -0,0 +1,275 @@
+"""
+Versioned schema migrations
+
+Migrations run once per deploy (``python -m app.tools.migrate``) rather than
+on every worker start. Applied versions are recorded in ``schema_migrations``;
+on PostgreSQL an advisory lock serialises concurrent runs, and all pending
+migrations are applied in one database transaction, so a failed deploy leaves
+the schema as it was.
+
+Version 1 creates the schema from the current models, so a fresh database
+already has everything later migrations add. Later migrations therefore
+have to tolerate objects that already exist (``IF NOT EXISTS``).
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Sequence, Set
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.domain.value_objects.additional_item import CourierService
+from app.domain.value_objects.payment_method import PAYMENT_METHOD_CODES
+from app.infrastructure.persistence.database import Base, engine, settings
+from app.infrastructure.persistence.models import TransactionModel
+from app.infrastructure.persistence.partitioning import ensure_partitions
+
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key of the PostgreSQL advisory lock held while migrating
+MIGRATION_LOCK_KEY = 0x706F735F6D6967
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change, applied at most once per database"""
+
+    version: int
+    description: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+
+
+async def _relation_exists(conn: AsyncConnection, name: str) -> bool:
+    if conn.dialect.name == "postgresql":
+        return await conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+    return await conn.scalar(text("SELECT COUNT(*) FROM sqlite_master WHERE name = :name"), {"name": name}) > 0
+
+
+async def _column_names(conn: AsyncConnection, table_name: str) -> Set[str]:
+    columns = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_columns(table_name))
+    return {column["name"] for column in columns}
+
+
+async def _create_schema(conn: AsyncConnection) -> None:
+    await conn.run_sync(Base.metadata.create_all)
+    await ensure_partitions(
+        conn,
+        table_name="transactions",
+        interval=settings.transaction_partition_interval,
+        ahead=settings.transaction_partitions_ahead,
+    )
+
+
+async def _transaction_datetime_indexes(conn: AsyncConnection) -> None:
+    # The covering index leads with transaction_datetime, so it replaces the
+    # plain B-tree. Indexes on a partitioned table cascade to its partitions.
+    if await _relation_exists(conn, "ix_transactions_datetime_covering"):
+        return
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_transactions_datetime_brin "
+            "ON transactions USING brin (transaction_datetime)"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_transactions_datetime_covering "
+            "ON transactions (transaction_datetime) INCLUDE (final_price, points)"
+        ))
+    else:
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_transactions_datetime_covering "
+            "ON transactions (transaction_datetime)"
+        ))
+    await conn.execute(text("DROP INDEX IF EXISTS ix_transactions_datetime"))
+
+
+def _additional_item_values(dialect_name: str) -> Dict[str, str]:
+    """SQL reading each typed additional item column from the JSON document, as AdditionalItem.from_dict does"""
+    def field(key: str) -> str:
+        if dialect_name == "postgresql":
+            return f"NULLIF(additional_item->>'{key}', '')"
+        return f"NULLIF(json_extract(additional_item, '$.{key}'), '')"
+
+    couriers = ", ".join(f"'{courier.value}'" for courier in CourierService)
+    return {
+        "last4": field("last4"),
+        "courier": f"CASE WHEN {field('courier')} IN ({couriers}) THEN {field('courier')} END",
+        "bank": field("bank"),
+        "account_number": f"COALESCE({field('accountNumber')}, {field('account_number')})",
+        "cheque_number": f"COALESCE({field('chequeNumber')}, {field('cheque_number')})",
+    }
+
+
+_METHOD_CODE = "CASE payment_method {} END".format(
+    " ".join(f"WHEN '{method.value}' THEN {code}" for method, code in PAYMENT_METHOD_CODES.items())
+)
+
+
+async def _compact_transactions(conn: AsyncConnection) -> None:
+    """
+    Convert existing rows to the compact layout
+
+    On SQLite the rows are copied into a table created from the model, in
+    its declared column order. PostgreSQL converts the table in place, so
+    the converted columns keep their original positions: an existing table
+    gets the smaller cents, code and typed item columns but keeps the
+    alignment padding of its old column order. Only tables created from the
+    model, as on a fresh database, get the padding-free order.
+    """
+    if "payment_method_code" in await _column_names(conn, "transactions"):
+        return
+    item_values = _additional_item_values(conn.dialect.name)
+
+    if conn.dialect.name == "postgresql":
+        # In place, so partitions and indexes stay; the final ALTER ... TYPE
+        # rewrites every partition, leaving no dead rows and storing the
+        # dropped JSON column as a null bit
+        await conn.execute(text(
+            "ALTER TABLE transactions "
+            "ADD COLUMN last4 VARCHAR(255), ADD COLUMN courier VARCHAR(16), ADD COLUMN bank VARCHAR(255), "
+            "ADD COLUMN account_number VARCHAR(255), ADD COLUMN cheque_number VARCHAR(255)"
+        ))
+        await conn.execute(text(
+            "UPDATE transactions SET "
+            + ", ".join(f"{column} = {value}" for column, value in item_values.items())
+            + " WHERE additional_item IS NOT NULL"
+        ))
+        await conn.execute(text("ALTER TABLE transactions DROP COLUMN additional_item"))
+        await conn.execute(text(
+            "ALTER TABLE transactions "
+            f"ALTER COLUMN payment_method TYPE SMALLINT USING ({_METHOD_CODE})::smallint, "
+            "ALTER COLUMN price TYPE BIGINT USING round(price * 100)::bigint, "
+            "ALTER COLUMN final_price TYPE BIGINT USING round(final_price * 100)::bigint"
+        ))
+        for old, new in (
+            ("payment_method", "payment_method_code"),
+            ("price", "price_cents"),
+            ("final_price", "final_price_cents"),
+        ):
+            await conn.execute(text(f"ALTER TABLE transactions RENAME COLUMN {old} TO {new}"))
+        return
+
+    # SQLite cannot change column types, so the rows move to a new table
+    await conn.execute(text("ALTER TABLE transactions RENAME TO transactions_legacy"))
+    await conn.execute(text("DROP INDEX IF EXISTS ix_transactions_datetime"))
+    await conn.execute(text("DROP INDEX IF EXISTS ix_transactions_datetime_covering"))
+    await conn.run_sync(TransactionModel.__table__.create)
+    values = {
+        "id": "id",
+        "transaction_datetime": "transaction_datetime",
+        "created_at": "created_at",
+        "price_cents": "CAST(ROUND(price * 100) AS INTEGER)",
+        "final_price_cents": "CAST(ROUND(final_price * 100) AS INTEGER)",
+        "points": "points",
+        "payment_method_code": _METHOD_CODE,
+        "price_modifier": "price_modifier",
+        "customer_id": "customer_id",
+        **item_values,
+    }
+    await conn.execute(text(
+        f"INSERT INTO transactions ({', '.join(values)}) "
+        f"SELECT {', '.join(values.values())} FROM transactions_legacy"
+    ))
+    await conn.execute(text("DROP TABLE transactions_legacy"))
+
+
+async def _unique_transaction_ids(conn: AsyncConnection) -> None:
+    # The primary key only needs transaction_datetime on a partitioned table
+    primary_key = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_pk_constraint("transactions"))
+    if primary_key["constrained_columns"] == ["id"]:
+        return
+    if conn.dialect.name == "postgresql":
+        partitioned = await conn.scalar(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('transactions'))"
+        ))
+        if not partitioned:
+            await conn.execute(text(
+                f"ALTER TABLE transactions DROP CONSTRAINT {primary_key['name']}, ADD PRIMARY KEY (id)"
+            ))
+        return
+    await conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_transactions_id ON transactions (id)"))
+
+
+MIGRATIONS: Sequence[Migration] = (
+    Migration(1, "Create the schema", _create_schema),
+    Migration(2, "Index transaction_datetime with BRIN and a covering B-tree", _transaction_datetime_indexes),
+    Migration(3, "Store transactions in the compact row layout", _compact_transactions),
+    Migration(4, "Key unpartitioned transactions by id alone", _unique_transaction_ids),
+)
+
+
+async def applied_versions(conn: AsyncConnection) -> List[int]:
+    """Versions already applied to the database, oldest first"""
+    exists = await conn.run_sync(
+        lambda sync_conn: sync_conn.dialect.has_table(sync_conn, schema_migrations.name)
+    )
+    if not exists:
+        return []
+    result = await conn.execute(select(schema_migrations.c.version).order_by(schema_migrations.c.version))
+    return list(result.scalars())
+
+
+async def pending_migrations(
+    conn: AsyncConnection,
+    migrations: Sequence[Migration] = MIGRATIONS,
+) -> List[Migration]:
+    """Migrations not yet applied, in version order"""
+    applied = set(await applied_versions(conn))
+    return sorted((m for m in migrations if m.version not in applied), key=lambda m: m.version)
+
+
+async def run_migrations(
+    conn: AsyncConnection,
+    migrations: Sequence[Migration] = MIGRATIONS,
+) -> List[Migration]:
+    """Apply pending migrations on a connection inside a transaction"""
+    if conn.dialect.name == "postgresql":
+        # Released when the transaction ends; other deploy jobs wait here
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+    await conn.run_sync(schema_migrations.create, checkfirst=True)
+    pending = await pending_migrations(conn, migrations)
+    for migration in pending:
+        logger.info("Applying migration %d: %s", migration.version, migration.description)
+        await migration.upgrade(conn)
+        await conn.execute(insert(schema_migrations).values(
+            version=migration.version,
+            description=migration.description,
+            applied_at=datetime.now(timezone.utc),
+        ))
+    return pending
+
+
+async def migrate() -> List[Migration]:
+    """Bring the application database up to the latest schema version"""
+    async with engine.begin() as conn:
+        return await run_migrations(conn)
+
+
+async def check_schema(db_engine: AsyncEngine = engine) -> int:
+    """
+    Warn when the database is behind the code; returns the number of pending migrations
+
+    Raises:
+        RuntimeError: If the database has no schema at all, so the app
+            cannot serve any request
+    """
+    async with db_engine.connect() as conn:
+        pending = await pending_migrations(conn)
+        if pending and pending[0] is MIGRATIONS[0] and not await _relation_exists(conn, "transactions"):
+            raise RuntimeError("Database has no schema; run python -m app.tools.migrate")
+    if pending:
+        logger.warning(
+            "Database schema is %d migration(s) behind; run python -m app.tools.migrate",
+            len(pending),
+        )
+    return len(pending)
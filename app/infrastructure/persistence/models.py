@@ -7,13 +7,34 @@ from sqlalchemy import (
     Numeric,
     DateTime,
     Integer,
-    JSON,
+    BigInteger,
+    SmallInteger,
     Index,
 )
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.infrastructure.config.settings import get_settings
 from app.infrastructure.persistence.database import Base
+from app.infrastructure.persistence.partitioning import is_partitioning_enabled
+
+
+settings = get_settings()
+
+# PostgreSQL declarative range partitioning on transaction_datetime; other
+# databases ignore the dialect option and create a plain table
+_transactions_partitioned = is_partitioning_enabled(settings.transaction_partition_interval)
+_transaction_table_options = {}
+_transaction_id_index = ()
+if _transactions_partitioned:
+    _transaction_table_options["postgresql_partition_by"] = "RANGE (transaction_datetime)"
+    # The primary key then includes transaction_datetime; where the table
+    # is not actually partitioned, ids are still kept unique
+    _transaction_id_index = (
+        Index("uq_transactions_id", "id", unique=True).ddl_if(
+            callable_=lambda ddl, target, bind, **kw: kw["dialect"].name != "postgresql"
+        ),
+    )
 
 
 class TransactionModel(Base):
@@ -21,33 +42,144 @@ class TransactionModel(Base):
     
     __tablename__ = "transactions"
     
+    # Compact row layout: money as integer cents, the payment method as a
+    # small-integer code (PAYMENT_METHOD_CODES) and the additional item as
+    # typed columns. Fixed-width columns come first, widest first, so
+    # PostgreSQL adds no alignment padding between them.
     id: Mapped[UUID] = mapped_column(
         PGUUID(as_uuid=True),
         primary_key=True,
     )
-    customer_id: Mapped[str] = mapped_column(String(255), nullable=False)
-    price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
-    price_modifier: Mapped[Decimal] = mapped_column(Numeric(5, 2), nullable=False)
-    payment_method: Mapped[str] = mapped_column(String(50), nullable=False)
-    transaction_datetime: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
-    final_price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
-    points: Mapped[int] = mapped_column(Integer, nullable=False)
-    additional_item: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Part of the primary key when partitioned, because a partitioned
+    # table's primary key has to include the partition key
+    transaction_datetime: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=_transactions_partitioned,
+        nullable=False,
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=datetime.utcnow,
         nullable=False,
     )
+    price_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    final_price_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    points: Mapped[int] = mapped_column(Integer, nullable=False)
+    payment_method_code: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    price_modifier: Mapped[Decimal] = mapped_column(Numeric(5, 2), nullable=False)
+    customer_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    last4: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    courier: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    bank: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    account_number: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    cheque_number: Mapped[str | None] = mapped_column(String(255), nullable=True)
     
-    # Index for efficient querying
+    # Existing databases get these indexes from migration 2 (see migrations.py)
     __table_args__ = (
-        Index("ix_transactions_datetime", "transaction_datetime"),
+        # Range lookups; on PostgreSQL the included columns let the hourly
+        # aggregation run as an index-only scan
+        Index(
+            "ix_transactions_datetime_covering",
+            "transaction_datetime",
+            postgresql_include=["final_price_cents", "points"],
+        ),
+        # A few pages summarising block ranges of the append-mostly timestamps
+        Index(
+            "ix_transactions_datetime_brin",
+            "transaction_datetime",
+            postgresql_using="brin",
+        ).ddl_if(dialect="postgresql"),
+        *_transaction_id_index,
+        _transaction_table_options,
     )
     
     def __repr__(self) -> str:
         return (
             f"<Transaction(id={self.id}, "
             f"customer_id={self.customer_id}, "
-            f"final_price={self.final_price})>"
+            f"final_price_cents={self.final_price_cents})>"
         )
 
+
+class HourlySalesRollupModel(Base):
+    """SQLAlchemy model for pre-aggregated hourly sales, maintained on every save"""
+    
+    __tablename__ = "hourly_sales_rollup"
+    
+    hour_bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    sales: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    points: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    transaction_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    
+    def __repr__(self) -> str:
+        return (
+            f"<HourlySalesRollup(hour_bucket={self.hour_bucket}, "
+            f"sales={self.sales}, "
+            f"transaction_count={self.transaction_count})>"
+        )
+
+
+class SalesRollupModel(Base):
+    """SQLAlchemy model for pre-aggregated sales at the minute, day and month levels"""
+    
+    __tablename__ = "sales_rollup"
+    
+    granularity: Mapped[str] = mapped_column(String(16), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    sales: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    points: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    transaction_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    
+    def __repr__(self) -> str:
+        return (
+            f"<SalesRollup(granularity={self.granularity}, "
+            f"bucket={self.bucket}, "
+            f"sales={self.sales})>"
+        )
+
+
+class CustomerAggregateShardModel(Base):
+    """
+    SQLAlchemy model for one shard of a customer's running totals
+    
+    Each save adds to one of a customer's shards, picked by transaction id, so
+    concurrent payments of one customer rarely wait on the same row lock. A
+    customer's totals are the sum over their shards.
+    """
+    
+    __tablename__ = "customer_aggregate_shards"
+    
+    customer_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    lifetime_spend: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    points_earned: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    transaction_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    
+    def __repr__(self) -> str:
+        return (
+            f"<CustomerAggregateShard(customer_id={self.customer_id}, "
+            f"shard={self.shard}, "
+            f"lifetime_spend={self.lifetime_spend})>"
+        )
+
+
+class PaymentIdempotencyModel(Base):
+    """SQLAlchemy model for the result of a payment made with an idempotency key"""
+    
+    __tablename__ = "payment_idempotency_keys"
+    
+    # The primary key's unique index is what rejects a second execution
+    idempotency_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    final_price: Mapped[str] = mapped_column(String(32), nullable=False)
+    points: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        nullable=False,
+    )
+    
+    def __repr__(self) -> str:
+        return (
+            f"<PaymentIdempotency(idempotency_key={self.idempotency_key}, "
+            f"final_price={self.final_price})>"
+        )
@@ -0,0 +1,131 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+logger = logging.getLogger(__name__)
+
+PARTITION_INTERVALS = ("day", "week", "month", "year")
+
+
+def is_partitioning_enabled(interval: str) -> bool:
+    """Whether an interval setting asks for a partitioned transactions table"""
+    if interval == "none":
+        return False
+    if interval not in PARTITION_INTERVALS:
+        raise ValueError(
+            f"Unsupported partition interval '{interval}'. "
+            f"Allowed values: {list(PARTITION_INTERVALS) + ['none']}"
+        )
+    return True
+
+
+def partition_start(value: datetime, interval: str) -> datetime:
+    """Start (UTC) of the partition containing a datetime"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=timezone.utc)
+
+    if interval == "day":
+        return day
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    if interval == "year":
+        return day.replace(month=1, day=1)
+    raise ValueError(f"Unsupported partition interval '{interval}'")
+
+
+def next_partition_start(start: datetime, interval: str) -> datetime:
+    """Start of the partition following the one starting at ``start``"""
+    if interval == "day":
+        return start + timedelta(days=1)
+    if interval == "week":
+        return start + timedelta(weeks=1)
+    if interval == "month":
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    if interval == "year":
+        return start.replace(year=start.year + 1)
+    raise ValueError(f"Unsupported partition interval '{interval}'")
+
+
+def partition_name(table_name: str, start: datetime, interval: str) -> str:
+    """Name of the partition starting at ``start``"""
+    if interval == "day":
+        return f"{table_name}_p{start:%Y_%m_%d}"
+    if interval == "week":
+        year, week, _ = start.isocalendar()
+        return f"{table_name}_p{year}w{week:02d}"
+    if interval == "month":
+        return f"{table_name}_p{start:%Y_%m}"
+    return f"{table_name}_p{start:%Y}"
+
+
+def upcoming_partitions(
+    now: datetime,
+    interval: str,
+    ahead: int,
+) -> List[Tuple[datetime, datetime]]:
+    """Bounds of the current partition and the ``ahead`` partitions after it"""
+    bounds = []
+    start = partition_start(now, interval)
+    for _ in range(ahead + 1):
+        end = next_partition_start(start, interval)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+async def ensure_partitions(
+    conn: AsyncConnection,
+    table_name: str,
+    interval: str,
+    ahead: int,
+    now: Optional[datetime] = None,
+) -> None:
+    """
+    Create the default partition plus the current and upcoming range partitions
+
+    Only acts on PostgreSQL tables that were created partitioned; other
+    databases keep a plain table. Safe to run repeatedly.
+    """
+    if conn.dialect.name != "postgresql" or not is_partitioning_enabled(interval):
+        return
+
+    relkind = await conn.scalar(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": table_name},
+    )
+    if relkind != "p":
+        logger.warning(
+            "Table %s is not partitioned; recreate it to enable %s partitions",
+            table_name,
+            interval,
+        )
+        return
+
+    # Rows outside every range partition land here instead of failing the insert
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {table_name}_default "
+        f"PARTITION OF {table_name} DEFAULT"
+    ))
+
+    for start, end in upcoming_partitions(now or datetime.now(timezone.utc), interval, ahead):
+        name = partition_name(table_name, start, interval)
+        try:
+            async with conn.begin_nested():
+                await conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} "
+                    f"PARTITION OF {table_name} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                ))
+        except DBAPIError as e:
+            # e.g. the default partition already holds rows for this range
+            logger.warning("Could not create partition %s: %s", name, e.orig)
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+from time import perf_counter, time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.infrastructure.monitoring.metrics import get_metrics_registry
+
+
+logger = logging.getLogger(__name__)
+
+_registry = get_metrics_registry()
+
+POOL_CHECKOUT_WAIT = _registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ("pool",),
+)
+POOL_CHECKED_OUT = _registry.gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    ("pool",),
+)
+POOL_OVERFLOW = _registry.gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond the pool size",
+    ("pool",),
+)
+POOL_LIMIT = _registry.gauge(
+    "db_pool_connection_limit",
+    "Most connections the pool may open (pool size plus allowed overflow)",
+    ("pool",),
+)
+POOL_CONNECTION_AGE = _registry.histogram(
+    "db_pool_connection_age_seconds",
+    "Age of connections when they are checked out",
+    ("pool",),
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 4 * 3600, 24 * 3600),
+)
+
+
+class _Window:
+    """Sum, count and maximum of observations since the last reset"""
+
+    __slots__ = ("total", "count", "peak")
+
+    def __init__(self):
+        self.reset()
+
+    def observe(self, value: float) -> None:
+        self.total += value
+        self.count += 1
+        self.peak = max(self.peak, value)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self) -> None:
+        self.total = 0.0
+        self.count = 0
+        self.peak = 0.0
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool publishing live telemetry
+
+    Records how long each checkout waits, the age of checked out connections
+    and keeps the checked-out, overflow and limit gauges current. The pool's
+    ``logging_name`` (set through ``pool_logging_name``) labels its metrics.
+    The connection limit can be changed at runtime with ``set_max_overflow``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.label = self._orig_logging_name or "primary"
+        # Read and reset by the adaptive controller
+        self.wait_window = _Window()
+        self.checked_out_window = _Window()
+        POOL_LIMIT.set(self.size() + self._max_overflow, (self.label,))
+
+    def connect(self):
+        started = perf_counter()
+        try:
+            connection = super().connect()
+        finally:
+            wait = perf_counter() - started
+            POOL_CHECKOUT_WAIT.observe(wait, (self.label,))
+            self.wait_window.observe(wait)
+
+        POOL_CONNECTION_AGE.observe(time() - connection._connection_record.starttime, (self.label,))
+        self._update_gauges()
+        return connection
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        checked_out = self.checkedout()
+        POOL_CHECKED_OUT.set(checked_out, (self.label,))
+        POOL_OVERFLOW.set(max(self.overflow(), 0), (self.label,))
+        self.checked_out_window.observe(checked_out)
+
+    @property
+    def max_overflow(self) -> int:
+        return self._max_overflow
+
+    def set_max_overflow(self, max_overflow: int) -> None:
+        """
+        Change how many connections may be opened beyond the pool size
+
+        Lowering it closes surplus connections as they are returned; checkouts
+        wait while more connections than the new limit are in use.
+        """
+        with self._overflow_lock:
+            self._max_overflow = max(0, max_overflow)
+        POOL_LIMIT.set(self.size() + self._max_overflow, (self.label,))
+
+
+async def prewarm_pool(engine: AsyncEngine, connections: int) -> int:
+    """
+    Open up to ``connections`` connections so that first requests find them
+
+    The connections are held at the same time, so each is a distinct one,
+    and then returned to the pool. Returns how many were opened.
+    """
+    connections = min(connections, engine.pool.size())
+    if connections <= 0:
+        return 0
+
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(await engine.connect())
+    finally:
+        for connection in opened:
+            await connection.close()
+    return len(opened)
+
+
+class AdaptivePoolController:
+    """
+    Grows or shrinks a pool's connection limit within bounds
+
+    Every ``interval_seconds`` the mean checkout wait and mean statement
+    latency of the last interval are compared with their targets:
+
+    - statements slower than ``max_db_latency_ms`` mean the database itself
+      is saturated, so the limit shrinks; more connections would only add load
+    - otherwise, waits above ``target_wait_ms`` grow the limit by ``step``
+    - waits well below target with the peak usage ``step`` or more under the
+      limit shrink it again
+
+    Only the overflow allowance changes, between ``min_overflow`` and
+    ``max_overflow``; the pool keeps ``pool_size`` idle connections.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        min_overflow: int,
+        max_overflow: int,
+        target_wait_ms: float = 10.0,
+        max_db_latency_ms: float = 100.0,
+        step: int = 2,
+        interval_seconds: float = 5.0,
+    ):
+        self._engine = engine
+        self._min_overflow = min_overflow
+        self._max_overflow = max(max_overflow, min_overflow)
+        self._target_wait = target_wait_ms / 1000
+        self._max_latency = max_db_latency_ms / 1000
+        self._step = step
+        self._interval = interval_seconds
+        self._latency = _Window()
+        self._task: Optional[asyncio.Task] = None
+
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["adaptive_pool_started"] = perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("adaptive_pool_started", None)
+        if started is not None:
+            self._latency.observe(perf_counter() - started)
+
+    def decide(
+        self,
+        current: int,
+        pool_size: int,
+        mean_wait: float,
+        mean_latency: float,
+        peak_checked_out: float,
+    ) -> int:
+        """New overflow allowance given the measurements of one interval"""
+        if mean_latency > self._max_latency:
+            proposed = current - self._step
+        elif mean_wait > self._target_wait:
+            proposed = current + self._step
+        elif mean_wait < self._target_wait / 4 and peak_checked_out <= pool_size + current - self._step:
+            proposed = current - self._step
+        else:
+            proposed = current
+        return min(max(proposed, self._min_overflow), self._max_overflow)
+
+    def adjust(self) -> int:
+        """Apply one control step to the engine's current pool"""
+        pool = self._engine.sync_engine.pool
+        current = pool.max_overflow
+        proposed = self.decide(
+            current,
+            pool.size(),
+            pool.wait_window.mean(),
+            self._latency.mean(),
+            pool.checked_out_window.peak,
+        )
+        pool.wait_window.reset()
+        pool.checked_out_window.reset()
+        self._latency.reset()
+
+        if proposed != current:
+            logger.info("Resizing pool %s overflow from %d to %d", pool.label, current, proposed)
+            pool.set_max_overflow(proposed)
+        return proposed
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                self.adjust()
+            except Exception:
+                logger.exception("Adaptive pool adjustment failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,177 @@
+import asyncio
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Callable, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.infrastructure.monitoring.metrics import get_metrics_registry
+
+
+logger = logging.getLogger(__name__)
+
+REPLICA_STRATEGIES = ("round_robin", "least_connections")
+
+_registry = get_metrics_registry()
+
+REPLICA_HEALTHY = _registry.gauge(
+    "db_replica_healthy",
+    "Whether a read replica passed its last health check (1) or not (0)",
+    ("replica",),
+)
+REPLICA_LAG = _registry.gauge(
+    "db_replica_lag_seconds",
+    "Replication lag of a read replica measured by the last health check",
+    ("replica",),
+)
+READ_SESSIONS = _registry.counter(
+    "db_read_sessions_total",
+    "Read-only sessions by the database they were routed to",
+    ("target",),
+)
+
+# Lag of a PostgreSQL standby; zero on a primary and on a standby that has
+# replayed everything it received (an idle primary would otherwise look stale)
+_POSTGRES_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class Replica:
+    """A read replica engine together with its last known health"""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        # Optimistic until the first check so that startup does not pin reads to the primary
+        self.healthy = True
+        self.lag_seconds = 0.0
+        self.in_flight = 0
+
+    def mark_unhealthy(self) -> None:
+        self.healthy = False
+        REPLICA_HEALTHY.set(0, (self.name,))
+
+
+class ReplicaRouter:
+    """
+    Routes read-only sessions to healthy, fresh read replicas
+
+    Replicas are chosen round-robin or by fewest sessions in flight. A
+    replica is skipped while its last health check failed or while its
+    replication lag exceeds ``max_staleness_seconds``; when no replica
+    qualifies, or the chosen one cannot be reached, the session goes to the
+    primary instead.
+    """
+
+    def __init__(
+        self,
+        primary_session_factory: Callable[[], AsyncSession],
+        replicas: Sequence[Replica] = (),
+        strategy: str = "round_robin",
+        max_staleness_seconds: float = 5.0,
+        health_check_interval_seconds: float = 10.0,
+        health_check_timeout_seconds: float = 2.0,
+    ):
+        if strategy not in REPLICA_STRATEGIES:
+            raise ValueError(
+                f"Unsupported replica strategy '{strategy}'. Allowed values: {list(REPLICA_STRATEGIES)}"
+            )
+        self._primary_session_factory = primary_session_factory
+        self.replicas: List[Replica] = list(replicas)
+        self._strategy = strategy
+        self._max_staleness = max_staleness_seconds
+        self._check_interval = health_check_interval_seconds
+        self._check_timeout = health_check_timeout_seconds
+        self._counter = itertools.count()
+
+    def available(self) -> List[Replica]:
+        """Replicas currently eligible for reads"""
+        return [
+            replica for replica in self.replicas
+            if replica.healthy and replica.lag_seconds <= self._max_staleness
+        ]
+
+    def select(self) -> Optional[Replica]:
+        """Pick the replica for the next read, or None to use the primary"""
+        candidates = self.available()
+        if not candidates:
+            return None
+        if self._strategy == "least_connections":
+            return min(candidates, key=lambda replica: replica.in_flight)
+        return candidates[next(self._counter) % len(candidates)]
+
+    @asynccontextmanager
+    async def session(self) -> AsyncGenerator[AsyncSession, None]:
+        """Get a read-only session on a replica, or on the primary as a fallback"""
+        replica = self.select()
+        if replica is not None:
+            async with replica.session_factory() as session:
+                try:
+                    # Connect up front so an unreachable replica falls back
+                    await session.connection()
+                except (DBAPIError, OSError) as e:
+                    logger.warning("Read replica %s unavailable, using primary: %s", replica.name, e)
+                    replica.mark_unhealthy()
+                else:
+                    READ_SESSIONS.inc((replica.name,))
+                    replica.in_flight += 1
+                    try:
+                        yield session
+                        await session.commit()
+                    except Exception:
+                        await session.rollback()
+                        raise
+                    finally:
+                        replica.in_flight -= 1
+                    return
+
+        READ_SESSIONS.inc(("primary",))
+        async with self._primary_session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def check(self, replica: Replica) -> None:
+        """Probe a replica and record whether it is reachable and how far behind"""
+        try:
+            async with asyncio.timeout(self._check_timeout):
+                async with replica.engine.connect() as conn:
+                    if conn.dialect.name == "postgresql":
+                        lag = await conn.scalar(_POSTGRES_LAG_QUERY)
+                    else:
+                        lag = await conn.scalar(text("SELECT 0"))
+        except (DBAPIError, OSError, TimeoutError) as e:
+            if replica.healthy:
+                logger.warning("Read replica %s failed its health check: %s", replica.name, e)
+            replica.mark_unhealthy()
+        else:
+            replica.healthy = True
+            replica.lag_seconds = float(lag or 0)
+            REPLICA_HEALTHY.set(1, (replica.name,))
+            REPLICA_LAG.set(replica.lag_seconds, (replica.name,))
+
+    async def check_all(self) -> None:
+        """Probe every replica concurrently"""
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def run_health_checks(self) -> None:
+        """Keep probing replicas every ``health_check_interval_seconds``"""
+        while True:
+            await asyncio.sleep(self._check_interval)
+            await self.check_all()
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
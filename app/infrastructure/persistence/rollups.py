@@ -0,0 +1,120 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+from sqlalchemy import Float, Numeric, cast, func, literal_column
+
+from app.domain.value_objects.granularity import (
+    Granularity,
+    ceil_bucket,
+    floor_bucket,
+    nests_in,
+)
+from app.domain.value_objects.time_bucket import RESOLUTION, as_utc
+
+
+# Pre-aggregated levels, coarsest first. HOUR lives in hourly_sales_rollup,
+# the others in sales_rollup. FIVE_MINUTES and WEEK are summed from MINUTE
+# and DAY at read time.
+STORED_LEVELS = (Granularity.MONTH, Granularity.DAY, Granularity.HOUR, Granularity.MINUTE)
+
+# Levels kept in the sales_rollup table, maintained on every save
+SALES_ROLLUP_LEVELS = (Granularity.MINUTE, Granularity.DAY, Granularity.MONTH)
+
+_POSTGRES_UNITS = {
+    Granularity.MINUTE: "minute",
+    Granularity.HOUR: "hour",
+    Granularity.DAY: "day",
+    Granularity.MONTH: "month",
+}
+
+_SQLITE_FORMATS = {
+    Granularity.MINUTE: "%Y-%m-%d %H:%M:00.000000",
+    Granularity.HOUR: "%Y-%m-%d %H:00:00.000000",
+    Granularity.DAY: "%Y-%m-%d 00:00:00.000000",
+    Granularity.MONTH: "%Y-%m-01 00:00:00.000000",
+}
+
+
+def bucket_trunc(column, level: Granularity, dialect_name: str):
+    """SQL expression truncating a timestamp column to the UTC bucket of a stored level"""
+    if dialect_name == "postgresql":
+        # Literals rather than bound parameters so the expression is
+        # recognised as identical in SELECT and GROUP BY
+        utc = literal_column("'UTC'")
+        unit = literal_column(f"'{_POSTGRES_UNITS[level]}'")
+        return func.timezone(utc, func.date_trunc(unit, func.timezone(utc, column)))
+    return func.strftime(_SQLITE_FORMATS[level], column)
+
+
+def cents_to_amount(expression, dialect_name: str):
+    """SQL expression turning integer cents (e.g. a sum of final_price_cents) into an amount"""
+    if dialect_name == "postgresql":
+        return cast(expression, Numeric(18, 2)) / 100
+    # SQLite divides integers as integers and has no exact decimal type
+    return cast(expression, Float) / 100
+
+
+@dataclass(frozen=True)
+class RollupRead:
+    """Read of the buckets of one stored level, first and last bucket inclusive"""
+
+    level: Granularity
+    first_bucket: datetime
+    last_bucket: datetime
+
+
+@dataclass
+class RollupPlan:
+    """Rollup reads plus sub-minute spans that have to be aggregated from raw rows"""
+
+    reads: List[RollupRead] = field(default_factory=list)
+    raw_spans: List[Tuple[datetime, datetime]] = field(default_factory=list)
+
+
+def plan_rollup_reads(
+    start_datetime: datetime,
+    end_datetime: datetime,
+    granularity: Granularity,
+) -> RollupPlan:
+    """
+    Cover an inclusive range with the fewest, coarsest pre-aggregated buckets
+
+    Only levels whose buckets nest in ``granularity`` are used, so every
+    bucket read sums into exactly one requested bucket. The coarsest level
+    takes the middle of the range and the leftovers at both edges fall to
+    the next finer level, down to spans shorter than a minute, which are
+    aggregated from raw transactions. Each span in ``raw_spans`` lies within
+    a single minute.
+    """
+    plan = RollupPlan()
+    start = as_utc(start_datetime)
+    end = as_utc(end_datetime)
+    if start > end:
+        return plan
+
+    levels = [level for level in STORED_LEVELS if nests_in(level, granularity)]
+    _cover(start, end + RESOLUTION, levels, plan)
+    plan.reads.sort(key=lambda read: read.first_bucket)
+    plan.raw_spans.sort()
+    return plan
+
+
+def _cover(lower: datetime, upper: datetime, levels: Sequence[Granularity], plan: RollupPlan) -> None:
+    """Plan the half-open span ``[lower, upper)``"""
+    if lower >= upper:
+        return
+    if not levels:
+        plan.raw_spans.append((lower, upper - RESOLUTION))
+        return
+
+    level, finer = levels[0], levels[1:]
+    first = ceil_bucket(lower, level)
+    stop = floor_bucket(upper, level)
+    if first >= stop:
+        _cover(lower, upper, finer, plan)
+        return
+
+    plan.reads.append(RollupRead(level, first, floor_bucket(stop - RESOLUTION, level)))
+    _cover(lower, first, finer, plan)
+    _cover(stop, upper, finer, plan)
@@ -0,0 +1,192 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.domain.entities.transaction import Transaction
+from app.domain.repositories.transaction_repository import TransactionRepository
+from app.domain.value_objects.granularity import Granularity
+from app.domain.value_objects.time_bucket import (
+    HOUR,
+    RESOLUTION,
+    as_utc,
+    floor_hour,
+)
+from app.infrastructure.cache.hourly_sales_cache import HourlySalesCache, MISSING
+
+
+# Callbacks run once the session's outermost transaction has ended
+_ON_TRANSACTION_END = "on_transaction_end"
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _run_transaction_end_callbacks(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        for callback in session.info.pop(_ON_TRANSACTION_END, ()):
+            callback()
+
+
+def _after_transaction_end(session: AsyncSession, callback: Callable[[], None]) -> None:
+    session.sync_session.info.setdefault(_ON_TRANSACTION_END, []).append(callback)
+
+
+class CachedTransactionRepository(TransactionRepository):
+    """
+    Transaction repository decorator that caches hourly sales of closed hours
+
+    Hours that are fully inside the requested range and closed are served
+    from the cache; everything else (the current hour, hours inside the
+    late-arrival grace window and partially covered edge hours) is read from
+    the wrapped repository, one query per contiguous span of uncached hours.
+    Writes invalidate the hours they touch, and those hours are not cached
+    until the write's database transaction has ended: the ``session`` the
+    wrapped repository writes in, or the save call itself without one (as
+    with group commit, where saves return once committed). Rebuilding the
+    rollups through this repository invalidates every hour.
+    """
+
+    def __init__(
+        self,
+        repository: TransactionRepository,
+        cache: HourlySalesCache,
+        session: Optional[AsyncSession] = None,
+    ):
+        self._repository = repository
+        self._cache = cache
+        self._session = session
+
+    async def save(self, transaction: Transaction) -> Transaction:
+        """Save a transaction and invalidate its cached hour"""
+        async with self._writing([transaction]):
+            return await self._repository.save(transaction)
+
+    async def save_many(self, transactions: List[Transaction]) -> List[Transaction]:
+        """Save a batch of transactions and invalidate their cached hours"""
+        async with self._writing(transactions):
+            return await self._repository.save_many(transactions)
+
+    async def rebuild_hourly_sales_rollup(self) -> None:
+        """Rebuild the wrapped repository's rollups and drop every cached hour"""
+        self._cache.invalidate_all()
+        try:
+            await self._repository.rebuild_hourly_sales_rollup()
+        finally:
+            if self._session is not None and self._session.in_transaction():
+                _after_transaction_end(self._session, self._cache.invalidate_all)
+            else:
+                self._cache.invalidate_all()
+
+    @asynccontextmanager
+    async def _writing(self, transactions: List[Transaction]):
+        hour_buckets = {as_utc(t.hour_bucket) for t in transactions}
+        self._cache.begin_write(hour_buckets)
+        try:
+            yield
+        finally:
+            if self._session is not None and self._session.in_transaction():
+                _after_transaction_end(self._session, lambda: self._cache.end_write(hour_buckets))
+            else:
+                self._cache.end_write(hour_buckets)
+
+    async def get_hourly_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Get aggregated hourly sales within a date range"""
+        start = as_utc(start_datetime)
+        end = as_utc(end_datetime)
+        if start > end:
+            return []
+
+        token = self._cache.write_token()
+        result: List[dict] = []
+        span_start = None
+        hour = floor_hour(start)
+
+        while hour <= end and (limit is None or len(result) < limit):
+            cached = MISSING
+            if start <= hour and hour + HOUR - RESOLUTION <= end and self._cache.is_closed(hour):
+                cached = self._cache.get(hour)
+
+            if cached is MISSING:
+                if span_start is None:
+                    span_start = hour
+            else:
+                if span_start is not None:
+                    result.extend(await self._fetch(
+                        span_start, hour, start, end, _remaining(result, limit), token
+                    ))
+                    span_start = None
+                if cached is not None and (limit is None or len(result) < limit):
+                    result.append(cached)
+            hour += HOUR
+
+        if span_start is not None and (limit is None or len(result) < limit):
+            result.extend(await self._fetch(span_start, hour, start, end, _remaining(result, limit), token))
+
+        return result
+
+    async def stream_hourly_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+    ) -> AsyncIterator[dict]:
+        """Stream aggregated hourly sales straight from the wrapped repository"""
+        async for hour in self._repository.stream_hourly_sales(start_datetime, end_datetime):
+            yield hour
+
+    async def get_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        granularity: Granularity,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Get sales per bucket from the wrapped repository's rollups, uncached"""
+        return await self._repository.get_sales(start_datetime, end_datetime, granularity, limit)
+
+    async def warm_up(self, hours: int) -> None:
+        """Preload the most recent closed hours into the cache"""
+        if hours <= 0:
+            return
+
+        end = floor_hour(datetime.now(timezone.utc))
+        await self.get_hourly_sales(end - hours * HOUR, end - RESOLUTION)
+
+    async def _fetch(
+        self,
+        span_start: datetime,
+        span_end: datetime,
+        start: datetime,
+        end: datetime,
+        limit: Optional[int],
+        token: int,
+    ) -> List[dict]:
+        """Read the hours in [span_start, span_end) from the wrapped repository"""
+        rows = await self._repository.get_hourly_sales(
+            start_datetime=max(start, span_start),
+            end_datetime=min(end, span_end - RESOLUTION),
+            limit=limit,
+        )
+        by_hour = {as_utc(row["datetime"]): row for row in rows}
+
+        if limit is not None and len(rows) >= limit:
+            # Truncated: hours after the last returned one are unknown, not empty
+            span_end = as_utc(rows[-1]["datetime"]) + HOUR
+
+        hour = span_start
+        while hour < span_end:
+            if start <= hour and hour + HOUR - RESOLUTION <= end:
+                self._cache.put(hour, by_hour.get(hour), token)
+            hour += HOUR
+
+        return rows
+
+
+def _remaining(result: List[dict], limit: Optional[int]) -> Optional[int]:
+    return None if limit is None else limit - len(result)
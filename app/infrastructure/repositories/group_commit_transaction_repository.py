@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from app.domain.entities.transaction import Transaction
+from app.domain.repositories.transaction_repository import TransactionRepository
+from app.domain.value_objects.granularity import Granularity
+from app.infrastructure.persistence.group_commit import GroupCommitter
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+
+
+class GroupCommitTransactionRepository(TransactionRepository):
+    """
+    Transaction repository that hands writes to a shared group committer
+    
+    With an ``idempotency_key``, the key of the saved payment is committed
+    in the same database transaction as the payment itself.
+    """
+    
+    def __init__(self, committer: GroupCommitter, idempotency_key: Optional[str] = None):
+        self._committer = committer
+        self._idempotency_key = idempotency_key
+    
+    async def save(self, transaction: Transaction) -> Transaction:
+        """Save a transaction as part of the next group commit"""
+        return await self._committer.submit(transaction, self._idempotency_key)
+    
+    async def save_many(self, transactions: List[Transaction]) -> List[Transaction]:
+        """Save a batch of transactions as part of the next group commit"""
+        return await self._committer.submit_many(transactions)
+    
+    async def get_hourly_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Get aggregated hourly sales within a date range"""
+        async with self._committer.session_context() as session:
+            repository = SqlAlchemyTransactionRepository(session)
+            return await repository.get_hourly_sales(start_datetime, end_datetime, limit)
+    
+    async def get_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        granularity: Granularity,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Get aggregated sales per bucket within a date range"""
+        async with self._committer.session_context() as session:
+            repository = SqlAlchemyTransactionRepository(session)
+            return await repository.get_sales(start_datetime, end_datetime, granularity, limit)
+    
+    async def stream_hourly_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+    ) -> AsyncIterator[dict]:
+        """Stream aggregated hourly sales within a date range"""
+        async with self._committer.session_context() as session:
+            repository = SqlAlchemyTransactionRepository(session)
+            async for hour in repository.stream_hourly_sales(start_datetime, end_datetime):
+                yield hour
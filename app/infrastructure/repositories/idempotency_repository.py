@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.dto.payment_dto import PaymentResponse
+from app.infrastructure.persistence.models import PaymentIdempotencyModel
+
+
+IDEMPOTENCY_INSERT = insert(PaymentIdempotencyModel.__table__)
+
+
+class SqlAlchemyIdempotencyRepository:
+    """Stores payment results by idempotency key"""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get(self, idempotency_key: str) -> Optional[PaymentResponse]:
+        """Get the stored result for a key, if a payment was made with it"""
+        result = await self._session.execute(
+            select(PaymentIdempotencyModel.final_price, PaymentIdempotencyModel.points)
+            .where(PaymentIdempotencyModel.idempotency_key == idempotency_key)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return PaymentResponse(final_price=row.final_price, points=row.points)
+
+    async def save(self, idempotency_key: str, response: PaymentResponse) -> None:
+        """
+        Store the result of a payment made with a key
+
+        Raises ``IntegrityError`` when the key was already used, which rolls
+        back anything written in the same database transaction.
+        """
+        await self._session.execute(
+            IDEMPOTENCY_INSERT,
+            {
+                "idempotency_key": idempotency_key,
+                "final_price": response.final_price,
+                "points": response.points,
+                "created_at": datetime.now(timezone.utc),
+            },
+        )
@@ -0,0 +1,122 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.repositories.customer_repository import CustomerRepository
+from app.domain.value_objects.cents_money import CentsMoney
+from app.infrastructure.monitoring.sql_profiler import QUERY_NAME_OPTION
+from app.infrastructure.persistence.customer_aggregates import customer_upsert
+from app.infrastructure.persistence.models import CustomerAggregateShardModel, TransactionModel
+from app.infrastructure.persistence.rollups import cents_to_amount
+
+
+# Lifetime spend, points earned and transaction count
+CustomerTotals = Tuple[Decimal, int, int]
+
+
+def _to_totals(spend, points, count) -> CustomerTotals:
+    return Decimal(str(spend)).quantize(Decimal("0.01")), int(points), int(count)
+
+
+class SqlAlchemyCustomerRepository(CustomerRepository):
+    """Reads and maintains the sharded per-customer aggregates"""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get_summary(self, customer_id: str) -> Optional[dict]:
+        """Sum a customer's aggregate shards; a primary key lookup of a few rows"""
+        result = await self._session.execute(
+            select(
+                func.sum(CustomerAggregateShardModel.lifetime_spend),
+                func.sum(CustomerAggregateShardModel.points_earned),
+                func.sum(CustomerAggregateShardModel.transaction_count),
+            )
+            .where(CustomerAggregateShardModel.customer_id == customer_id)
+            .execution_options(**{QUERY_NAME_OPTION: "customer_summary"})
+        )
+        row = result.one()
+        if not row[2]:
+            return None
+
+        spend, points, count = _to_totals(*row)
+        return {"lifetime_spend": spend, "points_earned": points, "transaction_count": count}
+
+    async def raw_totals(self, start: datetime, end: datetime) -> Dict[str, CustomerTotals]:
+        """Aggregate raw transactions per customer within ``[start, end)``"""
+        result = await self._session.execute(
+            select(
+                TransactionModel.customer_id,
+                func.sum(TransactionModel.final_price_cents),
+                func.sum(TransactionModel.points),
+                func.count(),
+            )
+            .where(TransactionModel.transaction_datetime >= start)
+            .where(TransactionModel.transaction_datetime < end)
+            .group_by(TransactionModel.customer_id)
+            .execution_options(**{QUERY_NAME_OPTION: "customer_raw_totals"})
+        )
+        return {
+            customer_id: _to_totals(CentsMoney(int(cents)).amount, points, count)
+            for customer_id, cents, points, count in result.all()
+        }
+
+    async def stored_totals(self) -> Dict[str, CustomerTotals]:
+        """Current aggregates of every customer, summed over shards; all-zero totals are left out"""
+        result = await self._session.execute(
+            select(
+                CustomerAggregateShardModel.customer_id,
+                func.sum(CustomerAggregateShardModel.lifetime_spend),
+                func.sum(CustomerAggregateShardModel.points_earned),
+                func.sum(CustomerAggregateShardModel.transaction_count),
+            )
+            .group_by(CustomerAggregateShardModel.customer_id)
+            .having(or_(
+                func.sum(CustomerAggregateShardModel.lifetime_spend) != 0,
+                func.sum(CustomerAggregateShardModel.points_earned) != 0,
+                func.sum(CustomerAggregateShardModel.transaction_count) != 0,
+            ))
+            .execution_options(**{QUERY_NAME_OPTION: "customer_stored_totals"})
+        )
+        return {customer_id: _to_totals(*totals) for customer_id, *totals in result.all()}
+
+    async def adjust(self, deltas: Dict[str, CustomerTotals]) -> None:
+        """
+        Add corrections to shard 0 of some customers' totals
+
+        Corrections are increments, like the ones payments make, so payments
+        committed by other sessions in the meantime are kept.
+        """
+        dialect_name = self._session.get_bind().dialect.name
+        rows = [
+            {
+                "customer_id": customer_id,
+                "shard": 0,
+                "lifetime_spend": spend,
+                "points_earned": points,
+                "transaction_count": count,
+            }
+            for customer_id, (spend, points, count) in sorted(deltas.items())
+        ]
+        if rows:
+            await self._session.execute(customer_upsert(dialect_name), rows)
+
+    async def rebuild(self) -> None:
+        """Recompute every customer's aggregate from raw transactions in one statement"""
+        dialect_name = self._session.get_bind().dialect.name
+        await self._session.execute(delete(CustomerAggregateShardModel))
+        await self._session.execute(
+            insert(CustomerAggregateShardModel).from_select(
+                ["customer_id", "shard", "lifetime_spend", "points_earned", "transaction_count"],
+                select(
+                    TransactionModel.customer_id,
+                    literal(0),
+                    cents_to_amount(func.sum(TransactionModel.final_price_cents), dialect_name),
+                    func.sum(TransactionModel.points),
+                    func.count(),
+                ).group_by(TransactionModel.customer_id),
+            ).execution_options(**{QUERY_NAME_OPTION: "customer_rebuild"})
+        )
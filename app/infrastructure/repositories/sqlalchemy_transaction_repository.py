@@ -1,91 +1,568 @@
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import List
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import Row, select, func, insert, delete, literal
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.entities.transaction import Transaction
 from app.domain.repositories.transaction_repository import TransactionRepository
-from app.domain.value_objects.payment_method import PaymentMethod
-from app.domain.value_objects.money import Money
-from app.domain.value_objects.additional_item import AdditionalItem
-from app.infrastructure.persistence.models import TransactionModel
+from app.domain.value_objects.payment_method import PAYMENT_METHOD_CODES, PAYMENT_METHODS_BY_CODE
+from app.domain.value_objects.cents_money import CentsMoney
+from app.domain.value_objects.additional_item import AdditionalItem, CourierService
+from app.domain.value_objects.granularity import Granularity, floor_bucket
+from app.domain.value_objects.time_bucket import (
+    HOUR,
+    RESOLUTION,
+    as_utc,
+    ceil_hour,
+    floor_hour,
+)
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.persistence.customer_aggregates import customer_upsert
+from app.infrastructure.persistence.models import (
+    TransactionModel,
+    HourlySalesRollupModel,
+    SalesRollupModel,
+)
+from app.infrastructure.persistence.rollups import (
+    SALES_ROLLUP_LEVELS,
+    RollupPlan,
+    RollupRead,
+    bucket_trunc,
+    cents_to_amount,
+    plan_rollup_reads,
+)
+from app.infrastructure.monitoring.sql_profiler import QUERY_NAME_OPTION
+
+
+@lru_cache
+def _rollup_upsert(dialect_name: str):
+    """Build the (cached) hourly rollup upsert statement for a dialect"""
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    table = HourlySalesRollupModel.__table__
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.hour_bucket],
+        set_={
+            "sales": table.c.sales + stmt.excluded.sales,
+            "points": table.c.points + stmt.excluded.points,
+            "transaction_count": table.c.transaction_count + stmt.excluded.transaction_count,
+        },
+    )
+
+
+@lru_cache
+def _sales_rollup_upsert(dialect_name: str):
+    """Build the (cached) minute/day/month rollup upsert statement for a dialect"""
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    table = SalesRollupModel.__table__
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.granularity, table.c.bucket],
+        set_={
+            "sales": table.c.sales + stmt.excluded.sales,
+            "points": table.c.points + stmt.excluded.points,
+            "transaction_count": table.c.transaction_count + stmt.excluded.transaction_count,
+        },
+    )
+
+
+CUSTOMER_SHARDS = max(1, get_settings().customer_aggregate_shards)
+
+_COPY_COLUMNS = tuple(column.name for column in TransactionModel.__table__.columns)
+
+# Core insert shared by every save: entities carry their own id and
+# created_at, so no RETURNING round trip is needed, and reusing one
+# statement object lets SQLAlchemy serve its compiled form from the cache
+TRANSACTION_INSERT = insert(TransactionModel.__table__)
+
+
+def _plan_hours(start_datetime: datetime, end_datetime: datetime) -> Tuple[
+    List[Tuple[datetime, datetime]],
+    Optional[Tuple[datetime, datetime]],
+    List[Tuple[datetime, datetime]],
+]:
+    """
+    Split an inclusive range into raw-row spans and complete rollup hours
+
+    Returns the partial-hour spans before the complete hours, the first and
+    last complete hour (or None when there is none) and the partial-hour
+    spans after them. Every span lies within a single hour.
+    """
+    start = as_utc(start_datetime)
+    end = as_utc(end_datetime)
+    if start > end:
+        return [], None, []
+
+    first_full_hour = ceil_hour(start)
+    last_full_hour = floor_hour(end + RESOLUTION) - HOUR
+
+    if first_full_hour > last_full_hour:
+        # No complete hour in range: at most two partial hours
+        boundary = floor_hour(end)
+        if boundary <= start:
+            return [(start, end)], None, []
+        return [(start, boundary - RESOLUTION), (boundary, end)], None, []
+
+    head = [(start, first_full_hour - RESOLUTION)] if start < first_full_hour else []
+    tail = [(last_full_hour + HOUR, end)] if last_full_hour + HOUR <= end else []
+    return head, (first_full_hour, last_full_hour), tail
+
+
+def _rollup_query(first_hour: datetime, last_hour: datetime):
+    return (
+        select(
+            HourlySalesRollupModel.hour_bucket,
+            HourlySalesRollupModel.sales,
+            HourlySalesRollupModel.points,
+        )
+        .where(HourlySalesRollupModel.hour_bucket >= first_hour)
+        .where(HourlySalesRollupModel.hour_bucket <= last_hour)
+        .order_by(HourlySalesRollupModel.hour_bucket)
+        .execution_options(**{QUERY_NAME_OPTION: "hourly_sales_rollup"})
+    )
+
+
+def _level_query(read: RollupRead):
+    """Query the buckets of one planned rollup read"""
+    if read.level == Granularity.HOUR:
+        return _rollup_query(read.first_bucket, read.last_bucket)
+    return (
+        select(SalesRollupModel.bucket, SalesRollupModel.sales, SalesRollupModel.points)
+        .where(SalesRollupModel.granularity == read.level.value)
+        .where(SalesRollupModel.bucket >= read.first_bucket)
+        .where(SalesRollupModel.bucket <= read.last_bucket)
+        .execution_options(**{QUERY_NAME_OPTION: f"sales_rollup_{read.level.value.lower()}"})
+    )
+
+
+def _to_hourly_sales(hour_bucket: datetime, sales, points) -> dict:
+    return {
+        "datetime": as_utc(hour_bucket),
+        "sales": Decimal(str(sales)).quantize(Decimal("0.01")),
+        "points": int(points),
+    }
+
+
+_EXPORT_COLUMNS = (
+    TransactionModel.id,
+    TransactionModel.customer_id,
+    TransactionModel.price_cents,
+    TransactionModel.price_modifier,
+    TransactionModel.payment_method_code,
+    TransactionModel.transaction_datetime,
+    TransactionModel.final_price_cents,
+    TransactionModel.points,
+    TransactionModel.last4,
+    TransactionModel.courier,
+    TransactionModel.bank,
+    TransactionModel.account_number,
+    TransactionModel.cheque_number,
+    TransactionModel.created_at,
+)
+
+
+def _to_additional_item(source) -> AdditionalItem:
+    """Additional item of a model or row with the typed additional item columns"""
+    return AdditionalItem(
+        last4=source.last4,
+        courier=CourierService(source.courier) if source.courier else None,
+        bank=source.bank,
+        account_number=source.account_number,
+        cheque_number=source.cheque_number,
+    )
+
+
+def _to_export_row(row: Row) -> tuple:
+    """Decode a row of ``_EXPORT_COLUMNS`` into the exported column values"""
+    item = _to_additional_item(row).to_dict()
+    return (
+        row.id,
+        row.customer_id,
+        CentsMoney(row.price_cents).amount,
+        row.price_modifier,
+        PAYMENT_METHODS_BY_CODE[row.payment_method_code].value,
+        row.transaction_datetime,
+        CentsMoney(row.final_price_cents).amount,
+        row.points,
+        item or None,
+        row.created_at,
+    )
 
 
 class SqlAlchemyTransactionRepository(TransactionRepository):
-    
+
     def __init__(self, session: AsyncSession):
         self._session = session
-    
+
     async def save(self, transaction: Transaction) -> Transaction:
         """Save a transaction to the database"""
-        model = self._to_model(transaction)
-        self._session.add(model)
-        await self._session.flush()
+        await self._session.execute(TRANSACTION_INSERT, self._to_row(transaction))
+        await self._update_rollup([transaction])
+        await self._update_customer_aggregates([transaction])
         return transaction
 
+    async def save_many(self, transactions: List[Transaction]) -> List[Transaction]:
+        """Save a batch of transactions with a single multi-row insert"""
+        if not transactions:
+            return transactions
+
+        await self._session.execute(
+            TRANSACTION_INSERT,
+            [self._to_row(t) for t in transactions],
+        )
+        await self._update_rollup(transactions)
+        await self._update_customer_aggregates(transactions)
+        return transactions
+
+    async def bulk_load(self, transactions: List[Transaction]) -> None:
+        """
+        Load transactions as fast as the database allows, skipping aggregates
+
+        Uses ``COPY ... FROM STDIN`` on PostgreSQL (psycopg) and an
+        executemany insert elsewhere. Callers must rebuild the sales rollups
+        and customer aggregates once loading is done.
+        """
+        if not transactions:
+            return
+
+        rows = [self._to_row(t) for t in transactions]
+        connection = await self._session.connection()
+        if connection.dialect.name != "postgresql":
+            await self._session.execute(TRANSACTION_INSERT, rows)
+            return
+
+        raw_connection = await connection.get_raw_connection()
+        columns = _COPY_COLUMNS
+        async with raw_connection.driver_connection.cursor() as cursor:
+            async with cursor.copy(
+                f"COPY {TransactionModel.__tablename__} ({', '.join(columns)}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    await copy.write_row([row[column] for column in columns])
 
     async def get_hourly_sales(
         self,
         start_datetime: datetime,
         end_datetime: datetime,
+        limit: Optional[int] = None,
     ) -> List[dict]:
-        """Get aggregated hourly sales within a date range"""
-        # Use date_trunc to group by hour
-        hour_bucket = func.date_trunc('hour', TransactionModel.transaction_datetime)
-        
-        result = await self._session.execute(
-            select(
-                hour_bucket.label('hour'),
-                func.sum(TransactionModel.final_price).label('total_sales'),
-                func.sum(TransactionModel.points).label('total_points'),
+        """
+        Get aggregated hourly sales within a date range
+
+        Hours fully inside the range are read from the hourly rollup, so the
+        cost grows with the number of hours rather than transactions. Only the
+        partially covered hours at either edge of the range (including a
+        still-open current hour) are aggregated from raw rows.
+        """
+        head_spans, full_hours, tail_spans = _plan_hours(start_datetime, end_datetime)
+
+        hours = await self._edge_hours(head_spans)
+        if full_hours is not None:
+            stmt = _rollup_query(*full_hours)
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            result = await self._session.execute(stmt)
+            hours.extend(_to_hourly_sales(*row) for row in result.all())
+
+        if limit is not None and len(hours) >= limit:
+            return hours[:limit]
+
+        hours.extend(await self._edge_hours(tail_spans))
+        return hours if limit is None else hours[:limit]
+
+    async def stream_hourly_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict]:
+        """Stream aggregated hourly sales from a server-side cursor"""
+        head_spans, full_hours, tail_spans = _plan_hours(start_datetime, end_datetime)
+
+        for hour in await self._edge_hours(head_spans):
+            yield hour
+
+        if full_hours is not None:
+            result = await self._session.stream(
+                _rollup_query(*full_hours).execution_options(yield_per=batch_size)
             )
-            .where(TransactionModel.transaction_datetime >= start_datetime)
-            .where(TransactionModel.transaction_datetime <= end_datetime)
-            .group_by(hour_bucket)
-            .order_by(hour_bucket)
+            async for row in result:
+                yield _to_hourly_sales(*row)
+
+        for hour in await self._edge_hours(tail_spans):
+            yield hour
+
+    async def get_sales(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        granularity: Granularity,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Get aggregated sales per bucket of any granularity within a date range
+
+        The range is planned onto the coarsest pre-aggregated levels whose
+        buckets nest in the requested ones (see ``plan_rollup_reads``) and
+        those are summed in memory, so raw transactions are only read for
+        the sub-minute edges of the range.
+        """
+        totals = await self._planned_sales(
+            plan_rollup_reads(start_datetime, end_datetime, granularity), granularity
+        )
+        buckets = [_to_hourly_sales(bucket, *total) for bucket, total in sorted(totals.items())]
+        return buckets if limit is None else buckets[:limit]
+
+    async def stream_transaction_rows(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        batch_size: int = 10_000,
+    ) -> AsyncIterator[List[tuple]]:
+        """
+        Stream raw transaction rows in batches from a server-side cursor
+
+        Rows are plain tuples of ``id, customer_id, price, price_modifier,
+        payment_method, transaction_datetime, final_price, points,
+        additional_item, created_at``, oldest first, with the compact columns
+        decoded back to amounts, method names and an additional item dict. No
+        ORM object is built per row, so memory stays bounded by the batch size.
+        """
+        table = TransactionModel.__table__
+        stmt = (
+            select(*_EXPORT_COLUMNS)
+            .where(table.c.transaction_datetime >= start_datetime)
+            .where(table.c.transaction_datetime <= end_datetime)
+            .order_by(table.c.transaction_datetime)
+            .execution_options(yield_per=batch_size, **{QUERY_NAME_OPTION: "transactions_export"})
+        )
+        result = await self._session.stream(stmt)
+        async for rows in result.partitions():
+            yield [_to_export_row(row) for row in rows]
+
+    async def rebuild_hourly_sales_rollup(self) -> None:
+        """
+        Recompute every sales rollup level
+
+        Minutes and hours are aggregated from raw transactions; days are
+        summed from hours and months from days.
+        """
+        dialect_name = self._session.get_bind().dialect.name
+        hour = bucket_trunc(TransactionModel.transaction_datetime, Granularity.HOUR, dialect_name)
+        raw_sales = cents_to_amount(func.sum(TransactionModel.final_price_cents), dialect_name)
+
+        await self._session.execute(delete(HourlySalesRollupModel))
+        await self._session.execute(
+            insert(HourlySalesRollupModel).from_select(
+                ["hour_bucket", "sales", "points", "transaction_count"],
+                select(
+                    hour,
+                    raw_sales,
+                    func.sum(TransactionModel.points),
+                    func.count(),
+                ).group_by(hour),
+            ).execution_options(**{QUERY_NAME_OPTION: "hourly_sales_rebuild"})
+        )
+
+        await self._session.execute(delete(SalesRollupModel))
+        await self._rebuild_level(
+            Granularity.MINUTE,
+            TransactionModel.transaction_datetime,
+            raw_sales,
+            func.sum(TransactionModel.points),
+            func.count(),
+        )
+        await self._rebuild_level(
+            Granularity.DAY,
+            HourlySalesRollupModel.hour_bucket,
+            func.sum(HourlySalesRollupModel.sales),
+            func.sum(HourlySalesRollupModel.points),
+            func.sum(HourlySalesRollupModel.transaction_count),
+        )
+        await self._rebuild_level(
+            Granularity.MONTH,
+            SalesRollupModel.bucket,
+            func.sum(SalesRollupModel.sales),
+            func.sum(SalesRollupModel.points),
+            func.sum(SalesRollupModel.transaction_count),
+            SalesRollupModel.granularity == Granularity.DAY.value,
         )
-        
-        rows = result.all()
-        return [
+
+    async def _rebuild_level(self, level: Granularity, bucket_column, sales, points, count, *where) -> None:
+        """Fill one sales_rollup level by grouping a finer source by bucket; sales, points and count are aggregates"""
+        dialect_name = self._session.get_bind().dialect.name
+        bucket = bucket_trunc(bucket_column, level, dialect_name)
+        await self._session.execute(
+            insert(SalesRollupModel).from_select(
+                ["granularity", "bucket", "sales", "points", "transaction_count"],
+                select(literal(level.value), bucket, sales, points, count)
+                .where(*where)
+                .group_by(bucket),
+            ).execution_options(**{QUERY_NAME_OPTION: f"sales_rollup_{level.value.lower()}_rebuild"})
+        )
+
+    async def _edge_hours(self, spans: List[tuple]) -> List[dict]:
+        """
+        Aggregate the hours only partly inside a range
+
+        Each span lies within a single hour and is read from the minute
+        rollup, plus raw rows for any part of a minute at its edges.
+        """
+        hours = []
+        for lower, upper in spans:
+            totals = await self._planned_sales(
+                plan_rollup_reads(lower, upper, Granularity.HOUR), Granularity.HOUR
+            )
+            hours.extend(_to_hourly_sales(hour, *total) for hour, total in totals.items())
+        return hours
+
+    async def _planned_sales(self, plan: RollupPlan, granularity: Granularity) -> dict:
+        """
+        Execute a rollup plan, summing sales and points per requested bucket
+
+        The raw spans filter on the partition key directly, so on a
+        partitioned table PostgreSQL prunes each query to one partition.
+        """
+        totals: dict = defaultdict(lambda: [Decimal("0"), 0])
+        for read in plan.reads:
+            result = await self._session.execute(_level_query(read))
+            for bucket, sales, points in result.all():
+                total = totals[floor_bucket(as_utc(bucket), granularity)]
+                total[0] += Decimal(str(sales))
+                total[1] += int(points)
+
+        for lower, upper in plan.raw_spans:
+            result = await self._session.execute(
+                select(
+                    func.sum(TransactionModel.final_price_cents).label('total_sales'),
+                    func.sum(TransactionModel.points).label('total_points'),
+                    func.count().label('transaction_count'),
+                )
+                .where(TransactionModel.transaction_datetime >= lower)
+                .where(TransactionModel.transaction_datetime <= upper)
+                .execution_options(**{QUERY_NAME_OPTION: "sales_raw"})
+            )
+            row = result.one()
+            if row.transaction_count:
+                total = totals[floor_bucket(lower, granularity)]
+                total[0] += CentsMoney(int(row.total_sales)).amount
+                total[1] += int(row.total_points)
+        return totals
+
+    async def _update_rollup(self, transactions: List[Transaction]) -> None:
+        """Add the given transactions to their hourly rollup buckets"""
+        buckets: dict = defaultdict(lambda: [Decimal("0"), 0, 0])
+        for transaction in transactions:
+            bucket = buckets[as_utc(transaction.hour_bucket)]
+            bucket[0] += transaction.final_price.amount
+            bucket[1] += transaction.points
+            bucket[2] += 1
+
+        # Sorted so that concurrent writers lock rollup rows in the same order
+        rows = [
             {
-                "datetime": row.hour,
-                "sales": Decimal(str(row.total_sales)).quantize(Decimal("0.01")),
-                "points": int(row.total_points),
+                "hour_bucket": hour_bucket,
+                "sales": sales,
+                "points": points,
+                "transaction_count": count,
             }
-            for row in rows
+            for hour_bucket, (sales, points, count) in sorted(buckets.items())
         ]
-    
+        dialect_name = self._session.get_bind().dialect.name
+        await self._session.execute(_rollup_upsert(dialect_name), rows)
+
+        levels: dict = defaultdict(lambda: [Decimal("0"), 0, 0])
+        for transaction in transactions:
+            transaction_datetime = as_utc(transaction.transaction_datetime)
+            for level in SALES_ROLLUP_LEVELS:
+                bucket = levels[(level.value, floor_bucket(transaction_datetime, level))]
+                bucket[0] += transaction.final_price.amount
+                bucket[1] += transaction.points
+                bucket[2] += 1
+
+        await self._session.execute(
+            _sales_rollup_upsert(dialect_name),
+            [
+                {
+                    "granularity": granularity,
+                    "bucket": bucket,
+                    "sales": sales,
+                    "points": points,
+                    "transaction_count": count,
+                }
+                for (granularity, bucket), (sales, points, count) in sorted(levels.items())
+            ],
+        )
+
+    async def _update_customer_aggregates(self, transactions: List[Transaction]) -> None:
+        """Add the given transactions to one shard of each customer's totals"""
+        shards: dict = defaultdict(lambda: [Decimal("0"), 0, 0])
+        for transaction in transactions:
+            shard = shards[(transaction.customer_id, transaction.id.int % CUSTOMER_SHARDS)]
+            shard[0] += transaction.final_price.amount
+            shard[1] += transaction.points
+            shard[2] += 1
+
+        # Sorted so that concurrent writers lock shard rows in the same order
+        rows = [
+            {
+                "customer_id": customer_id,
+                "shard": shard,
+                "lifetime_spend": spend,
+                "points_earned": points,
+                "transaction_count": count,
+            }
+            for (customer_id, shard), (spend, points, count) in sorted(shards.items())
+        ]
+        dialect_name = self._session.get_bind().dialect.name
+        await self._session.execute(customer_upsert(dialect_name), rows)
 
     def _to_model(self, entity: Transaction) -> TransactionModel:
         """Convert domain entity to database model"""
-        return TransactionModel(
+        return TransactionModel(**self._to_row(entity))
+
+    def _to_row(self, entity: Transaction) -> dict:
+        """Convert domain entity to a column-value mapping for bulk inserts"""
+        transaction_datetime = entity.transaction_datetime
+        if transaction_datetime.tzinfo is not None:
+            transaction_datetime = transaction_datetime.astimezone(timezone.utc)
+
+        item = entity.additional_item or AdditionalItem()
+        return dict(
             id=entity.id,
-            customer_id=entity.customer_id,
-            price=entity.price.amount,
-            price_modifier=entity.price_modifier,
-            payment_method=entity.payment_method.value,
-            transaction_datetime=entity.transaction_datetime,
-            final_price=entity.final_price.amount,
-            points=entity.points,
-            additional_item=entity.additional_item.to_dict() if entity.additional_item else None,
+            transaction_datetime=transaction_datetime,
             created_at=entity.created_at,
+            # Rounded half up to the cent, as the NUMERIC(12, 2) columns were
+            price_cents=CentsMoney.rounded(entity.price.amount).cents,
+            final_price_cents=CentsMoney.rounded(entity.final_price.amount).cents,
+            points=entity.points,
+            payment_method_code=PAYMENT_METHOD_CODES[entity.payment_method],
+            price_modifier=entity.price_modifier,
+            customer_id=entity.customer_id,
+            # Empty values are dropped, as they were from the JSON document
+            last4=item.last4 or None,
+            courier=item.courier.value if item.courier else None,
+            bank=item.bank or None,
+            account_number=item.account_number or None,
+            cheque_number=item.cheque_number or None,
         )
 
-
     def _to_entity(self, model: TransactionModel) -> Transaction:
         """Convert database model to domain entity"""
         return Transaction(
             id=model.id,
             customer_id=model.customer_id,
-            price=Money.from_decimal(model.price),
+            price=CentsMoney(model.price_cents).to_money(),
             price_modifier=model.price_modifier,
-            payment_method=PaymentMethod(model.payment_method),
+            payment_method=PAYMENT_METHODS_BY_CODE[model.payment_method_code],
             transaction_datetime=model.transaction_datetime,
-            final_price=Money.from_decimal(model.final_price),
+            final_price=CentsMoney(model.final_price_cents).to_money(),
             points=model.points,
-            additional_item=AdditionalItem.from_dict(model.additional_item),
+            additional_item=_to_additional_item(model),
             created_at=model.created_at,
         )
-
@@ -1,20 +1,101 @@
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 import uvicorn
 
-from strawberry.fastapi import GraphQLRouter
-
 from app.infrastructure.config.settings import get_settings
-from app.infrastructure.persistence.database import create_tables
+from app.infrastructure.cache.hourly_sales_cache import get_sales_cache
+from app.infrastructure.persistence.database import (
+    ensure_upcoming_partitions,
+    get_session_context,
+    pool_controllers,
+    prewarm_connections,
+    replica_router,
+)
+from app.infrastructure.persistence.group_commit import get_group_committer
+from app.infrastructure.persistence.migrations import check_schema, migrate
+from app.infrastructure.repositories.cached_transaction_repository import (
+    CachedTransactionRepository,
+)
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+from app.presentation.graphql.persisted_queries import (
+    PersistedQueryRouter,
+    get_persisted_queries,
+)
 from app.presentation.graphql.schema import schema
+from app.presentation.export import export_router
+from app.presentation.metrics import MetricsMiddleware, metrics_router
+from app.presentation.profiling import QueryProfileMiddleware
+
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = 6 * 60 * 60
+
+
+async def _maintain_partitions() -> None:
+    """Keep creating transaction partitions ahead of time while the app runs"""
+    while True:
+        await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+        try:
+            await ensure_upcoming_partitions()
+        except Exception:
+            logger.exception("Failed to create upcoming transaction partitions")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler"""
-    await create_tables()
+    settings = get_settings()
+    
+    # Schema changes belong to the deploy (python -m app.tools.migrate), not to every worker start
+    if settings.db_migrate_on_startup:
+        await migrate()
+    else:
+        await check_schema()
+    await ensure_upcoming_partitions()
+    
+    # Open the minimum connections before the first request needs them
+    await prewarm_connections()
+    for controller in pool_controllers:
+        controller.start()
+    
+    if settings.sales_cache_enabled:
+        async with get_session_context() as session:
+            repository = CachedTransactionRepository(
+                SqlAlchemyTransactionRepository(session),
+                get_sales_cache(),
+            )
+            await repository.warm_up(settings.sales_cache_warmup_hours)
+    
+    partition_maintenance = asyncio.create_task(_maintain_partitions())
+    
+    replica_health_checks = None
+    if replica_router.replicas:
+        await replica_router.check_all()
+        replica_health_checks = asyncio.create_task(replica_router.run_health_checks())
+    
     yield
+    
+    partition_maintenance.cancel()
+    with suppress(asyncio.CancelledError):
+        await partition_maintenance
+    
+    if replica_health_checks is not None:
+        replica_health_checks.cancel()
+        with suppress(asyncio.CancelledError):
+            await replica_health_checks
+        await replica_router.dispose()
+    
+    for controller in pool_controllers:
+        await controller.stop()
+    
+    if settings.group_commit_enabled:
+        await get_group_committer().close()
 
 
 def create_app() -> FastAPI:
@@ -26,9 +107,25 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
-    graphql_app = GraphQLRouter(schema)
+    graphql_app = PersistedQueryRouter(
+        schema,
+        registry=get_persisted_queries(),
+        allow_list=settings.persisted_queries_only,
+    )
     app.include_router(graphql_app, prefix="/graphql")
 
+    if settings.export_enabled:
+        if not settings.export_token:
+            logger.warning("EXPORT_ENABLED is set without EXPORT_TOKEN; export requests will be refused")
+        app.include_router(export_router)
+
+    if settings.sql_profiler_enabled:
+        app.add_middleware(QueryProfileMiddleware)
+
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware, paths=("/graphql", "/export/transactions", "/export/sales"))
+        app.include_router(metrics_router)
+
     return app
 
 
@@ -0,0 +1,64 @@
+import hmac
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.export.encoders import CONTENT_TYPES, FILE_EXTENSIONS, get_encoder
+from app.infrastructure.export.exporter import export_columns, stream_export
+
+
+def require_export_token(authorization: str = Header(default="")) -> None:
+    """Reject requests that do not carry the configured export token"""
+    token = get_settings().export_token
+    scheme, _, credentials = authorization.partition(" ")
+    if not token or scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode(), token.encode()):
+        raise HTTPException(401, "Invalid export token", headers={"WWW-Authenticate": "Bearer"})
+
+
+export_router = APIRouter(dependencies=[Depends(require_export_token)])
+
+
+def _parse_datetime(name: str, value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(400, f"Invalid {name}: {value}")
+
+
+@export_router.get("/export/{dataset}", include_in_schema=False)
+async def export(
+    dataset: str,
+    start: str,
+    end: str,
+    format: str = "csv",
+    batch_size: int = Query(default=None, alias="batchSize", gt=0),
+) -> StreamingResponse:
+    """
+    Stream transactions or hourly sales within an inclusive range
+
+    The response is sent with chunked transfer encoding as rows are read from
+    the database, so its size is not limited by server memory.
+    """
+    try:
+        encoder = get_encoder(format, export_columns(dataset))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    start_datetime = _parse_datetime("start", start)
+    end_datetime = _parse_datetime("end", end)
+
+    return StreamingResponse(
+        stream_export(
+            dataset,
+            encoder,
+            start_datetime,
+            end_datetime,
+            batch_size or get_settings().export_batch_size,
+        ),
+        media_type=CONTENT_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{dataset}.{FILE_EXTENSIONS[format]}"',
+        },
+    )
@@ -0,0 +1,91 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, List, Optional, Tuple
+
+from graphql import DocumentNode, GraphQLError
+from strawberry.extensions import SchemaExtension
+
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.monitoring.metrics import get_metrics_registry
+
+
+CachedDocument = Tuple[DocumentNode, List[GraphQLError]]
+
+DOCUMENT_CACHE_LOOKUPS = get_metrics_registry().counter(
+    "graphql_document_cache_lookups_total",
+    "Parsed-document cache lookups",
+    ("result",),
+)
+
+
+class DocumentCache:
+    """
+    LRU cache of parsed and validated GraphQL documents keyed by query text
+
+    Clients send the same few documents over and over; caching the parsed
+    document together with its validation errors lets repeated requests skip
+    both steps.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedDocument]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[CachedDocument]:
+        """Get a cached document and its validation errors"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, document: DocumentNode, errors: List[GraphQLError]) -> None:
+        """Cache a validated document, evicting the least recently used one"""
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = (document, errors)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache
+def get_document_cache() -> DocumentCache:
+    """Get the shared in-process document cache"""
+    return DocumentCache(max_entries=get_settings().document_cache_max_entries)
+
+
+class DocumentCacheExtension(SchemaExtension):
+    """
+    Serves parsing and validation from the shared document cache
+
+    On a miss Strawberry parses and validates as usual (reporting syntax
+    errors itself) and the result is cached once validation has run.
+    """
+
+    def on_parse(self):
+        context = self.execution_context
+        self._key = (context.schema, context.query)
+        self._cached = get_document_cache().get(self._key)
+
+        if self._cached is not None:
+            DOCUMENT_CACHE_LOOKUPS.inc(("hit",))
+            context.graphql_document = self._cached[0]
+        else:
+            DOCUMENT_CACHE_LOOKUPS.inc(("miss",))
+        yield
+
+    def on_validate(self):
+        context = self.execution_context
+        if self._cached is not None:
+            # Copied so that errors added later do not leak into the cache
+            context.errors = list(self._cached[1])
+        yield
+
+        if self._cached is None and context.graphql_document is not None and context.errors is not None:
+            get_document_cache().put(self._key, context.graphql_document, list(context.errors))
@@ -0,0 +1,119 @@
+from inspect import isawaitable
+from time import perf_counter
+from typing import Any, Callable
+
+from graphql import OperationDefinitionNode
+from strawberry.extensions import SchemaExtension
+
+from app.infrastructure.monitoring.metrics import get_metrics_registry
+from app.presentation.graphql.persisted_queries import get_persisted_queries
+from app.presentation.graphql.types import PaymentError
+
+
+_registry = get_metrics_registry()
+
+OPERATION_DURATION = _registry.histogram(
+    "graphql_operation_duration_seconds",
+    "GraphQL operation execution time",
+    ("operation_type", "operation_name"),
+)
+OPERATIONS = _registry.counter(
+    "graphql_operations_total",
+    "GraphQL operations executed",
+    ("operation_type", "operation_name", "status"),
+)
+RESOLVER_DURATION = _registry.histogram(
+    "graphql_resolver_duration_seconds",
+    "Root field resolver time",
+    ("field",),
+)
+RESOLVER_ERRORS = _registry.counter(
+    "graphql_resolver_errors_total",
+    "Root field resolver errors by type, including PaymentError results",
+    ("field", "error_type"),
+)
+
+
+def _operation_name(context) -> str:
+    # Operation names come from clients; only operations defined in a
+    # registered document keep theirs, so the label cannot grow without bound
+    name = context.operation_name
+    if name is None:
+        return "anonymous"
+    document = context.graphql_document
+    if (
+        document is not None
+        and get_persisted_queries().is_registered(context.query)
+        and any(
+            isinstance(definition, OperationDefinitionNode)
+            and definition.name is not None
+            and definition.name.value == name
+            for definition in document.definitions
+        )
+    ):
+        return name
+    return "other"
+
+
+def _record_payment_errors(field: str, result: Any) -> None:
+    if isinstance(result, PaymentError):
+        RESOLVER_ERRORS.inc((field, result.kind or "PaymentError"))
+    elif isinstance(result, list):
+        for item in result:
+            if isinstance(item, PaymentError):
+                RESOLVER_ERRORS.inc((field, item.kind or "PaymentError"))
+
+
+class MetricsExtension(SchemaExtension):
+    """
+    Records operation and root resolver latency, counts and errors
+
+    Only root fields (``Query.sales``, ``Mutation.payment``, ...) are timed;
+    nested fields resolve plain attributes and are passed straight through,
+    so the per-field overhead stays a single attribute check. Operations are
+    labelled with their name only for persisted query documents, and
+    ``other`` otherwise.
+    """
+
+    def on_execute(self):
+        started = perf_counter()
+        yield
+        context = self.execution_context
+        operation_type = context.operation_type.value if context.operation_type else "unknown"
+        labels = (operation_type, _operation_name(context))
+
+        OPERATION_DURATION.observe(perf_counter() - started, labels)
+        failed = context.result is not None and bool(context.result.errors)
+        OPERATIONS.inc(labels + ("error" if failed else "ok",))
+
+    def resolve(self, _next: Callable, root: Any, info: Any, *args, **kwargs) -> Any:
+        if info.path.prev is not None:
+            return _next(root, info, *args, **kwargs)
+
+        field = f"{info.parent_type.name}.{info.field_name}"
+        started = perf_counter()
+        try:
+            result = _next(root, info, *args, **kwargs)
+        except Exception as e:
+            RESOLVER_DURATION.observe(perf_counter() - started, (field,))
+            RESOLVER_ERRORS.inc((field, type(e).__name__))
+            raise
+
+        if isawaitable(result):
+            return self._resolve_async(field, started, result)
+
+        RESOLVER_DURATION.observe(perf_counter() - started, (field,))
+        _record_payment_errors(field, result)
+        return result
+
+    async def _resolve_async(self, field: str, started: float, pending) -> Any:
+        try:
+            result = await pending
+        except Exception as e:
+            RESOLVER_ERRORS.inc((field, type(e).__name__))
+            raise
+        finally:
+            RESOLVER_DURATION.observe(perf_counter() - started, (field,))
+
+        _record_payment_errors(field, result)
+        return result
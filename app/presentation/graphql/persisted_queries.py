@@ -0,0 +1,122 @@
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.http.exceptions import HTTPException
+
+from app.infrastructure.config.settings import get_settings
+
+
+DEFAULT_PERSISTED_QUERIES_DIR = Path(__file__).parent / "documents"
+
+
+def query_hash(query: str) -> str:
+    """SHA-256 hex digest clients use to refer to a persisted query"""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class PersistedQueryRegistry:
+    """Pre-registered GraphQL documents addressable by their SHA-256 hash"""
+
+    def __init__(self):
+        self._queries: Dict[str, str] = {}
+        self._names: Dict[str, str] = {}
+        self._hashes: Dict[str, str] = {}
+
+    def register(self, query: str, name: Optional[str] = None) -> str:
+        """Register a document and return its hash"""
+        digest = query_hash(query)
+        self._queries[digest] = query
+        self._hashes[query] = digest
+        if name:
+            self._names[name] = digest
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """Get the document registered under a hash"""
+        return self._queries.get(digest)
+
+    def is_registered(self, query: str) -> bool:
+        """Whether a document's exact text is registered"""
+        return query in self._hashes
+
+    def manifest(self) -> Dict[str, str]:
+        """Map of document name to hash, for building clients"""
+        return dict(self._names)
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    @classmethod
+    def from_directory(cls, path: Path) -> "PersistedQueryRegistry":
+        """Register every ``*.graphql`` file in a directory under its file name"""
+        registry = cls()
+        for file in sorted(Path(path).glob("*.graphql")):
+            registry.register(file.read_text(encoding="utf-8"), name=file.stem)
+        return registry
+
+
+@lru_cache
+def get_persisted_queries() -> PersistedQueryRegistry:
+    """Get the registry loaded from the configured directory"""
+    directory = get_settings().persisted_queries_dir or DEFAULT_PERSISTED_QUERIES_DIR
+    return PersistedQueryRegistry.from_directory(Path(directory))
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """
+    GraphQL router resolving persisted queries
+
+    Clients may send ``extensions.persistedQuery.sha256Hash`` (the Apollo
+    persisted query format) instead of the query text. With ``allow_list``
+    enabled, only registered documents are executed, whether they are sent
+    by hash or in full.
+    """
+
+    def __init__(self, schema, registry: PersistedQueryRegistry, allow_list: bool = False, **kwargs):
+        super().__init__(schema, **kwargs)
+        self.registry = registry
+        self.allow_list = allow_list
+
+    def should_render_graphql_ide(self, request) -> bool:
+        # A GET carrying only a persisted query hash is an operation, not a browser
+        if request.query_params.get("extensions") is not None:
+            return False
+        return super().should_render_graphql_ide(request)
+
+    async def parse_http_body(self, request) -> GraphQLRequestData:
+        data = await super().parse_http_body(request)
+
+        if data.query is None:
+            digest = await self._persisted_query_hash(request)
+            if digest is not None:
+                data.query = self.registry.get(digest)
+                if data.query is None:
+                    raise HTTPException(400, "PersistedQueryNotFound")
+            elif self.allow_list:
+                raise HTTPException(400, "PersistedQueryRequired")
+        elif self.allow_list and not self.registry.is_registered(data.query):
+            raise HTTPException(403, "PersistedQueryNotAllowed")
+
+        return data
+
+    async def _persisted_query_hash(self, request) -> Optional[str]:
+        if request.method == "GET":
+            extensions = request.query_params.get("extensions")
+        elif "application/json" in (request.content_type or ""):
+            extensions = self.parse_json(await request.get_body()).get("extensions")
+        else:
+            return None
+
+        if isinstance(extensions, str):
+            extensions = self.parse_json(extensions)
+        if not isinstance(extensions, dict):
+            return None
+
+        persisted_query = extensions.get("persistedQuery")
+        if not isinstance(persisted_query, dict):
+            return None
+        return persisted_query.get("sha256Hash")
@@ -1,18 +1,45 @@
-from typing import Union
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Union
 
-from app.application.dto.payment_dto import PaymentRequest, SalesRequest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.dto.payment_dto import PaymentRequest, PaymentResponse, SalesRequest
 from app.application.use_cases.process_payment import ProcessPaymentUseCase
+from app.application.use_cases.process_payments_batch import ProcessPaymentsBatchUseCase
 from app.application.use_cases.get_sales_report import GetSalesReportUseCase
+from app.application.use_cases.get_customer_summary import GetCustomerSummaryUseCase
+from app.domain.repositories.transaction_repository import TransactionRepository
 from app.domain.services.payment_service import PaymentService
+from app.domain.value_objects.granularity import Granularity
 from app.domain.exceptions import (
+    DomainException,
     ValidationException,
     PaymentMethodNotSupportedException,
     InvalidPriceException,
 )
+from app.infrastructure.config.settings import get_settings
 from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
     SqlAlchemyTransactionRepository,
 )
-from app.infrastructure.persistence.database import get_session_context
+from app.infrastructure.repositories.group_commit_transaction_repository import (
+    GroupCommitTransactionRepository,
+)
+from app.infrastructure.repositories.cached_transaction_repository import (
+    CachedTransactionRepository,
+)
+from app.infrastructure.repositories.sqlalchemy_customer_repository import (
+    SqlAlchemyCustomerRepository,
+)
+from app.infrastructure.cache.hourly_sales_cache import get_sales_cache
+from app.infrastructure.cache.idempotency_cache import get_idempotency_cache
+from app.infrastructure.persistence.database import (
+    get_read_session_context,
+    get_session_context,
+)
+from app.infrastructure.persistence.group_commit import get_group_committer
+from app.infrastructure.repositories.idempotency_repository import (
+    SqlAlchemyIdempotencyRepository,
+)
 from app.presentation.graphql.types import (
     PaymentInput,
     PaymentResult,
@@ -20,64 +47,175 @@ from app.presentation.graphql.types import (
     ErrorDetail,
     SalesQueryInput,
     SalesReportType,
+    CustomerType,
     HourlySalesType,
+    PageInfo,
 )
 
 
-async def process_payment(
-    input: PaymentInput,
-) -> Union[PaymentResult, PaymentError]:
-    """Process a payment mutation resolver"""
-    try:
-        async with get_session_context() as session:
-            repository = SqlAlchemyTransactionRepository(session)
-            payment_service = PaymentService()
-            use_case = ProcessPaymentUseCase(repository, payment_service)
-            
-            request = PaymentRequest(
-                customer_id=input.customer_id,
-                price=input.price,
-                price_modifier=input.price_modifier,
-                payment_method=input.payment_method,
-                datetime=input.datetime,
-                additional_item=input.additional_item.to_dict() if input.additional_item else None,
-            )
-            
-            response = await use_case.execute(request)
-            
-            return PaymentResult(
-                final_price=response.final_price,
-                points=response.points,
-            )
+def _with_cache(
+    repository: TransactionRepository,
+    session: Optional[AsyncSession] = None,
+) -> TransactionRepository:
+    """Wrap a repository, writing in ``session`` if given, with the sales cache when it is enabled"""
+    if get_settings().sales_cache_enabled:
+        return CachedTransactionRepository(repository, get_sales_cache(), session)
+    return repository
+
+
+@asynccontextmanager
+async def _payment_repository() -> AsyncIterator[TransactionRepository]:
+    """Yield the repository payment writes go through"""
+    if get_settings().group_commit_enabled:
+        yield _with_cache(GroupCommitTransactionRepository(get_group_committer()))
+        return
     
-    except ValidationException as e:
+    async with get_session_context() as session:
+        yield _with_cache(SqlAlchemyTransactionRepository(session), session)
+
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+_BATCH_KEY_ERROR = ValidationException([{
+    "field": "idempotencyKey",
+    "message": "Not supported by the payments mutation; send keyed payments one by one",
+}])
+
+
+async def _execute_payment(
+    request: PaymentRequest,
+    idempotency_key: Optional[str] = None,
+) -> PaymentResponse:
+    """Run a payment, storing its result under the idempotency key if given"""
+    if get_settings().group_commit_enabled:
+        # The committer inserts the key with the payment, in its shared commit
+        repository = _with_cache(GroupCommitTransactionRepository(get_group_committer(), idempotency_key))
+        return await ProcessPaymentUseCase(repository, PaymentService()).execute(request)
+    
+    async with get_session_context() as session:
+        repository = _with_cache(SqlAlchemyTransactionRepository(session), session)
+        response = await ProcessPaymentUseCase(repository, PaymentService()).execute(request)
+        if idempotency_key is not None:
+            # Same database transaction: a duplicate key rolls the payment back
+            await SqlAlchemyIdempotencyRepository(session).save(idempotency_key, response)
+        return response
+
+
+def _to_payment_request(input: PaymentInput) -> PaymentRequest:
+    """Map a GraphQL payment input to the application DTO"""
+    return PaymentRequest(
+        customer_id=input.customer_id,
+        price=input.price,
+        price_modifier=input.price_modifier,
+        payment_method=input.payment_method,
+        datetime=input.datetime,
+        additional_item=input.additional_item.to_dict() if input.additional_item else None,
+    )
+
+
+def _to_payment_error(e: Exception) -> PaymentError:
+    """Map an exception raised while processing a payment to a GraphQL error"""
+    if isinstance(e, ValidationException):
         return PaymentError(
             error="Validation failed",
             details=[
                 ErrorDetail(field=err["field"], message=err["message"])
                 for err in e.errors
             ],
+            kind=type(e).__name__,
         )
     
-    except PaymentMethodNotSupportedException as e:
-        return PaymentError(error=e.message)
+    if isinstance(e, (PaymentMethodNotSupportedException, InvalidPriceException)):
+        return PaymentError(error=e.message, kind=type(e).__name__)
     
-    except InvalidPriceException as e:
-        return PaymentError(error=e.message)
+    return PaymentError(error=f"An unexpected error occurred: {str(e)}", kind=type(e).__name__)
+
+
+async def process_payment(
+    input: PaymentInput,
+) -> Union[PaymentResult, PaymentError]:
+    """Process a payment mutation resolver"""
+    try:
+        key = input.idempotency_key
+        if key is None:
+            response = await _execute_payment(_to_payment_request(input))
+        elif not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise ValidationException([{
+                "field": "idempotencyKey",
+                "message": f"Must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters",
+            }])
+        else:
+            response = await get_idempotency_cache().execute(
+                key,
+                lambda: _execute_payment(_to_payment_request(input), key),
+            )
+        
+        return PaymentResult(
+            final_price=response.final_price,
+            points=response.points,
+        )
     
     except Exception as e:
-        return PaymentError(error=f"An unexpected error occurred: {str(e)}")
+        return _to_payment_error(e)
 
 
-async def get_sales_report(input: SalesQueryInput) -> SalesReportType:
+async def process_payments(
+    inputs: List[PaymentInput],
+) -> List[Union[PaymentResult, PaymentError]]:
+    """Process a batch payment mutation resolver"""
+    # Keys are only honoured by the single payment mutation; rejecting them
+    # here keeps a retried batch from inserting its keyed items again
+    keyed = {
+        index for index, input in enumerate(inputs)
+        if input.idempotency_key is not None
+    }
+    requests = [
+        _to_payment_request(input)
+        for index, input in enumerate(inputs)
+        if index not in keyed
+    ]
+    
+    try:
+        async with _payment_repository() as repository:
+            payment_service = PaymentService()
+            use_case = ProcessPaymentsBatchUseCase(repository, payment_service)
+            
+            responses = iter(await use_case.execute(requests))
+    
+    except Exception as e:
+        # The bulk insert failed, so none of the items were persisted
+        error = _to_payment_error(e)
+        return [error for _ in inputs]
+    
+    results = []
+    for index in range(len(inputs)):
+        response = _BATCH_KEY_ERROR if index in keyed else next(responses)
+        results.append(
+            _to_payment_error(response) if isinstance(response, DomainException)
+            else PaymentResult(final_price=response.final_price, points=response.points)
+        )
+    return results
+
+
+async def get_sales_report(
+    input: SalesQueryInput,
+    first: Optional[int] = None,
+    after: Optional[str] = None,
+    granularity: Granularity = Granularity.HOUR,
+    timezone: Optional[str] = None,
+) -> SalesReportType:
     """Get sales report query resolver"""
-    async with get_session_context() as session:
-        repository = SqlAlchemyTransactionRepository(session)
+    async with get_read_session_context() as session:
+        repository = _with_cache(SqlAlchemyTransactionRepository(session))
         use_case = GetSalesReportUseCase(repository)
         
         request = SalesRequest(
             start_datetime=input.start_datetime,
             end_datetime=input.end_datetime,
+            first=first,
+            after=after,
+            granularity=granularity,
+            timezone=timezone,
         )
         
         response = await use_case.execute(request)
@@ -90,6 +228,46 @@ async def get_sales_report(input: SalesQueryInput) -> SalesReportType:
                     points=hour.points,
                 )
                 for hour in response.sales
-            ]
+            ],
+            page_info=PageInfo(
+                has_next_page=response.has_next_page,
+                end_cursor=response.end_cursor,
+            ),
         )
 
+
+async def stream_sales_report(input: SalesQueryInput) -> AsyncIterator[HourlySalesType]:
+    """Stream sales report subscription resolver"""
+    async with get_read_session_context() as session:
+        repository = SqlAlchemyTransactionRepository(session)
+        use_case = GetSalesReportUseCase(repository)
+        
+        request = SalesRequest(
+            start_datetime=input.start_datetime,
+            end_datetime=input.end_datetime,
+        )
+        
+        async for hour in use_case.stream(request):
+            yield HourlySalesType(
+                datetime=hour.datetime,
+                sales=hour.sales,
+                points=hour.points,
+            )
+
+
+async def get_customer(id: str) -> Optional[CustomerType]:
+    """Get customer query resolver"""
+    # Read from the primary: a points balance must not lag behind payments
+    async with get_session_context() as session:
+        use_case = GetCustomerSummaryUseCase(SqlAlchemyCustomerRepository(session))
+        summary = await use_case.execute(id)
+    
+    if summary is None:
+        return None
+    
+    return CustomerType(
+        id=summary.customer_id,
+        lifetime_spend=summary.lifetime_spend,
+        points_earned=summary.points_earned,
+        transaction_count=summary.transaction_count,
+    )
@@ -1,13 +1,27 @@
+from typing import AsyncGenerator, List, Optional
+
 import strawberry
 
+from app.domain.value_objects.granularity import Granularity
+from app.infrastructure.config.settings import get_settings
 from app.presentation.graphql.types import (
     PaymentInput,
     PaymentResult,
     PaymentError,
     SalesQueryInput,
     SalesReportType,
+    HourlySalesType,
+    CustomerType,
+)
+from app.presentation.graphql.resolvers import (
+    process_payment,
+    process_payments,
+    get_sales_report,
+    stream_sales_report,
+    get_customer,
 )
-from app.presentation.graphql.resolvers import process_payment, get_sales_report
+from app.presentation.graphql.document_cache import DocumentCacheExtension
+from app.presentation.graphql.extensions import MetricsExtension
 
 
 PaymentResponse = strawberry.union(
@@ -21,9 +35,27 @@ class Query:
     """GraphQL Query type"""
     
     @strawberry.field
-    async def sales(self, input: SalesQueryInput) -> SalesReportType:
-        """Get sales report for a date range"""
-        return await get_sales_report(input)
+    async def sales(
+        self,
+        input: SalesQueryInput,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        granularity: Granularity = Granularity.HOUR,
+        timezone: Optional[str] = None,
+    ) -> SalesReportType:
+        """Get sales report for a date range, optionally one page at a time"""
+        return await get_sales_report(
+            input,
+            first=first,
+            after=after,
+            granularity=granularity,
+            timezone=timezone,
+        )
+    
+    @strawberry.field
+    async def customer(self, id: str) -> Optional[CustomerType]:
+        """Get a customer's lifetime spend, points earned and transaction count"""
+        return await get_customer(id)
     
     @strawberry.field
     def health(self) -> str:
@@ -39,7 +71,30 @@ class Mutation:
     async def payment(self, input: PaymentInput) -> PaymentResponse:
         """Process a payment"""
         return await process_payment(input)
+    
+    @strawberry.mutation
+    async def payments(self, inputs: List[PaymentInput]) -> List[PaymentResponse]:
+        """Process a batch of payments in a single round trip"""
+        return await process_payments(inputs)
 
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+@strawberry.type
+class Subscription:
+    """GraphQL Subscription type"""
+    
+    @strawberry.subscription(name="salesStream")
+    async def sales_stream(self, input: SalesQueryInput) -> AsyncGenerator[HourlySalesType, None]:
+        """Stream the sales report for a date range hour by hour"""
+        async for hour in stream_sales_report(input):
+            yield hour
+
+
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    subscription=Subscription,
+    extensions=[DocumentCacheExtension] + (
+        [MetricsExtension] if get_settings().metrics_enabled else []
+    ),
+)
 
@@ -41,6 +41,14 @@ class PaymentInput:
     additional_item: Optional[AdditionalItemInput] = strawberry.field(
         default=None, name="additionalItem"
     )
+    idempotency_key: Optional[str] = strawberry.field(
+        default=None,
+        name="idempotencyKey",
+        description=(
+            "Retries of the payment mutation with the same key return the original result; "
+            "rejected by the payments batch mutation"
+        ),
+    )
 
 
 @strawberry.type
@@ -65,6 +73,8 @@ class PaymentError:
     
     error: str
     details: Optional[List[ErrorDetail]] = None
+    # Exception class behind the error, for metrics; not exposed in the schema
+    kind: strawberry.Private[Optional[str]] = None
 
 
 @strawberry.input
@@ -84,8 +94,27 @@ class HourlySalesType:
     points: int
 
 
+@strawberry.type
+class PageInfo:
+    """Type for keyset pagination state"""
+    
+    has_next_page: bool = strawberry.field(name="hasNextPage")
+    end_cursor: Optional[str] = strawberry.field(default=None, name="endCursor")
+
+
 @strawberry.type
 class SalesReportType:
     """Type for sales report response"""
     
-    sales: List[HourlySalesType]
\ No newline at end of file
+    sales: List[HourlySalesType]
+    page_info: PageInfo = strawberry.field(name="pageInfo")
+
+
+@strawberry.type
+class CustomerType:
+    """Type for a customer's lifetime totals"""
+    
+    id: str
+    lifetime_spend: str = strawberry.field(name="lifetimeSpend")
+    points_earned: int = strawberry.field(name="pointsEarned")
+    transaction_count: int = strawberry.field(name="transactionCount")
@@ -0,0 +1,62 @@
+from time import perf_counter
+from typing import Iterable
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.infrastructure.monitoring.metrics import get_metrics_registry
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry = get_metrics_registry()
+
+HTTP_REQUEST_DURATION = _registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request handling time",
+    ("path", "method", "status"),
+)
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Expose collected metrics in the Prometheus text format"""
+    return PlainTextResponse(_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing HTTP requests
+
+    Requests outside ``paths`` are labelled ``other`` so that arbitrary URLs
+    cannot create unbounded label values.
+    """
+
+    def __init__(self, app, paths: Iterable[str] = ("/graphql",)):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            path = scope["path"].rstrip("/") or "/"
+            HTTP_REQUEST_DURATION.observe(
+                perf_counter() - started,
+                (path if path in self.paths else "other", scope["method"], status),
+            )
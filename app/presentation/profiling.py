@@ -0,0 +1,42 @@
+import logging
+
+from app.infrastructure.monitoring.sql_profiler import profile_queries
+
+
+logger = logging.getLogger("app.sql.requests")
+
+
+class QueryProfileMiddleware:
+    """
+    ASGI middleware collecting a SQL profile for every HTTP request
+
+    The profile is available to handlers as ``request.state.query_profile``
+    and reported to clients in a ``Server-Timing`` header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries() as profile:
+            scope.setdefault("state", {})["query_profile"] = profile
+
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    timing = (
+                        f'db;dur={profile.total_seconds * 1000:.3f};'
+                        f'desc="{profile.statement_count} statements"'
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", timing.encode("latin-1")),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+        if profile.statement_count:
+            logger.debug("%s %s %s", scope["method"], scope["path"], profile.to_dict())
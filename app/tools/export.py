@@ -0,0 +1,57 @@
+"""
+Stream transactions or hourly sales for a time range to a file or stdout.
+
+Rows are read from a server-side cursor in batches and written as they
+arrive, so memory use stays constant however large the range is.
+
+Usage:
+    python -m app.tools.export transactions \\
+        --start 2024-01-01T00:00:00Z --end 2024-12-31T23:59:59Z \\
+        --format arrow --output transactions-2024.arrows
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.export.encoders import EXPORT_FORMATS, get_encoder
+from app.infrastructure.export.exporter import EXPORT_DATASETS, export_columns, stream_export
+
+
+def _parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", choices=EXPORT_DATASETS)
+    parser.add_argument("--start", type=_parse_datetime, required=True, help="Inclusive ISO 8601 start")
+    parser.add_argument("--end", type=_parse_datetime, required=True, help="Inclusive ISO 8601 end")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--batch-size", type=int, default=get_settings().export_batch_size)
+    parser.add_argument("--output", type=Path, help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    encoder = get_encoder(args.format, export_columns(args.dataset))
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    written = 0
+    started = perf_counter()
+    try:
+        async for chunk in stream_export(args.dataset, encoder, args.start, args.end, args.batch_size):
+            output.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+    print(
+        f"Wrote {written:,} bytes in {perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,301 @@
+"""
+Bulk import historical transactions from CSV or NDJSON files.
+
+Records use the field names of the ``payment`` mutation: ``customerId``,
+``price``, ``priceModifier``, ``paymentMethod``, ``datetime`` and optionally
+``additionalItem`` (a JSON object, JSON-encoded in CSV files). Files are read
+in chunks; each chunk is validated and priced by the domain services in a
+process pool and loaded with ``COPY`` on PostgreSQL (executemany elsewhere).
+Rejected records are written to a side file as NDJSON; the sales rollups and
+customer aggregates are rebuilt once every file has been loaded.
+
+Usage:
+    python -m app.tools.import store-2019.csv store-2020.ndjson \\
+        --chunk-size 5000 --workers 4 --rejected rejected.ndjson
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from app.application.dto.payment_dto import PaymentRequest
+from app.application.use_cases.process_payments_batch import price_payments
+from app.domain.entities.transaction import Transaction
+from app.domain.exceptions import ValidationException
+from app.domain.services.payment_service import PaymentService
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.persistence.database import get_session_context
+from app.infrastructure.persistence.migrations import migrate
+from app.infrastructure.persistence.partitioning import (
+    ensure_partitions,
+    is_partitioning_enabled,
+    partition_start,
+)
+from app.infrastructure.repositories.sqlalchemy_customer_repository import (
+    SqlAlchemyCustomerRepository,
+)
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+
+
+FORMATS = ("csv", "ndjson")
+REQUIRED_FIELDS = ("customerId", "price", "priceModifier", "paymentMethod", "datetime")
+
+# (line number, CSV row dict or raw NDJSON line)
+Record = Tuple[int, Any]
+
+_payment_service = PaymentService()
+
+
+def detect_format(path: Path) -> str:
+    """Infer the file format from its extension"""
+    if path.suffix.lower() == ".csv":
+        return "csv"
+    if path.suffix.lower() in (".ndjson", ".jsonl"):
+        return "ndjson"
+    raise ValueError(f"Cannot infer the format of {path}; pass --format")
+
+
+def read_records(path: Path, file_format: str) -> Iterator[Record]:
+    """Yield the records of a file with their line numbers"""
+    with open(path, newline="" if file_format == "csv" else None, encoding="utf-8") as file:
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    yield line_number, line
+
+
+def chunked(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def to_payment_request(record: Any) -> PaymentRequest:
+    """
+    Build a payment request from a CSV row or an NDJSON line
+
+    Raises:
+        ValueError: If the record is malformed or misses a required field
+    """
+    if isinstance(record, str):
+        record = json.loads(record)
+    if not isinstance(record, dict):
+        raise ValueError("Record is not an object")
+
+    missing = [name for name in REQUIRED_FIELDS if record.get(name) in (None, "")]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    additional_item = record.get("additionalItem") or None
+    if isinstance(additional_item, str):
+        additional_item = json.loads(additional_item)
+    if additional_item is not None and not isinstance(additional_item, dict):
+        raise ValueError("additionalItem must be an object")
+
+    return PaymentRequest(
+        customer_id=str(record["customerId"]),
+        price=str(record["price"]),
+        price_modifier=record["priceModifier"],
+        payment_method=record["paymentMethod"],
+        datetime=str(record["datetime"]),
+        additional_item=additional_item,
+    )
+
+
+def _rejection(line_number: int, record: Any, error: Exception) -> dict:
+    rejected = {"line": line_number, "record": record, "error": str(error)}
+    if isinstance(error, ValidationException):
+        rejected["errors"] = error.errors
+    return rejected
+
+
+def price_chunk(chunk: List[Record]) -> Tuple[List[Transaction], List[dict]]:
+    """
+    Validate and price one chunk of records
+
+    Runs in worker processes, so it only takes and returns picklable values.
+
+    Returns:
+        The priced transactions and a rejection entry for every other record
+    """
+    rejected: List[dict] = []
+    accepted: List[Record] = []
+    requests: List[PaymentRequest] = []
+    for line_number, record in chunk:
+        try:
+            requests.append(to_payment_request(record))
+            accepted.append((line_number, record))
+        except ValueError as e:
+            # json.JSONDecodeError is a ValueError too
+            rejected.append(_rejection(line_number, record, e))
+
+    transactions: List[Transaction] = []
+    for (line_number, record), result in zip(accepted, price_payments(requests, _payment_service)):
+        if isinstance(result, Transaction):
+            transactions.append(result)
+        else:
+            rejected.append(_rejection(line_number, record, result))
+    return transactions, rejected
+
+
+@dataclass
+class ImportStats:
+    """Counters of an import run"""
+
+    imported: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+
+class TransactionImporter:
+    """
+    Streams records through the pricing pool into the transactions table
+
+    Each chunk is loaded and committed in its own database transaction; at
+    most ``2 * workers`` chunks are priced ahead of the loader, which bounds
+    memory use regardless of file size.
+    """
+
+    def __init__(
+        self,
+        session_context: Callable = get_session_context,
+        chunk_size: int = 5000,
+        workers: int = 0,
+        partition_interval: Optional[str] = None,
+    ):
+        self._session_context = session_context
+        self._chunk_size = chunk_size
+        self._workers = workers
+        self._partition_interval = partition_interval or get_settings().transaction_partition_interval
+        self._partitions_seen: set = set()
+
+    async def run(
+        self,
+        records: Iterable[Record],
+        rejected_file,
+        on_progress: Optional[Callable[[ImportStats], None]] = None,
+    ) -> ImportStats:
+        """Import records, writing rejected ones to ``rejected_file`` as NDJSON"""
+        stats = ImportStats()
+        started = perf_counter()
+        chunks = chunked(records, self._chunk_size)
+
+        async def consume(result: Tuple[List[Transaction], List[dict]]) -> None:
+            transactions, rejected = result
+            await self._load(transactions)
+            for entry in rejected:
+                rejected_file.write(json.dumps(entry, default=str) + "\n")
+            stats.imported += len(transactions)
+            stats.rejected += len(rejected)
+            stats.elapsed = perf_counter() - started
+            if on_progress is not None:
+                on_progress(stats)
+
+        if self._workers <= 0:
+            for chunk in chunks:
+                await consume(price_chunk(chunk))
+        else:
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(max_workers=self._workers) as pool:
+                pending: deque = deque()
+                for chunk in chunks:
+                    pending.append(loop.run_in_executor(pool, price_chunk, chunk))
+                    if len(pending) >= 2 * self._workers:
+                        await consume(await pending.popleft())
+                while pending:
+                    await consume(await pending.popleft())
+
+        async with self._session_context() as session:
+            await SqlAlchemyTransactionRepository(session).rebuild_hourly_sales_rollup()
+            await SqlAlchemyCustomerRepository(session).rebuild()
+
+        stats.elapsed = perf_counter() - started
+        return stats
+
+    async def _load(self, transactions: List[Transaction]) -> None:
+        if not transactions:
+            return
+        async with self._session_context() as session:
+            await self._ensure_partitions(session, transactions)
+            await SqlAlchemyTransactionRepository(session).bulk_load(transactions)
+
+    async def _ensure_partitions(self, session, transactions: List[Transaction]) -> None:
+        """Create the range partitions historical rows belong to, once each"""
+        if not is_partitioning_enabled(self._partition_interval):
+            return
+        starts = {
+            partition_start(t.transaction_datetime, self._partition_interval)
+            for t in transactions
+        } - self._partitions_seen
+        if not starts:
+            return
+
+        connection = await session.connection()
+        for start in sorted(starts):
+            await ensure_partitions(
+                connection,
+                table_name="transactions",
+                interval=self._partition_interval,
+                ahead=0,
+                now=start,
+            )
+        self._partitions_seen |= starts
+
+
+def _records(paths: List[Path], file_format: Optional[str]) -> Iterator[Record]:
+    for path in paths:
+        yield from read_records(path, file_format or detect_format(path))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", type=Path, help="CSV or NDJSON files to import")
+    parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Pricing processes (0 prices in the loading process)",
+    )
+    parser.add_argument("--rejected", type=Path, default=Path("rejected.ndjson"), help="Side file for rejected records")
+    args = parser.parse_args()
+
+    await migrate()
+
+    def report(stats: ImportStats) -> None:
+        print(
+            f"{stats.imported:,} imported, {stats.rejected:,} rejected "
+            f"({stats.rows_per_second:,.0f} rows/s)",
+            flush=True,
+        )
+
+    importer = TransactionImporter(chunk_size=args.chunk_size, workers=args.workers)
+    with open(args.rejected, "w", encoding="utf-8") as rejected_file:
+        stats = await importer.run(_records(args.paths, args.format), rejected_file, on_progress=report)
+
+    print(
+        f"Imported {stats.imported:,} rows in {stats.elapsed:.1f}s "
+        f"({stats.rows_per_second:,.0f} rows/s); "
+        f"{stats.rejected:,} rejected rows written to {args.rejected}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+"""
+Apply pending schema migrations to the application database.
+
+Run once per deploy, before the new application version starts serving.
+Concurrent runs are safe on PostgreSQL: they wait for each other and the
+later ones find nothing to do.
+
+Usage:
+    python -m app.tools.migrate [--status]
+"""
+import argparse
+import asyncio
+
+from app.infrastructure.persistence.database import engine
+from app.infrastructure.persistence.migrations import MIGRATIONS, applied_versions, migrate
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="List migrations without applying them")
+    args = parser.parse_args()
+
+    if args.status:
+        async with engine.connect() as conn:
+            applied = set(await applied_versions(conn))
+        for migration in MIGRATIONS:
+            state = "applied" if migration.version in applied else "pending"
+            print(f"{migration.version:>4}  {state:<8} {migration.description}")
+    else:
+        applied = await migrate()
+        for migration in applied:
+            print(f"Applied {migration.version}: {migration.description}")
+        if not applied:
+            print("Schema is up to date")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+"""
+Print the persisted query manifest (document name to SHA-256 hash) as JSON.
+
+Clients embed these hashes and send them as
+``extensions.persistedQuery.sha256Hash`` instead of the query text.
+
+Usage:
+    python -m app.tools.persisted_queries
+"""
+import json
+
+from app.presentation.graphql.persisted_queries import get_persisted_queries
+
+
+def main() -> None:
+    print(json.dumps(get_persisted_queries().manifest(), indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Rebuild derived aggregate tables from raw transactions.
+
+Usage:
+    python -m app.tools.rebuild_aggregates
+"""
+import asyncio
+
+from app.infrastructure.persistence.database import get_session_context
+from app.infrastructure.persistence.migrations import migrate
+from app.infrastructure.repositories.sqlalchemy_customer_repository import (
+    SqlAlchemyCustomerRepository,
+)
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+
+
+async def rebuild_aggregates() -> None:
+    """Recompute every derived aggregate in a single database transaction"""
+    async with get_session_context() as session:
+        repository = SqlAlchemyTransactionRepository(session)
+        await repository.rebuild_hourly_sales_rollup()
+        await SqlAlchemyCustomerRepository(session).rebuild()
+
+
+async def main() -> None:
+    await migrate()
+    await rebuild_aggregates()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
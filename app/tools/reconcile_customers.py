@@ -0,0 +1,170 @@
+"""
+Recompute per-customer aggregates from raw transactions and repair drift.
+
+The transaction history is cut into time slices that are aggregated
+concurrently, each on its own connection and, on a partitioned table, in
+its own partitions. On PostgreSQL every connection reads the same exported
+REPEATABLE READ snapshot as the stored aggregates, so payments committing
+during the run are in neither. The partial totals are merged in memory and
+the difference to the stored totals is added to the aggregates as an
+increment, which keeps payments committed since the snapshot. Other
+databases cannot share a snapshot; there the slices are read one after
+another on one connection, and payments must not be written during a repair.
+
+Usage:
+    python -m app.tools.reconcile_customers --workers 8 --slice-days 7 [--dry-run]
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.value_objects.time_bucket import RESOLUTION, as_utc
+from app.infrastructure.persistence.database import get_session_context
+from app.infrastructure.persistence.migrations import migrate
+from app.infrastructure.persistence.models import TransactionModel
+from app.infrastructure.repositories.sqlalchemy_customer_repository import (
+    CustomerTotals,
+    SqlAlchemyCustomerRepository,
+)
+
+
+def time_slices(first: datetime, last: datetime, slice_days: int) -> List[Tuple[datetime, datetime]]:
+    """Half-open slices of ``slice_days`` days covering ``first`` to ``last`` inclusive"""
+    step = timedelta(days=slice_days)
+    end = last + RESOLUTION
+    slices = []
+    start = first
+    while start < end:
+        slices.append((start, min(start + step, end)))
+        start += step
+    return slices
+
+
+def merge_totals(partials: List[Dict[str, CustomerTotals]]) -> Dict[str, CustomerTotals]:
+    merged: Dict[str, list] = {}
+    for partial in partials:
+        for customer_id, (spend, points, count) in partial.items():
+            totals = merged.setdefault(customer_id, [Decimal("0"), 0, 0])
+            totals[0] += spend
+            totals[1] += points
+            totals[2] += count
+    return {customer_id: tuple(totals) for customer_id, totals in merged.items()}
+
+
+def totals_delta(expected: CustomerTotals, stored: CustomerTotals) -> CustomerTotals:
+    return tuple(e - s for e, s in zip(expected, stored))
+
+
+_NO_TOTALS: CustomerTotals = (Decimal("0.00"), 0, 0)
+
+_SNAPSHOT_ISOLATION = "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"
+
+
+async def _export_snapshot(session: AsyncSession) -> Optional[str]:
+    """Start a REPEATABLE READ transaction and export its snapshot (PostgreSQL only)"""
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    await session.execute(text(_SNAPSHOT_ISOLATION))
+    return await session.scalar(text("SELECT pg_export_snapshot()"))
+
+
+@dataclass
+class ReconcileStats:
+    """Outcome of a reconciliation run"""
+
+    customers: int = 0
+    slices: int = 0
+    drifted: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+class CustomerReconciler:
+    """Recomputes customer aggregates in parallel time slices and repairs drift"""
+
+    def __init__(
+        self,
+        session_context: Callable = get_session_context,
+        workers: int = 4,
+        slice_days: int = 30,
+    ):
+        self._session_context = session_context
+        self._workers = max(1, workers)
+        self._slice_days = slice_days
+
+    async def run(self, dry_run: bool = False) -> ReconcileStats:
+        stats = ReconcileStats()
+        started = perf_counter()
+
+        async with self._session_context() as session:
+            snapshot = await _export_snapshot(session)
+            repository = SqlAlchemyCustomerRepository(session)
+            first, last = (await session.execute(
+                select(
+                    func.min(TransactionModel.transaction_datetime),
+                    func.max(TransactionModel.transaction_datetime),
+                )
+            )).one()
+            stored = await repository.stored_totals()
+
+            slices = [] if first is None else time_slices(as_utc(first), as_utc(last), self._slice_days)
+            if snapshot is None:
+                partials = [await repository.raw_totals(*s) for s in slices]
+            else:
+                semaphore = asyncio.Semaphore(self._workers)
+
+                async def aggregate(start: datetime, end: datetime) -> Dict[str, CustomerTotals]:
+                    async with semaphore, self._session_context() as worker:
+                        await worker.execute(text(_SNAPSHOT_ISOLATION))
+                        await worker.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot}'"))
+                        return await SqlAlchemyCustomerRepository(worker).raw_totals(start, end)
+
+                # The exported snapshot is only valid while this transaction is open
+                partials = await asyncio.gather(*(aggregate(*s) for s in slices))
+
+        expected = merge_totals(partials)
+        deltas = {
+            customer_id: totals_delta(expected.get(customer_id, _NO_TOTALS), stored.get(customer_id, _NO_TOTALS))
+            for customer_id in expected.keys() | stored.keys()
+            if expected.get(customer_id) != stored.get(customer_id)
+        }
+        if not dry_run and deltas:
+            async with self._session_context() as session:
+                await SqlAlchemyCustomerRepository(session).adjust(deltas)
+
+        stats.customers = len(expected)
+        stats.slices = len(slices)
+        stats.drifted = sorted(deltas.keys() & expected.keys())
+        stats.removed = sorted(deltas.keys() - expected.keys())
+        stats.elapsed = perf_counter() - started
+        return stats
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="Slices aggregated concurrently")
+    parser.add_argument("--slice-days", type=int, default=30, help="Days of transactions per slice")
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without repairing it")
+    args = parser.parse_args()
+
+    await migrate()
+    stats = await CustomerReconciler(workers=args.workers, slice_days=args.slice_days).run(dry_run=args.dry_run)
+
+    action = "found" if args.dry_run else "repaired"
+    print(
+        f"Checked {stats.customers:,} customers in {stats.slices:,} slices in {stats.elapsed:.1f}s; "
+        f"{action} {len(stats.drifted):,} drifted and {len(stats.removed):,} stale aggregates"
+    )
+    for customer_id in stats.drifted[:20]:
+        print(f"  drifted: {customer_id}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Seeded synthetic transaction generator for benchmarks.
+
+The same seed always produces the same transactions, so timings taken on
+different machines or commits run against identical data.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Iterator, List
+from uuid import UUID
+
+from app.application.dto.payment_dto import PaymentRequest
+from app.domain.entities.transaction import Transaction
+from app.domain.services.payment_service import PaymentService
+from app.domain.value_objects.additional_item import AdditionalItem, CourierService
+from app.domain.value_objects.money import Money
+from app.domain.value_objects.payment_method import (
+    PaymentMethod,
+    get_payment_config,
+)
+
+
+# Share of payments per method, loosely modelled on a Japanese retail mix
+PAYMENT_METHOD_WEIGHTS = {
+    PaymentMethod.CASH: 22,
+    PaymentMethod.VISA: 18,
+    PaymentMethod.MASTERCARD: 12,
+    PaymentMethod.JCB: 8,
+    PaymentMethod.AMEX: 4,
+    PaymentMethod.PAYPAY: 12,
+    PaymentMethod.LINE_PAY: 6,
+    PaymentMethod.GRAB_PAY: 3,
+    PaymentMethod.POINTS: 4,
+    PaymentMethod.CASH_ON_DELIVERY: 6,
+    PaymentMethod.BANK_TRANSFER: 3,
+    PaymentMethod.CHEQUE: 2,
+}
+
+# Relative traffic per hour of day (UTC): quiet nights, lunch and evening peaks
+HOUR_OF_DAY_WEIGHTS = [
+    1, 1, 1, 1, 1, 2, 3, 5, 7, 8, 9, 12,
+    14, 11, 9, 8, 9, 11, 14, 13, 10, 7, 4, 2,
+]
+
+
+class SyntheticTransactionGenerator:
+    """Generates realistic, valid payments from a fixed random seed"""
+
+    def __init__(self, seed: int = 42, customers: int = 10_000):
+        self._random = random.Random(seed)
+        self._customers = customers
+        self._payment_service = PaymentService()
+        self._methods = list(PAYMENT_METHOD_WEIGHTS)
+        self._method_weights = list(PAYMENT_METHOD_WEIGHTS.values())
+
+    def payment_method(self) -> PaymentMethod:
+        return self._random.choices(self._methods, self._method_weights)[0]
+
+    def price(self) -> Decimal:
+        """Log-normal basket value: many small purchases, a long tail of large ones"""
+        value = min(self._random.lognormvariate(3.5, 1.0), 99_999.0)
+        return Decimal(f"{max(value, 0.5):.2f}")
+
+    def price_modifier(self, method: PaymentMethod) -> Decimal:
+        config = get_payment_config(method)
+        low = int(config.min_price_modifier * 100)
+        high = int(config.max_price_modifier * 100)
+        return Decimal(self._random.randint(low, high)) / 100
+
+    def additional_item(self, method: PaymentMethod) -> AdditionalItem:
+        config = get_payment_config(method)
+        return AdditionalItem(
+            last4=f"{self._random.randint(0, 9999):04d}" if config.requires_last4 else None,
+            courier=self._random.choice(list(CourierService)) if config.requires_courier else None,
+            bank="Synthetic Bank" if config.requires_bank_info or config.requires_cheque_info else None,
+            account_number=str(self._random.randint(10**6, 10**7)) if config.requires_bank_info else None,
+            cheque_number=f"CHQ{self._random.randint(0, 99999):05d}" if config.requires_cheque_info else None,
+        )
+
+    def transaction_datetime(self, start: datetime, days: int) -> datetime:
+        day = self._random.randrange(days)
+        hour = self._random.choices(range(24), HOUR_OF_DAY_WEIGHTS)[0]
+        seconds = self._random.randrange(3600)
+        return start + timedelta(days=day, hours=hour, seconds=seconds)
+
+    def customer_id(self) -> str:
+        # Pareto-shaped popularity so a few customers are much more active
+        index = min(int(self._random.paretovariate(1.2)) - 1, self._customers - 1)
+        return f"customer-{index:06d}"
+
+    def transactions(self, count: int, start: datetime, days: int) -> Iterator[Transaction]:
+        """Yield priced transactions spread over ``days`` days from ``start``"""
+        for _ in range(count):
+            method = self.payment_method()
+            price = Money.from_decimal(self.price())
+            modifier = self.price_modifier(method)
+            yield Transaction(
+                id=UUID(int=self._random.getrandbits(128), version=4),
+                customer_id=self.customer_id(),
+                price=price,
+                price_modifier=modifier,
+                payment_method=method,
+                transaction_datetime=self.transaction_datetime(start, days),
+                final_price=self._payment_service.calculate_final_price(price, modifier),
+                points=self._payment_service.calculate_points(price, method),
+                additional_item=self.additional_item(method),
+                created_at=start,
+            )
+
+    def payment_requests(self, count: int, start: datetime, days: int) -> List[PaymentRequest]:
+        """Build payment request DTOs as the GraphQL layer would"""
+        requests = []
+        for _ in range(count):
+            method = self.payment_method()
+            requests.append(PaymentRequest(
+                customer_id=self.customer_id(),
+                price=str(self.price()),
+                price_modifier=float(self.price_modifier(method)),
+                payment_method=method,
+                datetime=self.transaction_datetime(start, days).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                additional_item=self.additional_item(method).to_dict(),
+            ))
+        return requests
+
+
+DEFAULT_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
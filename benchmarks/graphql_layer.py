@@ -0,0 +1,83 @@
+"""
+GraphQL layer CPU cost with and without the parsed-document cache.
+
+Times parsing plus validation of the registered ``payment`` and ``sales``
+documents against a cache hit, and full in-process execution of the
+``health`` query through schemas with and without the cache extension. No
+database is involved.
+
+Usage:
+    python -m benchmarks.graphql_layer --iterations 5000 --output graphql.json
+"""
+import argparse
+import asyncio
+import sys
+
+import strawberry
+from graphql import parse, validate
+
+from app.presentation.graphql.document_cache import DocumentCache, DocumentCacheExtension
+from app.presentation.graphql.persisted_queries import get_persisted_queries
+from app.presentation.graphql.schema import Mutation, Query, Subscription
+from benchmarks.harness import measure, measure_async, write_report
+
+
+def _schema(extensions):
+    return strawberry.Schema(query=Query, mutation=Mutation, subscription=Subscription, extensions=extensions)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5_000)
+    parser.add_argument("--output", help="write results as JSON")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> int:
+    manifest = get_persisted_queries().manifest()
+    documents = {name: get_persisted_queries().get(manifest[name]) for name in ("payment", "sales")}
+    uncached_schema = _schema([])
+    cached_schema = _schema([DocumentCacheExtension])
+    graphql_schema = uncached_schema._schema
+
+    results = []
+    for name, query in documents.items():
+        cache = DocumentCache()
+        document = parse(query)
+        cache.put(query, document, validate(graphql_schema, document))
+
+        results.append(measure(
+            f"graphql.{name}.parse_validate",
+            lambda query=query: validate(graphql_schema, parse(query)),
+            args.iterations,
+        ))
+        results.append(measure(
+            f"graphql.{name}.cache_hit",
+            lambda query=query, cache=cache: cache.get(query),
+            args.iterations,
+        ))
+
+    health = get_persisted_queries().get(manifest["health"])
+    for label, schema in (("uncached", uncached_schema), ("cached", cached_schema)):
+        results.append(await measure_async(
+            f"graphql.health.execute_{label}",
+            lambda schema=schema: schema.execute(health),
+            args.iterations,
+        ))
+
+    for result in results:
+        print(f"{result.name:<36} {result.ops_per_second:>12,.0f} ops/s  mean {result.mean_ms * 1000:9.1f} us")
+
+    by_name = {result.name: result for result in results}
+    for name in documents:
+        saved = by_name[f"graphql.{name}.parse_validate"].mean_ms - by_name[f"graphql.{name}.cache_hit"].mean_ms
+        print(f"{name}: cache saves {saved * 1000:.1f} us of CPU per request")
+
+    if args.output:
+        write_report(args.output, results, {"iterations": args.iterations})
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
@@ -0,0 +1,131 @@
+"""Timing, reporting and baseline comparison helpers for benchmarks."""
+import json
+import platform
+import statistics
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchmarkResult:
+    """Latency summary of one benchmark"""
+
+    name: str
+    iterations: int
+    total_seconds: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.iterations / self.total_seconds if self.total_seconds else 0.0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "ops_per_second": self.ops_per_second}
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(fraction * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+def summarize(name: str, samples: List[float], total_seconds: float) -> BenchmarkResult:
+    """Build a result from per-iteration durations in seconds"""
+    ordered = sorted(samples)
+    return BenchmarkResult(
+        name=name,
+        iterations=len(samples),
+        total_seconds=total_seconds,
+        mean_ms=statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        p50_ms=percentile(ordered, 0.50) * 1000,
+        p95_ms=percentile(ordered, 0.95) * 1000,
+        p99_ms=percentile(ordered, 0.99) * 1000,
+        max_ms=ordered[-1] * 1000 if ordered else 0.0,
+    )
+
+
+def measure(name: str, func: Callable[[], object], iterations: int, warmup: int = 10) -> BenchmarkResult:
+    """Time a synchronous callable"""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    started = perf_counter()
+    for _ in range(iterations):
+        begin = perf_counter()
+        func()
+        samples.append(perf_counter() - begin)
+    return summarize(name, samples, perf_counter() - started)
+
+
+async def measure_async(
+    name: str,
+    func: Callable[[], Awaitable[object]],
+    iterations: int,
+    warmup: int = 3,
+) -> BenchmarkResult:
+    """Time an async callable, one call at a time"""
+    for _ in range(warmup):
+        await func()
+
+    samples = []
+    started = perf_counter()
+    for _ in range(iterations):
+        begin = perf_counter()
+        await func()
+        samples.append(perf_counter() - begin)
+    return summarize(name, samples, perf_counter() - started)
+
+
+def write_report(path: str, results: List[BenchmarkResult], meta: Dict[str, object]) -> dict:
+    """Write results as JSON and return the report"""
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            **meta,
+        },
+        "results": {result.name: result.to_dict() for result in results},
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    return report
+
+
+def compare_to_baseline(
+    report: dict,
+    baseline_path: str,
+    max_regression: float,
+    metric: str = "p50_ms",
+) -> List[str]:
+    """
+    Compare a report with a stored baseline
+
+    Returns a description of every benchmark whose ``metric`` grew by more
+    than ``max_regression`` (a fraction, e.g. 0.2 for 20%).
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for name, result in report["results"].items():
+        reference: Optional[dict] = baseline.get("results", {}).get(name)
+        if not reference or not reference.get(metric):
+            continue
+        change = result[metric] / reference[metric] - 1
+        if change > max_regression:
+            regressions.append(
+                f"{name}: {metric} {reference[metric]:.3f} -> {result[metric]:.3f} "
+                f"(+{change:.0%}, allowed +{max_regression:.0%})"
+            )
+    return regressions
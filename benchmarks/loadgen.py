@@ -0,0 +1,251 @@
+"""
+In-process load generator for the GraphQL endpoint.
+
+Drives the real ``create_app()`` application over ASGI (no sockets) with a
+configurable mix of ``payment`` mutations and ``sales`` queries, either at a
+fixed concurrency (closed loop: each worker sends its next request as soon as
+the previous one returns) or at a fixed arrival rate (open loop: requests
+start on schedule whether or not earlier ones have finished, so queueing
+shows up in the latencies).
+
+Usage:
+    python -m benchmarks.loadgen --requests 5000 --concurrency 32 \\
+        --mix payment=0.8,sales=0.2 \\
+        --database-url sqlite+aiosqlite:///./loadgen.db
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+from dataclasses import dataclass, field
+from datetime import timedelta
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+from benchmarks.data_generator import DEFAULT_START, SyntheticTransactionGenerator
+from benchmarks.harness import BenchmarkResult, summarize, write_report
+
+
+PAYMENT_MUTATION = """
+mutation Payment($input: PaymentInput!) {
+  payment(input: $input) {
+    ... on PaymentResult { finalPrice points }
+    ... on PaymentError { error }
+  }
+}
+"""
+
+SALES_QUERY = """
+query Sales($input: SalesQueryInput!) {
+  sales(input: $input) {
+    sales { datetime sales points }
+  }
+}
+"""
+
+OPERATIONS = ("payment", "sales")
+
+# Sales report range widths, sampled uniformly
+SALES_WIDTHS = [timedelta(hours=1), timedelta(days=1), timedelta(days=7), timedelta(days=30)]
+
+
+@dataclass
+class OperationStats:
+    """Latencies and failures recorded for one operation"""
+
+    samples: List[float] = field(default_factory=list)
+    errors: int = 0
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse ``payment=0.8,sales=0.2`` into normalised weights"""
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}'. Allowed values: {list(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Operation mix must have a positive total weight")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+class RequestFactory:
+    """Builds GraphQL request bodies from seeded synthetic data"""
+
+    def __init__(self, mix: Dict[str, float], seed: int, days: int):
+        self._random = random.Random(seed)
+        self._generator = SyntheticTransactionGenerator(seed=seed)
+        self._operations = list(mix)
+        self._weights = list(mix.values())
+        self._days = days
+
+    def next(self) -> Tuple[str, dict]:
+        operation = self._random.choices(self._operations, self._weights)[0]
+        if operation == "payment":
+            return operation, self._payment()
+        return operation, self._sales()
+
+    def _payment(self) -> dict:
+        request = self._generator.payment_requests(1, DEFAULT_START, self._days)[0]
+        payment_input = {
+            "customerId": request.customer_id,
+            "price": request.price,
+            "priceModifier": request.price_modifier,
+            "paymentMethod": request.payment_method.name,
+            "datetime": request.datetime,
+        }
+        if request.additional_item:
+            payment_input["additionalItem"] = request.additional_item
+        return {"query": PAYMENT_MUTATION, "variables": {"input": payment_input}}
+
+    def _sales(self) -> dict:
+        width = self._random.choice(SALES_WIDTHS)
+        start = DEFAULT_START + timedelta(minutes=self._random.randrange(self._days * 24 * 60))
+        return {
+            "query": SALES_QUERY,
+            "variables": {"input": {
+                "startDateTime": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "endDateTime": (start + width).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }},
+        }
+
+
+class LoadGenerator:
+    """Sends GraphQL requests to an ASGI app and records per-operation latency"""
+
+    def __init__(self, client, factory: RequestFactory):
+        self._client = client
+        self._factory = factory
+        self.stats: Dict[str, OperationStats] = {name: OperationStats() for name in OPERATIONS}
+
+    async def send(self) -> None:
+        operation, body = self._factory.next()
+        stats = self.stats[operation]
+
+        begin = perf_counter()
+        try:
+            response = await self._client.post("/graphql", json=body)
+            payload = response.json()
+        except Exception:
+            stats.errors += 1
+            return
+        stats.samples.append(perf_counter() - begin)
+
+        data = (payload.get("data") or {}).get(operation)
+        if response.status_code != 200 or payload.get("errors") or not data or "error" in data:
+            stats.errors += 1
+
+    async def run_concurrency(self, requests: int, concurrency: int) -> float:
+        """Closed loop: ``concurrency`` workers share ``requests`` requests"""
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                await self.send()
+
+        started = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return perf_counter() - started
+
+    async def run_rate(self, requests: int, rate: float, max_in_flight: int) -> float:
+        """Open loop: start ``rate`` requests per second regardless of completions"""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(max_in_flight)
+        tasks = []
+
+        async def limited():
+            async with slots:
+                await self.send()
+
+        started = perf_counter()
+        first_arrival = loop.time()
+        for i in range(requests):
+            delay = first_arrival + i / rate - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(limited()))
+        await asyncio.gather(*tasks)
+        return perf_counter() - started
+
+    def results(self, elapsed: float) -> List[BenchmarkResult]:
+        return [
+            summarize(f"loadgen.{name}", stats.samples, elapsed)
+            for name, stats in self.stats.items()
+            if stats.samples or stats.errors
+        ]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./loadgen.db")
+    parser.add_argument("--requests", type=int, default=2_000, help="total requests to send")
+    parser.add_argument("--mix", default="payment=0.8,sales=0.2", help="operation weights")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, default=16, help="closed-loop workers")
+    mode.add_argument("--rate", type=float, help="open-loop arrivals per second")
+    parser.add_argument("--max-in-flight", type=int, default=1_000, help="cap on open-loop requests in flight")
+    parser.add_argument("--warmup", type=int, default=50, help="requests sent before measuring")
+    parser.add_argument("--days", type=int, default=90, help="days the synthetic data spans")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> int:
+    # The application binds its engine at import time, so point it at the
+    # target database before importing it
+    os.environ["DATABASE_URL"] = args.database_url
+
+    import httpx
+    from app.infrastructure.persistence.database import engine
+    from app.infrastructure.persistence.migrations import migrate
+    from app.main import create_app
+
+    await migrate()
+
+    app = create_app()
+    factory = RequestFactory(parse_mix(args.mix), args.seed, args.days)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadgen") as client:
+            warmup = LoadGenerator(client, factory)
+            await warmup.run_concurrency(args.warmup, min(args.warmup, args.concurrency) or 1)
+
+            generator = LoadGenerator(client, factory)
+            if args.rate:
+                elapsed = await generator.run_rate(args.requests, args.rate, args.max_in_flight)
+            else:
+                elapsed = await generator.run_concurrency(args.requests, args.concurrency)
+    await engine.dispose()
+
+    total = sum(len(s.samples) for s in generator.stats.values())
+    print(f"{total} requests in {elapsed:.2f}s ({total / elapsed:,.0f} req/s)")
+    results = generator.results(elapsed)
+    for result in results:
+        errors = generator.stats[result.name.split(".", 1)[1]].errors
+        print(
+            f"{result.name:<18} {result.ops_per_second:>9,.0f} req/s  errors {errors:<5} "
+            f"p50 {result.p50_ms:8.2f} ms  p95 {result.p95_ms:8.2f} ms  "
+            f"p99 {result.p99_ms:8.2f} ms  max {result.max_ms:8.2f} ms"
+        )
+
+    if args.output:
+        write_report(args.output, results, {
+            "database": engine.dialect.name,
+            "mode": f"rate={args.rate}" if args.rate else f"concurrency={args.concurrency}",
+            "mix": args.mix,
+            "errors": {name: stats.errors for name, stats in generator.stats.items()},
+            "seed": args.seed,
+        })
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
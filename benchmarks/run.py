@@ -0,0 +1,263 @@
+"""
+Reproducible performance benchmarks.
+
+Loads seeded synthetic transactions into SQLite or PostgreSQL, then times the
+domain services, the payment path and the sales report over several range
+widths. Results are written as JSON and can be compared against a stored
+baseline; the command exits with status 1 when a benchmark regressed by more
+than the allowed threshold.
+
+Usage:
+    python -m benchmarks.run --rows 100000 \\
+        --database-url sqlite+aiosqlite:///./benchmark.db \\
+        --output results.json --baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import itertools
+import sys
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from time import perf_counter
+from typing import List
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.application.dto.payment_dto import SalesRequest
+from app.application.use_cases.get_sales_report import GetSalesReportUseCase
+from app.application.use_cases.process_payment import ProcessPaymentUseCase
+from app.domain.services.payment_service import PaymentService
+from app.domain.services.vectorized_pricing import price_batch, to_modifier_units
+from app.domain.value_objects.additional_item import AdditionalItem
+from app.domain.value_objects.cents_money import CentsMoney
+from app.domain.value_objects.money import Money
+from app.domain.value_objects.payment_method import PAYMENT_METHOD_CODES
+from app.infrastructure.persistence.database import Base
+from app.infrastructure.persistence.models import TransactionModel
+from app.infrastructure.persistence.partitioning import ensure_partitions
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+from benchmarks.data_generator import DEFAULT_START, SyntheticTransactionGenerator
+from benchmarks.harness import (
+    BenchmarkResult,
+    compare_to_baseline,
+    measure,
+    measure_async,
+    write_report,
+)
+
+
+SALES_RANGES = {
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+}
+
+
+def _session_context(session_factory):
+    @asynccontextmanager
+    async def context():
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    return context
+
+
+async def prepare_database(engine, session_context, args) -> int:
+    """Create the schema and load synthetic rows unless already loaded"""
+    settings = get_settings()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await ensure_partitions(
+            conn,
+            table_name="transactions",
+            interval=settings.transaction_partition_interval,
+            ahead=settings.transaction_partitions_ahead,
+            now=DEFAULT_START,
+        )
+
+    async with session_context() as session:
+        existing = await session.scalar(select(func.count()).select_from(TransactionModel))
+    if existing >= args.rows:
+        print(f"Reusing {existing} existing rows")
+        return existing
+
+    generator = SyntheticTransactionGenerator(seed=args.seed)
+    transactions = generator.transactions(args.rows - existing, DEFAULT_START, args.days)
+    started = perf_counter()
+    loaded = 0
+    while True:
+        chunk = list(itertools.islice(transactions, args.chunk_size))
+        if not chunk:
+            break
+        async with session_context() as session:
+            await SqlAlchemyTransactionRepository(session).save_many(chunk)
+        loaded += len(chunk)
+    elapsed = perf_counter() - started
+    print(f"Loaded {loaded} rows in {elapsed:.1f}s ({loaded / elapsed:,.0f} rows/s)")
+    return existing + loaded
+
+
+def bench_domain(args) -> List[BenchmarkResult]:
+    generator = SyntheticTransactionGenerator(seed=args.seed)
+    service = PaymentService()
+    inputs = []
+    for _ in range(1000):
+        method = generator.payment_method()
+        inputs.append((
+            method,
+            Money.from_decimal(generator.price()),
+            generator.price_modifier(method),
+            generator.additional_item(method),
+        ))
+    cycle = itertools.cycle(inputs)
+
+    def validate():
+        method, _, modifier, item = next(cycle)
+        service.validate_payment(method, modifier, item)
+
+    batch = [(method, modifier, item) for method, _, modifier, item in inputs]
+
+    def validate_batch():
+        service.validate_payments(batch)
+
+    def final_price():
+        _, price, modifier, _ = next(cycle)
+        service.calculate_final_price(price, modifier)
+
+    def points():
+        method, price, _, _ = next(cycle)
+        service.calculate_points(price, method)
+
+    cents_inputs = [
+        (method, CentsMoney.from_money(price), modifier)
+        for method, price, modifier, _ in inputs
+    ]
+    cents_cycle = itertools.cycle(cents_inputs)
+
+    def final_price_cents():
+        _, price, modifier = next(cents_cycle)
+        service.calculate_final_price_cents(price, modifier)
+
+    def points_cents():
+        method, price, _ = next(cents_cycle)
+        service.calculate_points_cents(price, method)
+
+    batch_prices = np.array([price.cents for _, price, _ in cents_inputs], dtype=np.int64)
+    batch_modifiers = to_modifier_units(modifier for _, _, modifier in cents_inputs)
+    batch_codes = np.array([PAYMENT_METHOD_CODES[method] for method, _, _ in cents_inputs], dtype=np.int64)
+
+    def price_vectorized():
+        price_batch(batch_prices, batch_modifiers, batch_codes)
+
+    return [
+        measure("domain.validate_payment", validate, args.domain_iterations),
+        measure(f"domain.validate_payments_x{len(batch)}", validate_batch, max(1, args.domain_iterations // len(batch))),
+        measure("domain.calculate_final_price", final_price, args.domain_iterations),
+        measure("domain.calculate_points", points, args.domain_iterations),
+        measure("domain.calculate_final_price_cents", final_price_cents, args.domain_iterations),
+        measure("domain.calculate_points_cents", points_cents, args.domain_iterations),
+        measure(f"domain.price_batch_x{len(batch)}", price_vectorized, max(1, args.domain_iterations // len(batch))),
+    ]
+
+
+async def bench_payment(session_context, args) -> BenchmarkResult:
+    generator = SyntheticTransactionGenerator(seed=args.seed + 1)
+    requests = iter(generator.payment_requests(args.payment_iterations + 3, DEFAULT_START, args.days))
+    service = PaymentService()
+
+    async def pay():
+        async with session_context() as session:
+            use_case = ProcessPaymentUseCase(SqlAlchemyTransactionRepository(session), service)
+            await use_case.execute(next(requests))
+
+    return await measure_async("payment.process_payment", pay, args.payment_iterations)
+
+
+async def bench_sales(session_context, args) -> List[BenchmarkResult]:
+    results = []
+    # Start mid-hour so every width also exercises the partial edge hours
+    start = DEFAULT_START + timedelta(days=1, minutes=30)
+    for label, width in SALES_RANGES.items():
+        request = SalesRequest(
+            start_datetime=start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            end_datetime=(start + width).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        )
+
+        async def report():
+            async with session_context() as session:
+                await GetSalesReportUseCase(SqlAlchemyTransactionRepository(session)).execute(request)
+
+        results.append(await measure_async(f"sales.report_{label}", report, args.sales_iterations))
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./benchmark.db")
+    parser.add_argument("--rows", type=int, default=10_000, help="synthetic transactions to load")
+    parser.add_argument("--days", type=int, default=90, help="days the synthetic data spans")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--domain-iterations", type=int, default=20_000)
+    parser.add_argument("--payment-iterations", type=int, default=500)
+    parser.add_argument("--sales-iterations", type=int, default=50)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.20,
+        help="allowed p50 slowdown versus the baseline, as a fraction",
+    )
+    return parser.parse_args(argv)
+
+
+async def run(args) -> int:
+    engine = create_async_engine(args.database_url)
+    session_context = _session_context(
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+
+    try:
+        rows = await prepare_database(engine, session_context, args)
+        results = bench_domain(args)
+        results.append(await bench_payment(session_context, args))
+        results.extend(await bench_sales(session_context, args))
+    finally:
+        await engine.dispose()
+
+    for result in results:
+        print(
+            f"{result.name:<32} {result.ops_per_second:>12,.0f} ops/s  "
+            f"p50 {result.p50_ms:8.3f} ms  p95 {result.p95_ms:8.3f} ms  max {result.max_ms:8.3f} ms"
+        )
+
+    report = write_report(args.output, results, {
+        "database": engine.dialect.name,
+        "rows": rows,
+        "seed": args.seed,
+    })
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
@@ -1,11 +1,17 @@
-from datetime import datetime
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import AsyncGenerator, Optional
 
 import pytest
 import pytest_asyncio
 from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
+from app.domain.entities.transaction import Transaction
+from app.domain.value_objects.additional_item import AdditionalItem
+from app.domain.value_objects.money import Money
+from app.domain.value_objects.payment_method import PaymentMethod
 from app.infrastructure.persistence.database import Base
 
 
@@ -60,3 +66,44 @@ async def async_session(async_engine) -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+@pytest.fixture
+def session_context(async_engine):
+    """Session context manager like get_session_context, committing on success"""
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def context():
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    return context
+
+
+def create_transaction(
+    customer_id: str = "customer123",
+    price: str = "100.00",
+    price_modifier: str = "0.95",
+    payment_method: PaymentMethod = PaymentMethod.CASH,
+    transaction_datetime: Optional[datetime] = None,
+    final_price: str = "95.00",
+    points: int = 5,
+    additional_item: Optional[AdditionalItem] = None,
+) -> Transaction:
+    if transaction_datetime is None:
+        transaction_datetime = datetime(2024, 1, 15, 10, 30, 0, tzinfo=timezone.utc)
+
+    return Transaction(
+        customer_id=customer_id,
+        price=Money.from_string(price),
+        price_modifier=Decimal(price_modifier),
+        payment_method=payment_method,
+        transaction_datetime=transaction_datetime,
+        final_price=Money.from_string(final_price),
+        points=points,
+        additional_item=additional_item,
+    )
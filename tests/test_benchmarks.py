@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from app.domain.services.payment_service import PaymentService
+from benchmarks.data_generator import DEFAULT_START, SyntheticTransactionGenerator
+from benchmarks.loadgen import RequestFactory, parse_mix
+from benchmarks.harness import compare_to_baseline, measure, percentile, write_report
+
+
+class TestSyntheticTransactionGenerator:
+
+    def test_same_seed_same_data(self):
+        first = list(SyntheticTransactionGenerator(seed=7).transactions(50, DEFAULT_START, 30))
+        second = list(SyntheticTransactionGenerator(seed=7).transactions(50, DEFAULT_START, 30))
+
+        assert [t.id for t in first] == [t.id for t in second]
+        assert [t.final_price for t in first] == [t.final_price for t in second]
+        assert [t.transaction_datetime for t in first] == [t.transaction_datetime for t in second]
+
+    def test_generated_payments_are_valid(self):
+        service = PaymentService()
+        for transaction in SyntheticTransactionGenerator(seed=1).transactions(500, DEFAULT_START, 30):
+            service.validate_payment(
+                transaction.payment_method,
+                transaction.price_modifier,
+                transaction.additional_item,
+            )
+            assert DEFAULT_START <= transaction.transaction_datetime
+
+
+class TestHarness:
+
+    def test_percentile(self):
+        samples = [float(i) for i in range(1, 101)]
+        assert percentile(samples, 0.5) == 50.0
+        assert percentile(samples, 0.99) == 99.0
+        assert percentile([], 0.5) == 0.0
+
+    def test_regression_against_baseline(self, tmp_path):
+        result = measure("noop", lambda: None, 10)
+        baseline = write_report(tmp_path / "baseline.json", [result], {})
+
+        baseline["results"]["noop"]["p50_ms"] = result.p50_ms / 2
+        (tmp_path / "baseline.json").write_text(json.dumps(baseline))
+        report = write_report(tmp_path / "current.json", [result], {})
+
+        regressions = compare_to_baseline(report, tmp_path / "baseline.json", max_regression=0.2)
+        assert len(regressions) == 1
+        assert "noop" in regressions[0]
+
+
+class TestLoadGenerator:
+
+    def test_parse_mix_normalises_weights(self):
+        assert parse_mix("payment=3,sales=1") == {"payment": 0.75, "sales": 0.25}
+        assert parse_mix("sales") == {"sales": 1.0}
+
+    def test_parse_mix_rejects_unknown_operation(self):
+        with pytest.raises(ValueError):
+            parse_mix("refund=1")
+
+    def test_request_factory_builds_graphql_variables(self):
+        factory = RequestFactory(parse_mix("payment=1"), seed=3, days=7)
+        operation, body = factory.next()
+
+        assert operation == "payment"
+        payment_input = body["variables"]["input"]
+        assert set(payment_input) >= {"customerId", "price", "priceModifier", "paymentMethod", "datetime"}
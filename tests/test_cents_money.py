@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+import pytest
+from hypothesis import given, strategies as st
+
+from app.domain.services.payment_service import PaymentService
+from app.domain.value_objects.cents_money import CentsMoney
+from app.domain.value_objects.money import Money
+from app.domain.value_objects.payment_method import PAYMENT_METHOD_CONFIGS
+
+
+cents_amounts = st.integers(min_value=0, max_value=10**14)
+huge_cents_amounts = st.integers(min_value=10**14, max_value=10**26)
+
+# Modifiers as the API builds them: Decimal(str(float))
+float_modifiers = st.floats(min_value=0, max_value=3, allow_nan=False).map(lambda f: Decimal(str(f)))
+decimal_modifiers = st.decimals(min_value=0, max_value=3, places=12, allow_nan=False, allow_infinity=False)
+modifiers = st.one_of(
+    st.sampled_from([
+        value
+        for config in PAYMENT_METHOD_CONFIGS.values()
+        for value in (config.min_price_modifier, config.max_price_modifier)
+    ]),
+    float_modifiers,
+    decimal_modifiers,
+)
+point_rates = st.one_of(
+    st.sampled_from([config.point_rate for config in PAYMENT_METHOD_CONFIGS.values()]),
+    st.decimals(min_value=0, max_value=1, places=6, allow_nan=False, allow_infinity=False),
+)
+
+
+def _money(cents: int) -> Money:
+    return Money.from_string(f"{cents // 100}.{cents % 100:02d}")
+
+
+@given(cents=st.one_of(cents_amounts, huge_cents_amounts), modifier=modifiers)
+def test_apply_modifier_matches_decimal_money(cents, modifier):
+    expected = _money(cents).apply_modifier(modifier)
+    result = CentsMoney(cents).apply_modifier(modifier)
+
+    assert result.amount == expected.amount
+    assert result.to_string() == expected.to_string()
+    assert str(result.to_money().amount) == str(expected.amount)
+
+
+@given(cents=st.one_of(cents_amounts, huge_cents_amounts), rate=point_rates)
+def test_points_match_payment_method_config(cents, rate):
+    config = next(iter(PAYMENT_METHOD_CONFIGS.values()))
+    expected = int(_money(cents).amount * rate)
+    assert CentsMoney(cents).points(rate) == expected
+    if rate == config.point_rate:
+        assert CentsMoney(cents).points(rate) == config.calculate_points(_money(cents).amount)
+
+
+@given(cents=cents_amounts)
+def test_decimal_round_trip_is_lossless(cents):
+    money = _money(cents)
+    converted = CentsMoney.from_money(money)
+
+    assert converted.cents == cents
+    assert converted.to_money() == money
+    assert CentsMoney.from_string(money.to_string()) == converted
+    assert converted.to_string() == money.to_string()
+
+
+@given(value=st.decimals(min_value=0, max_value=10**12, places=2, allow_nan=False, allow_infinity=False))
+def test_from_string_matches_decimal_parsing(value):
+    text = str(value)
+    assert CentsMoney.from_string(text).amount == Money.from_string(text).amount
+
+
+@given(cents=cents_amounts, modifier=modifiers)
+def test_payment_service_cent_variants_match(cents, modifier):
+    service = PaymentService()
+    for method in PAYMENT_METHOD_CONFIGS:
+        assert service.calculate_points_cents(CentsMoney(cents), method) == service.calculate_points(_money(cents), method)
+    assert (
+        service.calculate_final_price_cents(CentsMoney(cents), modifier).to_string()
+        == service.calculate_final_price(_money(cents), modifier).to_string()
+    )
+
+
+class TestCentsMoney:
+
+    def test_from_string(self):
+        assert CentsMoney.from_string("100").cents == 10000
+        assert CentsMoney.from_string("99.9").cents == 9990
+        assert CentsMoney.from_string("0.05").cents == 5
+        assert CentsMoney.from_string("1e2").cents == 10000
+
+    def test_more_than_two_decimals_is_rejected(self):
+        with pytest.raises(ValueError):
+            CentsMoney.from_string("1.005")
+
+    def test_rounded_rounds_half_up(self):
+        assert CentsMoney.rounded(Decimal("10.005")).cents == 1001
+        assert CentsMoney.rounded(Decimal("10.004")).cents == 1000
+        assert CentsMoney.rounded(Decimal("7")).cents == 700
+
+    def test_negative_amount_raises_error(self):
+        with pytest.raises(ValueError):
+            CentsMoney.from_string("-10.00")
+
+    def test_non_finite_amount_raises_error(self):
+        with pytest.raises(ValueError):
+            CentsMoney.from_string("Infinity")
+
+    def test_apply_modifier_rounds_half_up(self):
+        # 0.05 * 0.5 = 0.025 rounds up to 0.03
+        assert CentsMoney(5).apply_modifier(Decimal("0.5")).to_string() == "0.03"
+        assert (CentsMoney(10000) * Decimal("0.333")).to_string() == "33.30"
+
+    def test_negative_modifier_raises_error(self):
+        with pytest.raises(ValueError):
+            CentsMoney(100).apply_modifier(Decimal("-1"))
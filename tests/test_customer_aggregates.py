@@ -0,0 +1,176 @@
+import importlib
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure.persistence.database import Base
+from app.infrastructure.persistence.models import CustomerAggregateShardModel
+from app.infrastructure.repositories.sqlalchemy_customer_repository import (
+    SqlAlchemyCustomerRepository,
+)
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+from app.presentation.graphql import resolvers
+from tests.conftest import create_transaction
+
+
+reconcile_tool = importlib.import_module("app.tools.reconcile_customers")
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _on_day(day: int) -> datetime:
+    return START + timedelta(days=day, hours=10)
+
+
+@pytest_asyncio.fixture
+async def async_engine(tmp_path):
+    # A file database so that reconciliation slices can use their own connections
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'customers.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+async def _save(session_context, transactions):
+    async with session_context() as session:
+        await SqlAlchemyTransactionRepository(session).save_many(transactions)
+
+
+@pytest.mark.asyncio
+async def test_saves_spread_over_shards(session_context):
+    await _save(session_context, [
+        create_transaction("hot", transaction_datetime=_on_day(day)) for day in range(24)
+    ])
+    async with session_context() as session:
+        await SqlAlchemyTransactionRepository(session).save(
+            create_transaction("hot", transaction_datetime=_on_day(30), final_price="5.00", points=1)
+        )
+
+    async with session_context() as session:
+        shards = await session.scalar(
+            select(func.count()).select_from(CustomerAggregateShardModel)
+            .where(CustomerAggregateShardModel.customer_id == "hot")
+        )
+        summary = await SqlAlchemyCustomerRepository(session).get_summary("hot")
+        missing = await SqlAlchemyCustomerRepository(session).get_summary("nobody")
+
+    assert shards > 1
+    assert summary == {
+        "lifetime_spend": Decimal("2285.00"),
+        "points_earned": 121,
+        "transaction_count": 25,
+    }
+    assert missing is None
+
+
+@pytest.mark.asyncio
+async def test_customer_query(session_context, monkeypatch):
+    await _save(session_context, [
+        create_transaction("c1", transaction_datetime=_on_day(0)),
+        create_transaction("c1", transaction_datetime=_on_day(1), final_price="10.50", points=2),
+    ])
+    monkeypatch.setattr(resolvers, "get_session_context", session_context)
+
+    customer = await resolvers.get_customer("c1")
+
+    assert (customer.id, customer.lifetime_spend, customer.points_earned, customer.transaction_count) == (
+        "c1", "105.50", 7, 2
+    )
+    assert await resolvers.get_customer("nobody") is None
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_incremental_totals(session_context):
+    await _save(session_context, [
+        create_transaction(f"c{day % 3}", transaction_datetime=_on_day(day)) for day in range(12)
+    ])
+
+    async with session_context() as session:
+        maintained = await SqlAlchemyCustomerRepository(session).stored_totals()
+    async with session_context() as session:
+        await SqlAlchemyCustomerRepository(session).rebuild()
+    async with session_context() as session:
+        rebuilt = await SqlAlchemyCustomerRepository(session).stored_totals()
+
+    assert rebuilt == maintained
+    assert rebuilt["c0"] == (Decimal("380.00"), 20, 4)
+
+
+@pytest.mark.asyncio
+async def test_reconciliation_repairs_drift(session_context):
+    await _save(session_context, [
+        create_transaction(f"c{day % 4}", transaction_datetime=_on_day(day)) for day in range(40)
+    ])
+    async with session_context() as session:
+        await session.execute(
+            update(CustomerAggregateShardModel)
+            .where(CustomerAggregateShardModel.customer_id == "c1")
+            .values(points_earned=0)
+        )
+        await SqlAlchemyCustomerRepository(session).adjust({"ghost": (Decimal("1.00"), 1, 1)})
+
+    reconciler = reconcile_tool.CustomerReconciler(session_context, workers=3, slice_days=7)
+    report = await reconciler.run(dry_run=True)
+    assert (report.drifted, report.removed, report.slices, report.customers) == (["c1"], ["ghost"], 6, 4)
+
+    await reconciler.run()
+    async with session_context() as session:
+        repository = SqlAlchemyCustomerRepository(session)
+        assert await repository.get_summary("c1") == {
+            "lifetime_spend": Decimal("950.00"),
+            "points_earned": 50,
+            "transaction_count": 10,
+        }
+        assert await repository.get_summary("ghost") is None
+
+    assert (await reconciler.run(dry_run=True)).drifted == []
+
+
+@pytest.mark.asyncio
+async def test_reconciliation_keeps_payments_committed_during_the_run(session_context):
+    await _save(session_context, [
+        create_transaction("c1", transaction_datetime=_on_day(day)) for day in range(4)
+    ])
+    async with session_context() as session:
+        await session.execute(update(CustomerAggregateShardModel).values(points_earned=0))
+
+    opened = 0
+
+    @asynccontextmanager
+    async def context():
+        nonlocal opened
+        opened += 1
+        if opened == 2:
+            # A payment commits after the totals were read, before the repair
+            await _save(session_context, [
+                create_transaction("c1", transaction_datetime=_on_day(5), final_price="10.00", points=1)
+            ])
+        async with session_context() as session:
+            yield session
+
+    report = await reconcile_tool.CustomerReconciler(context, workers=2, slice_days=2).run()
+
+    assert report.drifted == ["c1"]
+    async with session_context() as session:
+        assert await SqlAlchemyCustomerRepository(session).get_summary("c1") == {
+            "lifetime_spend": Decimal("390.00"),
+            "points_earned": 21,
+            "transaction_count": 5,
+        }
+
+
+def test_time_slices_cover_the_range():
+    slices = reconcile_tool.time_slices(START, START + timedelta(days=10), 4)
+
+    assert slices[0][0] == START
+    assert [end - start for start, end in slices[:2]] == [timedelta(days=4)] * 2
+    assert slices[-1][1] > START + timedelta(days=10)
+    assert all(a[1] == b[0] for a, b in zip(slices, slices[1:]))
@@ -0,0 +1,166 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from functools import partial
+
+import httpx
+import pyarrow as pa
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from app.domain.value_objects.additional_item import AdditionalItem
+from app.domain.value_objects.payment_method import PaymentMethod
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.export.encoders import get_encoder
+from app.infrastructure.export.exporter import export_columns, stream_export
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+from app.presentation import export as export_endpoint
+from tests.conftest import create_transaction
+
+
+START = datetime(2024, 1, 15, 10, 0, tzinfo=timezone.utc)
+END = datetime(2024, 1, 15, 12, 59, 59, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def session_context(session_context):
+    async with session_context() as session:
+        await SqlAlchemyTransactionRepository(session).save_many([
+            create_transaction(
+                customer_id=f"c{i}",
+                payment_method=PaymentMethod.MASTERCARD if i % 2 else PaymentMethod.CASH,
+                transaction_datetime=START + timedelta(minutes=25 * i),
+                points=3,
+                additional_item=AdditionalItem(last4="1234") if i % 2 else None,
+            )
+            for i in range(7)
+        ])
+
+    return session_context
+
+
+async def _export(session_context, dataset, export_format, batch_size=3) -> bytes:
+    encoder = get_encoder(export_format, export_columns(dataset))
+    chunks = [
+        chunk
+        async for chunk in stream_export(dataset, encoder, START, END, batch_size, session_context)
+    ]
+    return b"".join(chunks)
+
+
+@pytest.mark.asyncio
+async def test_export_transactions_csv(session_context):
+    rows = list(csv.DictReader(io.StringIO((await _export(session_context, "transactions", "csv")).decode())))
+
+    assert [row["customer_id"] for row in rows] == [f"c{i}" for i in range(7)]
+    assert rows[0]["final_price"] == "95.00"
+    assert rows[0]["transaction_datetime"] == "2024-01-15T10:00:00+00:00"
+    assert rows[0]["additional_item"] == ""
+    assert json.loads(rows[1]["additional_item"]) == {"last4": "1234"}
+
+
+@pytest.mark.asyncio
+async def test_export_transactions_ndjson(session_context):
+    lines = (await _export(session_context, "transactions", "ndjson")).decode().splitlines()
+    records = [json.loads(line) for line in lines]
+
+    assert len(records) == 7
+    assert records[1]["additional_item"] == {"last4": "1234"}
+    assert records[1]["payment_method"] == "MASTERCARD"
+    assert records[1]["points"] == 3
+
+
+@pytest.mark.asyncio
+async def test_export_transactions_arrow(session_context):
+    table = pa.ipc.open_stream(await _export(session_context, "transactions", "arrow")).read_all()
+
+    assert table.num_rows == 7
+    assert table.schema.field("price").type == pa.decimal128(12, 2)
+    assert table.column("final_price").to_pylist()[0] == Decimal("95.00")
+    assert table.column("transaction_datetime").to_pylist()[0] == START
+
+
+@pytest.mark.asyncio
+async def test_export_sales_arrow(session_context):
+    table = pa.ipc.open_stream(await _export(session_context, "sales", "arrow", batch_size=2)).read_all()
+
+    assert table.column("sales").to_pylist() == [Decimal("285.00"), Decimal("190.00"), Decimal("190.00")]
+    assert table.column("points").to_pylist() == [9, 6, 6]
+
+
+@pytest.mark.asyncio
+async def test_export_empty_range_has_header_only(session_context):
+    encoder = get_encoder("csv", export_columns("sales"))
+    chunks = [
+        chunk
+        async for chunk in stream_export("sales", encoder, END + timedelta(days=1), END + timedelta(days=2), 10, session_context)
+    ]
+    assert b"".join(chunks) == b"datetime,sales,points\n"
+
+
+def test_unknown_format_and_dataset():
+    with pytest.raises(ValueError):
+        get_encoder("xml", export_columns("sales"))
+    with pytest.raises(ValueError):
+        export_columns("customers")
+
+
+@pytest.mark.asyncio
+async def test_export_endpoint_streams(session_context, monkeypatch):
+    monkeypatch.setattr(
+        export_endpoint,
+        "stream_export",
+        partial(stream_export, session_context=session_context),
+    )
+    monkeypatch.setattr(export_endpoint, "get_settings", lambda: Settings(export_token="secret"))
+    app = FastAPI()
+    app.include_router(export_endpoint.export_router)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        headers={"Authorization": "Bearer secret"},
+    ) as client:
+        response = await client.get(
+            "/export/transactions",
+            params={"start": "2024-01-15T10:00:00Z", "end": "2024-01-15T12:59:59Z", "format": "ndjson"},
+        )
+        bad_format = await client.get(
+            "/export/transactions",
+            params={"start": "2024-01-15T10:00:00Z", "end": "2024-01-15T12:59:59Z", "format": "xml"},
+        )
+        bad_start = await client.get("/export/sales", params={"start": "yesterday", "end": "2024-01-15T12:59:59Z"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-length" not in response.headers
+    assert len(response.text.splitlines()) == 7
+    assert bad_format.status_code == 400
+    assert bad_start.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("configured, authorization", [
+    ("secret", None),
+    ("secret", "Bearer wrong"),
+    ("", "Bearer "),
+])
+async def test_export_endpoint_requires_token(monkeypatch, configured, authorization):
+    monkeypatch.setattr(export_endpoint, "get_settings", lambda: Settings(export_token=configured))
+    app = FastAPI()
+    app.include_router(export_endpoint.export_router)
+    headers = {"Authorization": authorization} if authorization is not None else {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(
+            "/export/transactions",
+            params={"start": "2024-01-15T10:00:00Z", "end": "2024-01-15T12:59:59Z"},
+            headers=headers,
+        )
+
+    assert response.status_code == 401
@@ -0,0 +1,165 @@
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.dto.payment_dto import SalesRequest
+from app.application.use_cases.get_sales_report import GetSalesReportUseCase
+from app.domain.value_objects.granularity import (
+    Granularity,
+    ceil_bucket,
+    floor_bucket,
+    next_bucket,
+)
+from app.infrastructure.persistence.models import SalesRollupModel
+from app.infrastructure.persistence.rollups import RollupRead, plan_rollup_reads
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+from tests.conftest import create_transaction
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def repository(async_session: AsyncSession):
+    return SqlAlchemyTransactionRepository(async_session)
+
+
+def test_bucket_boundaries():
+    value = _utc(2024, 2, 29, 13, 47, 31, 5)  # a Thursday
+
+    assert floor_bucket(value, Granularity.MINUTE) == _utc(2024, 2, 29, 13, 47)
+    assert floor_bucket(value, Granularity.FIVE_MINUTES) == _utc(2024, 2, 29, 13, 45)
+    assert floor_bucket(value, Granularity.HOUR) == _utc(2024, 2, 29, 13)
+    assert floor_bucket(value, Granularity.DAY) == _utc(2024, 2, 29)
+    assert floor_bucket(value, Granularity.WEEK) == _utc(2024, 2, 26)
+    assert floor_bucket(value, Granularity.MONTH) == _utc(2024, 2, 1)
+    assert next_bucket(_utc(2024, 12, 1), Granularity.MONTH) == _utc(2025, 1, 1)
+    assert ceil_bucket(_utc(2024, 3, 1), Granularity.MONTH) == _utc(2024, 3, 1)
+    assert ceil_bucket(value, Granularity.MONTH) == _utc(2024, 3, 1)
+
+
+def test_plan_uses_coarsest_levels_in_the_middle():
+    plan = plan_rollup_reads(_utc(2024, 1, 30, 22, 30), _utc(2024, 3, 2, 1, 59, 59, 999999), Granularity.MONTH)
+
+    assert plan.reads == [
+        RollupRead(Granularity.MINUTE, _utc(2024, 1, 30, 22, 30), _utc(2024, 1, 30, 22, 59)),
+        RollupRead(Granularity.HOUR, _utc(2024, 1, 30, 23), _utc(2024, 1, 30, 23)),
+        RollupRead(Granularity.DAY, _utc(2024, 1, 31), _utc(2024, 1, 31)),
+        RollupRead(Granularity.MONTH, _utc(2024, 2, 1), _utc(2024, 2, 1)),
+        RollupRead(Granularity.DAY, _utc(2024, 3, 1), _utc(2024, 3, 1)),
+        RollupRead(Granularity.HOUR, _utc(2024, 3, 2), _utc(2024, 3, 2, 1)),
+    ]
+    assert plan.raw_spans == []
+
+
+def test_plan_skips_levels_that_do_not_nest():
+    # Months straddle weeks, so weeks are built from days
+    plan = plan_rollup_reads(_utc(2024, 1, 1), _utc(2024, 3, 31, 23, 59, 59, 999999), Granularity.WEEK)
+    assert {read.level for read in plan.reads} == {Granularity.DAY}
+
+    plan = plan_rollup_reads(_utc(2024, 1, 1, 10, 0, 30), _utc(2024, 1, 1, 10, 20), Granularity.FIVE_MINUTES)
+    assert {read.level for read in plan.reads} == {Granularity.MINUTE}
+    assert plan.raw_spans == [
+        (_utc(2024, 1, 1, 10, 0, 30), _utc(2024, 1, 1, 10, 0, 59, 999999)),
+        (_utc(2024, 1, 1, 10, 20), _utc(2024, 1, 1, 10, 20)),
+    ]
+
+
+def _expected(transactions, granularity, start, end):
+    totals = defaultdict(lambda: [Decimal("0"), 0])
+    for t in transactions:
+        if start <= t.transaction_datetime <= end:
+            total = totals[floor_bucket(t.transaction_datetime, granularity)]
+            total[0] += t.final_price.amount
+            total[1] += t.points
+    return [(bucket, sales, points) for bucket, (sales, points) in sorted(totals.items())]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("granularity", list(Granularity))
+async def test_get_sales_matches_raw_aggregation(repository, granularity):
+    rng = random.Random(7)
+    origin = _utc(2024, 1, 28)
+    transactions = [
+        create_transaction(
+            transaction_datetime=origin + timedelta(seconds=rng.randrange(40 * 24 * 3600)),
+            final_price=f"{rng.randint(1, 500)}.{rng.randint(0, 99):02d}",
+            points=rng.randint(0, 20),
+        )
+        for _ in range(300)
+    ]
+    await repository.save_many(transactions)
+
+    start = _utc(2024, 1, 30, 7, 12, 41)
+    end = _utc(2024, 3, 3, 18, 2, 9)
+    result = await repository.get_sales(start, end, granularity)
+
+    assert [(row["datetime"], row["sales"], row["points"]) for row in result] == _expected(
+        transactions, granularity, start, end
+    )
+
+
+@pytest.mark.asyncio
+async def test_rebuild_derives_coarse_levels(repository, async_session):
+    transactions = [
+        create_transaction(transaction_datetime=_utc(2024, 1, 31, 23, 59, 30)),
+        create_transaction(transaction_datetime=_utc(2024, 2, 1, 0, 0, 10)),
+        create_transaction(transaction_datetime=_utc(2024, 2, 1, 0, 0, 50), final_price="5.00", points=1),
+    ]
+    await repository.save_many(transactions)
+
+    async def levels():
+        result = await async_session.execute(
+            select(
+                SalesRollupModel.granularity,
+                func.count(),
+                func.sum(SalesRollupModel.sales),
+                func.sum(SalesRollupModel.transaction_count),
+            ).group_by(SalesRollupModel.granularity).order_by(SalesRollupModel.granularity)
+        )
+        return [tuple(row) for row in result.all()]
+
+    maintained = await levels()
+    await repository.rebuild_hourly_sales_rollup()
+
+    assert await levels() == maintained
+    assert maintained == [
+        ("DAY", 2, Decimal("195.00"), 3),
+        ("MINUTE", 2, Decimal("195.00"), 3),
+        ("MONTH", 2, Decimal("195.00"), 3),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_daily_report_pages_by_day(repository):
+    await repository.save_many([
+        create_transaction(transaction_datetime=_utc(2024, 1, day, 12)) for day in (1, 2, 2, 5)
+    ])
+    use_case = GetSalesReportUseCase(repository)
+    request = SalesRequest(
+        start_datetime="2024-01-01T00:00:00Z",
+        end_datetime="2024-01-31T23:59:59Z",
+        first=2,
+        granularity=Granularity.DAY,
+    )
+
+    first_page = await use_case.execute(request)
+    request.after = first_page.end_cursor
+    second_page = await use_case.execute(request)
+
+    assert [(day.datetime, day.sales) for day in first_page.sales] == [
+        ("2024-01-01T00:00:00Z", "95.00"),
+        ("2024-01-02T00:00:00Z", "190.00"),
+    ]
+    assert first_page.has_next_page
+    assert [day.datetime for day in second_page.sales] == ["2024-01-05T00:00:00Z"]
+    assert not second_page.has_next_page
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.infrastructure.persistence.group_commit import (
+    GROUP_COMMIT_BATCH_SIZE,
+    GROUP_COMMIT_FAILED_BATCHES,
+    GROUP_COMMIT_QUEUE_DELAY,
+    GroupCommitter,
+)
+from app.infrastructure.persistence.models import TransactionModel
+from app.infrastructure.repositories.idempotency_repository import (
+    SqlAlchemyIdempotencyRepository,
+)
+from tests.conftest import create_transaction
+
+
+async def _count_transactions(session_context) -> int:
+    async with session_context() as session:
+        return await session.scalar(select(func.count()).select_from(TransactionModel))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_one_commit(session_context):
+    committer = GroupCommitter(session_context, max_batch_size=10, max_wait_ms=50)
+    batch_sizes = GROUP_COMMIT_BATCH_SIZE.sum()
+    queue_delays = GROUP_COMMIT_QUEUE_DELAY.count()
+
+    transactions = [create_transaction(f"customer{i}") for i in range(5)]
+    saved = await asyncio.gather(*(committer.submit(t) for t in transactions))
+    await committer.close()
+
+    assert saved == transactions
+    assert await _count_transactions(session_context) == 5
+    assert committer.metrics.batches == 1
+    assert committer.metrics.max_batch_size == 5
+    assert committer.metrics.average_queue_delay_seconds >= 0
+    assert GROUP_COMMIT_BATCH_SIZE.sum() == batch_sizes + 5
+    assert GROUP_COMMIT_QUEUE_DELAY.count() == queue_delays + 5
+
+@pytest.mark.asyncio
+async def test_batch_size_limit_splits_commits(session_context):
+    committer = GroupCommitter(session_context, max_batch_size=2, max_wait_ms=50)
+
+    await asyncio.gather(*(committer.submit(create_transaction()) for _ in range(5)))
+    await committer.close()
+
+    assert await _count_transactions(session_context) == 5
+    assert committer.metrics.batches == 3
+    assert committer.metrics.max_batch_size == 2
+
+@pytest.mark.asyncio
+async def test_failed_write_does_not_fail_other_writes(session_context):
+    committer = GroupCommitter(session_context, max_batch_size=10, max_wait_ms=50)
+    existing = create_transaction()
+    await committer.submit(existing)
+    failed_batches = GROUP_COMMIT_FAILED_BATCHES.value()
+
+    results = await asyncio.gather(
+        committer.submit(create_transaction("customer1")),
+        committer.submit(existing),
+        committer.submit(create_transaction("customer2")),
+        return_exceptions=True,
+    )
+    await committer.close()
+
+    assert not isinstance(results[0], Exception)
+    assert isinstance(results[1], Exception)
+    assert not isinstance(results[2], Exception)
+    assert await _count_transactions(session_context) == 3
+    assert committer.metrics.failed_batches == 1
+    assert GROUP_COMMIT_FAILED_BATCHES.value() == failed_batches + 1
+
+
+@pytest.mark.asyncio
+async def test_reused_idempotency_key_rolls_back_its_payment(session_context):
+    committer = GroupCommitter(session_context, max_batch_size=10, max_wait_ms=50)
+
+    # As if two instances retried the same payment; both reach the database
+    results = await asyncio.gather(
+        committer.submit(create_transaction("first"), "retry-1"),
+        committer.submit(create_transaction("second"), "retry-1"),
+        committer.submit(create_transaction("unkeyed")),
+        return_exceptions=True,
+    )
+    await committer.close()
+
+    assert isinstance(results[1], IntegrityError)
+    assert results[0].customer_id == "first"
+    assert results[2].customer_id == "unkeyed"
+    assert await _count_transactions(session_context) == 2
+    async with session_context() as session:
+        stored = await SqlAlchemyIdempotencyRepository(session).get("retry-1")
+    assert (stored.final_price, stored.points) == ("95.00", 5)
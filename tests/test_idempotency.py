@@ -0,0 +1,195 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.application.dto.payment_dto import PaymentResponse
+from app.domain.value_objects.payment_method import PaymentMethod
+from app.infrastructure.cache.idempotency_cache import (
+    IDEMPOTENCY_CACHE_EVICTIONS,
+    IDEMPOTENT_EXECUTIONS,
+    PaymentIdempotencyCache,
+)
+from app.infrastructure.persistence.models import TransactionModel
+from app.infrastructure.repositories.idempotency_repository import (
+    SqlAlchemyIdempotencyRepository,
+)
+from app.presentation.graphql import resolvers
+from app.presentation.graphql.types import PaymentError, PaymentInput, PaymentResult
+
+
+RESPONSE = PaymentResponse(final_price="95.00", points=5)
+
+
+async def _no_stored_response(idempotency_key):
+    return None
+
+
+@pytest.mark.asyncio
+async def test_retry_is_answered_from_cache():
+    cache = PaymentIdempotencyCache(load=_no_stored_response)
+    executions = IDEMPOTENT_EXECUTIONS.value()
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        return RESPONSE
+
+    assert await cache.execute("key-1", operation) == RESPONSE
+    assert await cache.execute("key-1", operation) == RESPONSE
+    assert len(calls) == 1
+    assert cache.stats.executions == 1
+    assert IDEMPOTENT_EXECUTIONS.value() == executions + 1
+    assert cache.stats.cache_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_run_once():
+    cache = PaymentIdempotencyCache(load=_no_stored_response)
+    calls = []
+    release = asyncio.Event()
+
+    async def operation():
+        calls.append(1)
+        await release.wait()
+        return RESPONSE
+
+    tasks = [asyncio.create_task(cache.execute("key-1", operation)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [RESPONSE] * 5
+    assert len(calls) == 1
+    assert cache.stats.collapsed == 4
+
+
+@pytest.mark.asyncio
+async def test_failures_are_shared_but_not_remembered():
+    cache = PaymentIdempotencyCache(load=_no_stored_response)
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise ValueError("declined")
+
+    tasks = [asyncio.create_task(cache.execute("key-1", failing)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def succeeding():
+        return RESPONSE
+
+    assert await cache.execute("key-1", succeeding) == RESPONSE
+
+
+@pytest.mark.asyncio
+async def test_stored_result_is_used_on_cache_miss():
+    async def load(idempotency_key):
+        return RESPONSE
+
+    async def operation():
+        raise AssertionError("should not run")
+
+    cache = PaymentIdempotencyCache(load=load)
+
+    assert await cache.execute("key-1", operation) == RESPONSE
+    assert cache.stats.stored_hits == 1
+    assert cache.get("key-1") == RESPONSE
+
+
+@pytest.mark.asyncio
+async def test_losing_the_insert_race_returns_the_stored_result():
+    stored = {}
+
+    async def load(idempotency_key):
+        return stored.get(idempotency_key)
+
+    async def operation():
+        # Another instance committed the key between the lookup and the insert
+        stored["key-1"] = RESPONSE
+        raise IntegrityError("INSERT", {}, Exception("duplicate key"))
+
+    cache = PaymentIdempotencyCache(load=load)
+
+    assert await cache.execute("key-1", operation) == RESPONSE
+
+
+def test_lru_eviction():
+    cache = PaymentIdempotencyCache(load=_no_stored_response, max_entries=2)
+    evictions = IDEMPOTENCY_CACHE_EVICTIONS.value()
+    cache.put("a", RESPONSE)
+    cache.put("b", RESPONSE)
+    cache.get("a")
+    cache.put("c", RESPONSE)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == RESPONSE
+    assert cache.stats.evictions == 1
+    assert IDEMPOTENCY_CACHE_EVICTIONS.value() == evictions + 1
+
+
+@pytest.mark.asyncio
+async def test_repository_rejects_a_reused_key(session_context):
+    async with session_context() as session:
+        await SqlAlchemyIdempotencyRepository(session).save("key-1", RESPONSE)
+
+    with pytest.raises(IntegrityError):
+        async with session_context() as session:
+            await SqlAlchemyIdempotencyRepository(session).save("key-1", RESPONSE)
+
+    async with session_context() as session:
+        assert await SqlAlchemyIdempotencyRepository(session).get("key-1") == RESPONSE
+        assert await SqlAlchemyIdempotencyRepository(session).get("key-2") is None
+
+
+def _payment_input(idempotency_key):
+    return PaymentInput(
+        customer_id="customer123",
+        price="100.00",
+        price_modifier=0.95,
+        payment_method=PaymentMethod.CASH,
+        datetime="2024-01-15T10:30:00Z",
+        idempotency_key=idempotency_key,
+    )
+
+
+@pytest.mark.asyncio
+async def test_payment_mutation_inserts_once_per_key(session_context, monkeypatch):
+    async def load(idempotency_key):
+        async with session_context() as session:
+            return await SqlAlchemyIdempotencyRepository(session).get(idempotency_key)
+
+    cache = PaymentIdempotencyCache(load=load)
+    monkeypatch.setattr(resolvers, "get_session_context", session_context)
+    monkeypatch.setattr(resolvers, "get_idempotency_cache", lambda: cache)
+
+    results = await asyncio.gather(*(resolvers.process_payment(_payment_input("retry-1")) for _ in range(3)))
+    cache.clear()
+    # A restarted process finds the key in the table
+    replayed = await resolvers.process_payment(_payment_input("retry-1"))
+    await resolvers.process_payment(_payment_input(None))
+    invalid = await resolvers.process_payment(_payment_input("x" * 256))
+
+    assert all(isinstance(result, PaymentResult) for result in [*results, replayed])
+    assert {(result.final_price, result.points) for result in [*results, replayed]} == {("95.00", 5)}
+    assert isinstance(invalid, PaymentError)
+    assert invalid.details[0].field == "idempotencyKey"
+    async with session_context() as session:
+        assert await session.scalar(select(func.count()).select_from(TransactionModel)) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_mutation_rejects_keyed_items(session_context, monkeypatch):
+    monkeypatch.setattr(resolvers, "get_session_context", session_context)
+
+    results = await resolvers.process_payments([_payment_input(None), _payment_input("retry-1")])
+
+    assert isinstance(results[0], PaymentResult)
+    assert isinstance(results[1], PaymentError)
+    assert results[1].details[0].field == "idempotencyKey"
+    async with session_context() as session:
+        assert await session.scalar(select(func.count()).select_from(TransactionModel)) == 1
@@ -0,0 +1,117 @@
+import importlib
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.infrastructure.persistence.models import HourlySalesRollupModel, TransactionModel
+
+
+import_tool = importlib.import_module("app.tools.import")
+
+CSV_HEADER = "customerId,price,priceModifier,paymentMethod,datetime,additionalItem\n"
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_price_chunk_rejects_malformed_and_invalid_records():
+    chunk = [
+        (1, '{"customerId": "c1", "price": "100.00", "priceModifier": 0.95, '
+            '"paymentMethod": "CASH", "datetime": "2020-03-01T10:15:00Z"}'),
+        (2, "not json"),
+        (3, '{"customerId": "c1", "price": "100.00", "priceModifier": 0.5, '
+            '"paymentMethod": "CASH", "datetime": "2020-03-01T10:15:00Z"}'),
+        (4, {"customerId": "c1", "price": "100.00", "priceModifier": "1",
+             "paymentMethod": "VISA", "datetime": "yesterday"}),
+        (5, {"customerId": "c1", "price": "100.00", "paymentMethod": "CASH"}),
+    ]
+
+    transactions, rejected = import_tool.price_chunk(chunk)
+
+    assert len(transactions) == 1
+    assert transactions[0].final_price.amount == Decimal("95.00")
+    assert transactions[0].points == 5
+    assert sorted(entry["line"] for entry in rejected) == [2, 3, 4, 5]
+    by_line = {entry["line"]: entry for entry in rejected}
+    assert by_line[3]["errors"][0]["field"] == "priceModifier"
+    assert "priceModifier" in by_line[5]["error"]
+
+
+@pytest.mark.asyncio
+async def test_import_csv_and_ndjson(tmp_path, session_context):
+    csv_path = _write(tmp_path, "history.csv", CSV_HEADER + (
+        'c1,100.00,0.95,CASH,2020-03-01T10:15:00Z,\n'
+        'c2,50.00,1,MASTERCARD,2020-03-01T10:45:00Z,"{""last4"": ""1234""}"\n'
+        'c3,50.00,1,MASTERCARD,2020-03-01T11:00:00Z,\n'
+    ))
+    ndjson_path = _write(tmp_path, "history.ndjson", (
+        '{"customerId": "c4", "price": "10.00", "priceModifier": 1, '
+        '"paymentMethod": "CASH_ON_DELIVERY", "datetime": "2020-03-01T11:30:00Z", '
+        '"additionalItem": {"courier": "YAMATO"}}\n'
+        "\n"
+        "{broken\n"
+    ))
+    records = [
+        *import_tool.read_records(csv_path, import_tool.detect_format(csv_path)),
+        *import_tool.read_records(ndjson_path, import_tool.detect_format(ndjson_path)),
+    ]
+    rejected_file = io.StringIO()
+    progress = []
+
+    importer = import_tool.TransactionImporter(session_context=session_context, chunk_size=2)
+    stats = await importer.run(records, rejected_file, on_progress=lambda s: progress.append(s.imported))
+
+    assert stats.imported == 3
+    assert stats.rejected == 2
+    assert progress == [2, 3, 3]
+    rejected = [json.loads(line) for line in rejected_file.getvalue().splitlines()]
+    assert [entry["line"] for entry in rejected] == [4, 3]
+    assert rejected[0]["errors"][0]["field"] == "additionalItem.last4"
+
+    async with session_context() as session:
+        assert await session.scalar(select(func.count()).select_from(TransactionModel)) == 3
+        rollup = (await session.execute(
+            select(HourlySalesRollupModel.sales, HourlySalesRollupModel.transaction_count)
+            .order_by(HourlySalesRollupModel.hour_bucket)
+        )).all()
+    assert [(Decimal(str(sales)), count) for sales, count in rollup] == [
+        (Decimal("145.00"), 2),
+        (Decimal("10.00"), 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_with_process_pool(tmp_path, session_context):
+    lines = [
+        json.dumps({
+            "customerId": f"c{i}",
+            "price": "10.00",
+            "priceModifier": 1,
+            "paymentMethod": "CASH",
+            "datetime": datetime(2019, 1, 1, i % 24, tzinfo=timezone.utc).isoformat(),
+        })
+        for i in range(50)
+    ]
+    path = _write(tmp_path, "history.jsonl", "\n".join(lines) + "\n")
+
+    importer = import_tool.TransactionImporter(session_context=session_context, chunk_size=7, workers=2)
+    stats = await importer.run(import_tool.read_records(path, "ndjson"), io.StringIO())
+
+    assert stats.imported == 50
+    assert stats.rejected == 0
+    async with session_context() as session:
+        assert await session.scalar(select(func.sum(HourlySalesRollupModel.transaction_count))) == 50
+
+
+def test_detect_format():
+    assert import_tool.detect_format(import_tool.Path("a.CSV")) == "csv"
+    assert import_tool.detect_format(import_tool.Path("a.jsonl")) == "ndjson"
+    with pytest.raises(ValueError):
+        import_tool.detect_format(import_tool.Path("a.txt"))
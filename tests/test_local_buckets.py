@@ -0,0 +1,171 @@
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.dto.payment_dto import SalesRequest
+from app.application.use_cases.get_sales_report import GetSalesReportUseCase
+from app.domain.entities.transaction import Transaction
+from app.domain.services.local_buckets import local_bucket_starts, parse_timezone
+from app.domain.value_objects.granularity import Granularity, floor_bucket
+from app.domain.value_objects.money import Money
+from app.domain.value_objects.payment_method import PaymentMethod
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class SpyRepository(SqlAlchemyTransactionRepository):
+    """Records the UTC reads the use case makes"""
+
+    def __init__(self, session):
+        super().__init__(session)
+        self.reads = []
+
+    async def get_hourly_sales(self, start_datetime, end_datetime, limit=None):
+        self.reads.append((Granularity.HOUR, start_datetime, end_datetime))
+        return await super().get_hourly_sales(start_datetime, end_datetime, limit)
+
+    async def get_sales(self, start_datetime, end_datetime, granularity, limit=None):
+        self.reads.append((granularity, start_datetime, end_datetime))
+        return await super().get_sales(start_datetime, end_datetime, granularity, limit)
+
+
+@pytest_asyncio.fixture
+async def repository(async_session: AsyncSession):
+    return SpyRepository(async_session)
+
+
+def test_dst_days_keep_their_length():
+    # 2024-03-10 has 23 hours and 2024-11-03 has 25 in New York
+    spring = local_bucket_starts(_utc(2024, 3, 9, 12), _utc(2024, 3, 11, 12), NEW_YORK, Granularity.DAY)
+    fall = local_bucket_starts(_utc(2024, 11, 2, 12), _utc(2024, 11, 4, 12), NEW_YORK, Granularity.DAY)
+
+    assert [b - a for a, b in zip(spring, spring[1:])] == [timedelta(hours=24), timedelta(hours=23)]
+    assert [b - a for a, b in zip(fall, fall[1:])] == [timedelta(hours=24), timedelta(hours=25)]
+
+
+def test_repeated_hour_is_two_buckets():
+    starts = local_bucket_starts(_utc(2024, 11, 3, 4), _utc(2024, 11, 3, 7, 59), NEW_YORK, Granularity.HOUR)
+
+    assert [start.astimezone(NEW_YORK).isoformat() for start in starts] == [
+        "2024-11-03T00:00:00-04:00",
+        "2024-11-03T01:00:00-04:00",
+        "2024-11-03T01:00:00-05:00",
+        "2024-11-03T02:00:00-05:00",
+    ]
+
+
+def test_unknown_timezone():
+    with pytest.raises(ValueError):
+        parse_timezone("Mars/Olympus_Mons")
+
+
+def _expected(transactions, tz, granularity, start, end):
+    totals = defaultdict(lambda: [Decimal("0"), 0])
+    for t in transactions:
+        if start <= t.transaction_datetime <= end:
+            local = floor_bucket(t.transaction_datetime.astimezone(tz), granularity)
+            total = totals[local.astimezone(timezone.utc)]
+            total[0] += t.final_price.amount
+            total[1] += t.points
+    return [
+        (bucket.astimezone(tz).isoformat(timespec="seconds"), str(sales), points)
+        for bucket, (sales, points) in sorted(totals.items())
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tz_name", ["Asia/Tokyo", "Asia/Kolkata", "Asia/Kathmandu", "America/New_York", "Europe/London"])
+@pytest.mark.parametrize("granularity", [Granularity.FIVE_MINUTES, Granularity.HOUR, Granularity.DAY, Granularity.WEEK, Granularity.MONTH])
+async def test_local_report_matches_raw_aggregation(repository, tz_name, granularity):
+    rng = random.Random(11)
+    origin = _utc(2024, 10, 20)
+    transactions = [
+        Transaction(
+            customer_id="customer123",
+            price=Money.from_string("10.00"),
+            price_modifier=Decimal("1.0"),
+            payment_method=PaymentMethod.CASH,
+            transaction_datetime=origin + timedelta(seconds=rng.randrange(30 * 24 * 3600)),
+            final_price=Money.from_string(f"{rng.randint(1, 99)}.{rng.randint(0, 99):02d}"),
+            points=rng.randint(0, 9),
+        )
+        for _ in range(250)
+    ]
+    await repository.save_many(transactions)
+    tz = ZoneInfo(tz_name)
+
+    response = await GetSalesReportUseCase(repository).execute(SalesRequest(
+        start_datetime="2024-10-22T03:17:00Z",
+        end_datetime="2024-11-15T20:44:59Z",
+        granularity=granularity,
+        timezone=tz_name,
+    ))
+
+    assert [(bucket.datetime, bucket.sales, bucket.points) for bucket in response.sales] == _expected(
+        transactions, tz, granularity, _utc(2024, 10, 22, 3, 17), _utc(2024, 11, 15, 20, 44, 59)
+    )
+
+
+@pytest.mark.asyncio
+async def test_half_hour_offset_reads_minutes_only_around_boundaries(repository):
+    await GetSalesReportUseCase(repository).execute(SalesRequest(
+        start_datetime="2024-01-01T00:00:00",
+        end_datetime="2024-01-31T23:59:59",
+        granularity=Granularity.DAY,
+        timezone="Asia/Kolkata",
+    ))
+
+    hour_reads = [read for read in repository.reads if read[0] == Granularity.HOUR]
+    minute_reads = [read for read in repository.reads if read[0] == Granularity.MINUTE]
+    # Naive range ends are local: Kolkata midnight is 18:30 UTC the day before
+    assert hour_reads == [(Granularity.HOUR, _utc(2023, 12, 31, 18, 30), _utc(2024, 1, 31, 18, 29, 59))]
+    assert len(minute_reads) == 31
+    assert all(upper - lower < timedelta(hours=1) for _, lower, upper in minute_reads)
+
+
+@pytest.mark.asyncio
+async def test_local_pages(repository):
+    await repository.save_many([
+        Transaction(
+            customer_id="customer123",
+            price=Money.from_string("10.00"),
+            price_modifier=Decimal("1.0"),
+            payment_method=PaymentMethod.CASH,
+            transaction_datetime=_utc(2024, 1, 1, hour),
+            final_price=Money.from_string("10.00"),
+            points=1,
+        )
+        # 14:00 and 15:00 UTC fall on different days in Tokyo
+        for hour in (13, 14, 15, 16)
+    ])
+    use_case = GetSalesReportUseCase(repository)
+    request = SalesRequest(
+        start_datetime="2024-01-01T00:00:00+09:00",
+        end_datetime="2024-01-03T00:00:00+09:00",
+        first=1,
+        granularity=Granularity.DAY,
+        timezone="Asia/Tokyo",
+    )
+
+    first_page = await use_case.execute(request)
+    request.after = first_page.end_cursor
+    second_page = await use_case.execute(request)
+
+    assert [(day.datetime, day.sales) for day in first_page.sales] == [("2024-01-01T00:00:00+09:00", "20.00")]
+    assert first_page.has_next_page
+    assert [(day.datetime, day.sales) for day in second_page.sales] == [("2024-01-02T00:00:00+09:00", "20.00")]
+    assert not second_page.has_next_page
@@ -0,0 +1,143 @@
+from typing import List
+
+import httpx
+import pytest
+import strawberry
+from fastapi import FastAPI
+
+from app.infrastructure.monitoring.metrics import MetricsRegistry
+from app.presentation.graphql import extensions
+from app.presentation.graphql.extensions import (
+    OPERATIONS,
+    RESOLVER_DURATION,
+    RESOLVER_ERRORS,
+    MetricsExtension,
+)
+from app.presentation.graphql.persisted_queries import PersistedQueryRegistry
+from app.presentation.graphql.types import PaymentError
+from app.presentation.metrics import HTTP_REQUEST_DURATION, MetricsMiddleware, metrics_router
+
+
+class TestMetricsRegistry:
+
+    def test_counter_render(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("payments_total", "Payments", ("method",))
+        counter.inc(("CASH",))
+        counter.inc(("CASH",), 2)
+
+        text = registry.render()
+
+        assert "# TYPE payments_total counter" in text
+        assert 'payments_total{method="CASH"} 3' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_count 3" in text
+        assert histogram.sum() == pytest.approx(5.55)
+
+    def test_register_returns_existing_metric(self):
+        registry = MetricsRegistry()
+        assert registry.counter("a_total", "A") is registry.counter("a_total", "A")
+        with pytest.raises(ValueError):
+            registry.histogram("a_total", "A")
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("errors_total", "Errors", ("message",)).inc(('say "hi"\n',))
+        assert 'errors_total{message="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+@strawberry.type
+class _Query:
+
+    @strawberry.field
+    def ok(self) -> str:
+        return "ok"
+
+    @strawberry.field
+    async def pay(self) -> List[PaymentError]:
+        return [PaymentError(error="Invalid price", kind="InvalidPriceException")]
+
+    @strawberry.field
+    def boom(self) -> str:
+        raise RuntimeError("boom")
+
+
+_schema = strawberry.Schema(query=_Query, extensions=[MetricsExtension])
+
+
+class TestMetricsExtension:
+
+    @pytest.mark.asyncio
+    async def test_records_root_resolver_latency(self, monkeypatch):
+        registry = PersistedQueryRegistry()
+        registry.register("query Ping { ok }")
+        monkeypatch.setattr(extensions, "get_persisted_queries", lambda: registry)
+        before = RESOLVER_DURATION.count(("Query.ok",))
+        result = await _schema.execute("query Ping { ok }")
+
+        assert result.errors is None
+        assert RESOLVER_DURATION.count(("Query.ok",)) == before + 1
+        assert OPERATIONS.value(("query", "Ping", "ok")) >= 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_operation_name_is_not_a_label(self, monkeypatch):
+        registry = PersistedQueryRegistry()
+        registry.register("query Ping { ok }")
+        monkeypatch.setattr(extensions, "get_persisted_queries", lambda: registry)
+
+        result = await _schema.execute("query Ping { ok }", operation_name="Injected")
+
+        assert result.errors
+        assert OPERATIONS.value(("query", "Injected", "error")) == 0
+
+    @pytest.mark.asyncio
+    async def test_counts_payment_errors_by_type(self):
+        labels = ("Query.pay", "InvalidPriceException")
+        before = RESOLVER_ERRORS.value(labels)
+
+        await _schema.execute("{ pay { error } }")
+
+        assert RESOLVER_ERRORS.value(labels) == before + 1
+
+    @pytest.mark.asyncio
+    async def test_counts_raised_errors(self):
+        before = RESOLVER_ERRORS.value(("Query.boom", "RuntimeError"))
+
+        result = await _schema.execute("query Boom { boom }")
+
+        assert result.errors
+        assert RESOLVER_ERRORS.value(("Query.boom", "RuntimeError")) == before + 1
+        # Not a persisted query, so the client's name is not used as a label
+        assert OPERATIONS.value(("query", "Boom", "error")) == 0
+        assert OPERATIONS.value(("query", "other", "error")) >= 1
+
+
+class TestMetricsEndpoint:
+
+    @pytest.mark.asyncio
+    async def test_middleware_and_metrics_route(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, paths=("/graphql",))
+        app.include_router(metrics_router)
+        before = HTTP_REQUEST_DURATION.count(("other", "GET", "404"))
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/unknown/path")
+            response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds_bucket" in response.text
+        assert HTTP_REQUEST_DURATION.count(("other", "GET", "404")) == before + 1
@@ -0,0 +1,198 @@
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    inspect,
+    insert,
+    select,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.schema import CreateIndex
+
+from app.domain.value_objects.additional_item import CourierService
+from app.domain.value_objects.payment_method import PaymentMethod
+from app.infrastructure.persistence.migrations import (
+    MIGRATIONS,
+    Migration,
+    applied_versions,
+    check_schema,
+    pending_migrations,
+    run_migrations,
+    schema_migrations,
+)
+from app.infrastructure.persistence.models import TransactionModel
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+from benchmarks.index_layouts import layouts_for
+
+
+# The transactions table as the app created it before versioned migrations
+legacy_transactions = Table(
+    "transactions",
+    MetaData(),
+    Column("id", PGUUID(as_uuid=True), primary_key=True),
+    Column("customer_id", String(255), nullable=False),
+    Column("price", Numeric(12, 2), nullable=False),
+    Column("price_modifier", Numeric(5, 2), nullable=False),
+    Column("payment_method", String(50), nullable=False),
+    Column("transaction_datetime", DateTime(timezone=True), primary_key=True),
+    Column("final_price", Numeric(12, 2), nullable=False),
+    Column("points", Integer, nullable=False),
+    Column("additional_item", JSON, nullable=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Index("ix_transactions_datetime", "transaction_datetime"),
+)
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.dispose()
+
+
+async def _transaction_indexes(engine):
+    async with engine.connect() as conn:
+        return await conn.run_sync(
+            lambda sync_conn: sorted(index["name"] for index in inspect(sync_conn).get_indexes("transactions"))
+        )
+
+
+@pytest.mark.asyncio
+async def test_fresh_database_is_migrated_once(engine):
+    async with engine.begin() as conn:
+        applied = await run_migrations(conn)
+    async with engine.begin() as conn:
+        again = await run_migrations(conn)
+        versions = await applied_versions(conn)
+
+    assert [m.version for m in applied] == [m.version for m in MIGRATIONS]
+    assert again == []
+    assert versions == [m.version for m in MIGRATIONS]
+    # The BRIN index is PostgreSQL-only
+    assert await _transaction_indexes(engine) == ["ix_transactions_datetime_covering", "uq_transactions_id"]
+
+
+@pytest.mark.asyncio
+async def test_legacy_schema_is_converted(engine):
+    ids = [uuid4(), uuid4(), uuid4()]
+    created_at = datetime(2024, 1, 15, 10, 31)
+    async with engine.begin() as conn:
+        await conn.run_sync(legacy_transactions.create)
+        await conn.execute(insert(legacy_transactions), [
+            dict(
+                id=ids[0], customer_id="c1", price=Decimal("100.00"), price_modifier=Decimal("0.95"),
+                payment_method="VISA", transaction_datetime=datetime(2024, 1, 15, 10, 30),
+                final_price=Decimal("95.00"), points=3, additional_item={"last4": "1234"},
+                created_at=created_at,
+            ),
+            dict(
+                id=ids[1], customer_id="c2", price=Decimal("1234567.89"), price_modifier=Decimal("1.00"),
+                payment_method="CASH_ON_DELIVERY", transaction_datetime=datetime(2024, 1, 15, 11),
+                final_price=Decimal("1234567.89"), points=61728, additional_item={"courier": "YAMATO"},
+                created_at=created_at,
+            ),
+            dict(
+                id=ids[2], customer_id="c3", price=Decimal("0.10"), price_modifier=Decimal("1.00"),
+                payment_method="BANK_TRANSFER", transaction_datetime=datetime(2024, 1, 15, 12),
+                final_price=Decimal("0.10"), points=0,
+                additional_item={"bank": "MUFG", "accountNumber": "0012345"}, created_at=created_at,
+            ),
+        ])
+
+    async with engine.begin() as conn:
+        assert [m.version for m in await pending_migrations(conn)] == [1, 2, 3, 4]
+        await run_migrations(conn)
+
+    assert await _transaction_indexes(engine) == ["ix_transactions_datetime_covering", "uq_transactions_id"]
+    async with AsyncSession(engine) as session:
+        repository = SqlAlchemyTransactionRepository(session)
+        models = (await session.execute(
+            select(TransactionModel).order_by(TransactionModel.transaction_datetime)
+        )).scalars().all()
+        transactions = [repository._to_entity(model) for model in models]
+
+    assert [model.id for model in models] == ids
+    assert [(model.payment_method_code, model.price_cents, model.final_price_cents) for model in models] == [
+        (3, 10000, 9500), (2, 123456789, 123456789), (11, 10, 10)
+    ]
+    visa, cod, transfer = transactions
+    assert (visa.payment_method, visa.final_price.amount, visa.additional_item.last4) == (
+        PaymentMethod.VISA, Decimal("95.00"), "1234"
+    )
+    assert (cod.price.amount, cod.additional_item.courier) == (Decimal("1234567.89"), CourierService.YAMATO)
+    assert (transfer.additional_item.bank, transfer.additional_item.account_number) == ("MUFG", "0012345")
+    assert transfer.additional_item.last4 is None
+
+
+@pytest.mark.asyncio
+async def test_composite_key_gets_a_unique_id_index(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(legacy_transactions.create)
+        await conn.run_sync(schema_migrations.create)
+        await conn.execute(insert(schema_migrations), [
+            {"version": m.version, "description": m.description, "applied_at": datetime(2024, 1, 1)}
+            for m in MIGRATIONS if m.version < 4
+        ])
+
+        assert [m.version for m in await run_migrations(conn)] == [4]
+
+    assert "uq_transactions_id" in await _transaction_indexes(engine)
+
+
+@pytest.mark.asyncio
+async def test_startup_check_requires_a_schema(engine):
+    with pytest.raises(RuntimeError):
+        await check_schema(engine)
+
+    async with engine.begin() as conn:
+        await run_migrations(conn, MIGRATIONS[:1])
+    assert await check_schema(engine) == len(MIGRATIONS) - 1
+
+    async with engine.begin() as conn:
+        await run_migrations(conn)
+    assert await check_schema(engine) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_migration_is_not_recorded(engine):
+    async def broken(conn):
+        raise RuntimeError("boom")
+
+    migrations = (*MIGRATIONS, Migration(99, "Broken", broken))
+    with pytest.raises(RuntimeError):
+        async with engine.begin() as conn:
+            await run_migrations(conn, migrations)
+
+    async with engine.connect() as conn:
+        assert [m.version for m in await pending_migrations(conn, migrations)] == [1, 2, 3, 4, 99]
+
+
+def test_postgresql_index_ddl():
+    ddl = {
+        index.name: str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        for index in TransactionModel.__table__.indexes
+    }
+
+    assert "USING brin (transaction_datetime)" in ddl["ix_transactions_datetime_brin"]
+    assert "(transaction_datetime) INCLUDE (final_price_cents, points)" in ddl["ix_transactions_datetime_covering"]
+
+
+def test_benchmark_layouts_per_dialect():
+    assert set(layouts_for("sqlite")) == {"btree", "covering"}
+    assert set(layouts_for("postgresql")) == {"btree", "brin", "covering", "brin_covering"}
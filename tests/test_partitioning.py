@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateTable
+
+from app.infrastructure.persistence.models import TransactionModel
+from app.infrastructure.persistence.partitioning import (
+    ensure_partitions,
+    is_partitioning_enabled,
+    next_partition_start,
+    partition_name,
+    partition_start,
+    upcoming_partitions,
+)
+
+
+def test_monthly_partition_bounds():
+    start = partition_start(datetime(2024, 12, 15, 10, 30, tzinfo=timezone.utc), "month")
+
+    assert start == datetime(2024, 12, 1, tzinfo=timezone.utc)
+    assert next_partition_start(start, "month") == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert partition_name("transactions", start, "month") == "transactions_p2024_12"
+
+def test_weekly_partition_starts_on_monday():
+    start = partition_start(datetime(2024, 1, 18, tzinfo=timezone.utc), "week")
+
+    assert start == datetime(2024, 1, 15, tzinfo=timezone.utc)
+    assert partition_name("transactions", start, "week") == "transactions_p2024w03"
+
+def test_partition_start_uses_utc():
+    start = partition_start(datetime.fromisoformat("2024-02-01T05:00:00+09:00"), "month")
+
+    assert start == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def test_upcoming_partitions_are_contiguous():
+    bounds = upcoming_partitions(datetime(2024, 11, 20, tzinfo=timezone.utc), "month", ahead=2)
+
+    assert bounds == [
+        (datetime(2024, 11, 1, tzinfo=timezone.utc), datetime(2024, 12, 1, tzinfo=timezone.utc)),
+        (datetime(2024, 12, 1, tzinfo=timezone.utc), datetime(2025, 1, 1, tzinfo=timezone.utc)),
+        (datetime(2025, 1, 1, tzinfo=timezone.utc), datetime(2025, 2, 1, tzinfo=timezone.utc)),
+    ]
+
+def test_unknown_interval_rejected():
+    assert not is_partitioning_enabled("none")
+    with pytest.raises(ValueError):
+        is_partitioning_enabled("fortnight")
+
+def test_postgresql_table_is_range_partitioned():
+    ddl = str(CreateTable(TransactionModel.__table__).compile(dialect=postgresql.dialect()))
+
+    assert "PARTITION BY RANGE (transaction_datetime)" in ddl
+    assert "PRIMARY KEY (id, transaction_datetime)" in ddl
+
+def test_unpartitioned_table_is_keyed_by_id():
+    script = (
+        "from sqlalchemy.dialects import postgresql\n"
+        "from sqlalchemy.schema import CreateTable\n"
+        "from app.infrastructure.persistence.models import TransactionModel\n"
+        "print(CreateTable(TransactionModel.__table__).compile(dialect=postgresql.dialect()))\n"
+    )
+    env = {**os.environ, "TRANSACTION_PARTITION_INTERVAL": "none"}
+    ddl = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True,
+    ).stdout
+
+    assert "PRIMARY KEY (id)" in ddl
+    assert "PARTITION BY" not in ddl
+
+@pytest.mark.asyncio
+async def test_ids_stay_unique_on_sqlite(async_engine):
+    row = {
+        "id": uuid4(), "transaction_datetime": datetime(2024, 1, 15, 10, 30), "created_at": datetime(2024, 1, 15),
+        "price_cents": 100, "final_price_cents": 100, "points": 0, "payment_method_code": 1,
+        "price_modifier": 1, "customer_id": "c1",
+    }
+    async with async_engine.begin() as conn:
+        await conn.execute(insert(TransactionModel), row)
+
+    with pytest.raises(IntegrityError):
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(TransactionModel), {
+                **row, "transaction_datetime": row["transaction_datetime"] + timedelta(hours=1),
+            })
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_is_noop_on_sqlite(async_engine):
+    async with async_engine.begin() as conn:
+        await ensure_partitions(conn, "transactions", "month", ahead=3)
@@ -0,0 +1,86 @@
+import re
+from decimal import Decimal
+
+from hypothesis import given, strategies as st
+
+from app.domain.services.payment_service import PaymentService
+from app.domain.services.payment_validator import PAYMENT_VALIDATORS, ValidationError
+from app.domain.value_objects.additional_item import AdditionalItem, CourierService
+from app.domain.value_objects.payment_method import PaymentMethod, get_payment_config
+
+
+def _reference_validate(payment_method, price_modifier, additional_item):
+    """The rule evaluation the compiled validators replace"""
+    errors = []
+    config = get_payment_config(payment_method)
+    if not config.is_valid_price_modifier(price_modifier):
+        errors.append(ValidationError(
+            field="priceModifier",
+            message=f"Price modifier must be between {config.min_price_modifier} "
+                    f"and {config.max_price_modifier} for {payment_method.value}",
+        ))
+    item = additional_item or AdditionalItem()
+    if config.requires_last4 and not (item.last4 is not None and re.match(r"^\d{4}$", item.last4)):
+        errors.append(ValidationError(
+            field="additionalItem.last4",
+            message="Card last 4 digits are required and must be exactly 4 digits",
+        ))
+    if config.requires_courier and item.courier is None:
+        errors.append(ValidationError(
+            field="additionalItem.courier",
+            message=f"Courier service is required. Allowed values: {[c.value for c in CourierService]}",
+        ))
+    if config.requires_bank_info and (item.bank is None or item.account_number is None):
+        errors.append(ValidationError(
+            field="additionalItem",
+            message="Bank name and account number are required for bank transfer",
+        ))
+    if config.requires_cheque_info and (item.bank is None or item.cheque_number is None):
+        errors.append(ValidationError(
+            field="additionalItem",
+            message="Bank name and cheque number are required for cheque payment",
+        ))
+    return errors
+
+
+optional_text = st.one_of(st.none(), st.sampled_from(["1234", "123", "12345", "abcd", "1234\n", ""]), st.text(max_size=6))
+additional_items = st.one_of(
+    st.none(),
+    st.builds(
+        AdditionalItem,
+        last4=optional_text,
+        courier=st.one_of(st.none(), st.sampled_from(list(CourierService))),
+        bank=st.one_of(st.none(), st.just("Bank")),
+        account_number=st.one_of(st.none(), st.just("123456")),
+        cheque_number=st.one_of(st.none(), st.just("CHQ1")),
+    ),
+)
+modifiers = st.decimals(min_value=Decimal("0.8"), max_value=Decimal("1.1"), places=3)
+
+
+@given(
+    payment_method=st.sampled_from(list(PaymentMethod)),
+    price_modifier=modifiers,
+    additional_item=additional_items,
+)
+def test_compiled_validator_matches_reference_rules(payment_method, price_modifier, additional_item):
+    expected = _reference_validate(payment_method, price_modifier, additional_item)
+    assert PAYMENT_VALIDATORS[payment_method].validate(price_modifier, additional_item) == expected
+
+
+def test_every_payment_method_is_compiled():
+    assert set(PAYMENT_VALIDATORS) == set(PaymentMethod)
+
+
+def test_batch_validation_keeps_request_order():
+    service = PaymentService()
+
+    results = service.validate_payments([
+        (PaymentMethod.CASH, Decimal("0.95"), None),
+        (PaymentMethod.VISA, Decimal("0.95"), AdditionalItem(last4="12")),
+        (PaymentMethod.CHEQUE, Decimal("2"), None),
+    ])
+
+    assert results[0] == []
+    assert [e.field for e in results[1]] == ["additionalItem.last4"]
+    assert [e.field for e in results[2]] == ["priceModifier", "additionalItem"]
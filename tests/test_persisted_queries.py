@@ -0,0 +1,152 @@
+import json
+
+import httpx
+import pytest
+import strawberry
+from fastapi import FastAPI
+
+from app.presentation.graphql.document_cache import (
+    DOCUMENT_CACHE_LOOKUPS,
+    DocumentCache,
+    DocumentCacheExtension,
+    get_document_cache,
+)
+from app.presentation.graphql.persisted_queries import (
+    DEFAULT_PERSISTED_QUERIES_DIR,
+    PersistedQueryRegistry,
+    PersistedQueryRouter,
+    query_hash,
+)
+from app.presentation.graphql.schema import schema as app_schema
+
+
+@strawberry.type
+class _Query:
+
+    @strawberry.field
+    def hello(self, name: str = "world") -> str:
+        return f"hello {name}"
+
+
+_schema = strawberry.Schema(query=_Query, extensions=[DocumentCacheExtension])
+
+HELLO = "query Hello($name: String) { hello(name: $name) }"
+
+
+class TestDocumentCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = DocumentCache(max_entries=2)
+        cache.put("a", object(), [])
+        cache.put("b", object(), [])
+        cache.get("a")
+        cache.put("c", object(), [])
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    @pytest.mark.asyncio
+    async def test_extension_serves_repeated_queries_from_cache(self):
+        get_document_cache().clear()
+        hits = DOCUMENT_CACHE_LOOKUPS.value(("hit",))
+
+        first = await _schema.execute(HELLO, variable_values={"name": "a"})
+        second = await _schema.execute(HELLO, variable_values={"name": "b"})
+
+        assert first.data == {"hello": "hello a"}
+        assert second.data == {"hello": "hello b"}
+        assert DOCUMENT_CACHE_LOOKUPS.value(("hit",)) == hits + 1
+
+    @pytest.mark.asyncio
+    async def test_validation_errors_are_cached_and_reported(self):
+        get_document_cache().clear()
+
+        for _ in range(2):
+            result = await _schema.execute("{ missing }")
+            assert result.errors
+            assert "missing" in result.errors[0].message
+
+    @pytest.mark.asyncio
+    async def test_syntax_errors_are_reported(self):
+        result = await _schema.execute("{ hello ")
+        assert result.errors
+
+
+class TestPersistedQueryRegistry:
+
+    def test_register_and_lookup(self):
+        registry = PersistedQueryRegistry()
+        digest = registry.register(HELLO, name="hello")
+
+        assert digest == query_hash(HELLO)
+        assert registry.get(digest) == HELLO
+        assert registry.is_registered(HELLO)
+        assert registry.manifest() == {"hello": digest}
+
+    @pytest.mark.asyncio
+    async def test_shipped_documents_are_valid(self):
+        registry = PersistedQueryRegistry.from_directory(DEFAULT_PERSISTED_QUERIES_DIR)
+        assert {"payment", "payments", "sales", "sales_stream", "health"} <= set(registry.manifest())
+
+        health = registry.get(registry.manifest()["health"])
+        result = await app_schema.execute(health)
+        assert result.data == {"health": "OK"}
+
+
+def _client(allow_list: bool) -> httpx.AsyncClient:
+    registry = PersistedQueryRegistry()
+    registry.register(HELLO)
+    app = FastAPI()
+    app.include_router(PersistedQueryRouter(_schema, registry=registry, allow_list=allow_list), prefix="/graphql")
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def _persisted(digest: str) -> dict:
+    return {"persistedQuery": {"version": 1, "sha256Hash": digest}}
+
+
+class TestPersistedQueryRouter:
+
+    @pytest.mark.asyncio
+    async def test_executes_query_sent_by_hash(self):
+        async with _client(allow_list=False) as client:
+            response = await client.post("/graphql", json={
+                "extensions": _persisted(query_hash(HELLO)),
+                "variables": {"name": "pos"},
+            })
+
+        assert response.json() == {"data": {"hello": "hello pos"}}
+
+    @pytest.mark.asyncio
+    async def test_executes_query_sent_by_hash_over_get(self):
+        async with _client(allow_list=True) as client:
+            response = await client.get("/graphql", params={
+                "extensions": json.dumps(_persisted(query_hash(HELLO))),
+            })
+
+        assert response.json() == {"data": {"hello": "hello world"}}
+
+    @pytest.mark.asyncio
+    async def test_unknown_hash_is_rejected(self):
+        async with _client(allow_list=False) as client:
+            response = await client.post("/graphql", json={"extensions": _persisted("0" * 64)})
+
+        assert response.status_code == 400
+        assert "PersistedQueryNotFound" in response.text
+
+    @pytest.mark.asyncio
+    async def test_arbitrary_queries_allowed_without_allow_list(self):
+        async with _client(allow_list=False) as client:
+            response = await client.post("/graphql", json={"query": "{ hello }"})
+
+        assert response.json() == {"data": {"hello": "hello world"}}
+
+    @pytest.mark.asyncio
+    async def test_allow_list_rejects_arbitrary_queries(self):
+        async with _client(allow_list=True) as client:
+            rejected = await client.post("/graphql", json={"query": "{ hello }"})
+            accepted = await client.post("/graphql", json={"query": HELLO})
+
+        assert rejected.status_code == 403
+        assert accepted.json() == {"data": {"hello": "hello world"}}
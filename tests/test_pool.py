@@ -0,0 +1,106 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure.persistence.pool import (
+    POOL_CHECKED_OUT,
+    POOL_CHECKOUT_WAIT,
+    POOL_LIMIT,
+    POOL_OVERFLOW,
+    AdaptivePoolController,
+    InstrumentedAsyncQueuePool,
+    prewarm_pool,
+)
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=2,
+        max_overflow=1,
+        pool_logging_name="test",
+    )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_gauges_follow_checkouts(engine):
+    labels = ("test",)
+    waits = POOL_CHECKOUT_WAIT.count(labels)
+
+    connections = [await engine.connect() for _ in range(3)]
+    for connection in connections:
+        await connection.execute(text("SELECT 1"))
+
+    assert POOL_CHECKED_OUT.value(labels) == 3
+    assert POOL_OVERFLOW.value(labels) == 1
+    assert POOL_LIMIT.value(labels) == 3
+    assert POOL_CHECKOUT_WAIT.count(labels) == waits + 3
+
+    for connection in connections:
+        await connection.close()
+    assert POOL_CHECKED_OUT.value(labels) == 0
+
+
+@pytest.mark.asyncio
+async def test_prewarm_opens_distinct_connections(engine):
+    assert await prewarm_pool(engine, 5) == 2
+    assert engine.pool.checkedin() == 2
+    assert engine.pool.checkedout() == 0
+
+
+@pytest.mark.asyncio
+async def test_set_max_overflow_changes_limit(engine):
+    engine.pool.set_max_overflow(3)
+    connections = [await engine.connect() for _ in range(5)]
+    for connection in connections:
+        await connection.execute(text("SELECT 1"))
+
+    assert POOL_LIMIT.value(("test",)) == 5
+    assert engine.pool.checkedout() == 5
+    for connection in connections:
+        await connection.close()
+
+    # Surplus connections are closed as they come back
+    engine.pool.set_max_overflow(0)
+    assert engine.pool.max_overflow == 0
+    assert engine.pool.checkedin() == 2
+
+
+def _controller(engine, **kwargs) -> AdaptivePoolController:
+    options = dict(min_overflow=1, max_overflow=9, target_wait_ms=10, max_db_latency_ms=100, step=2)
+    options.update(kwargs)
+    return AdaptivePoolController(engine, **options)
+
+
+@pytest.mark.asyncio
+async def test_controller_decisions(engine):
+    controller = _controller(engine)
+
+    # Waiting on checkouts while the database is fast: grow
+    assert controller.decide(1, 2, mean_wait=0.05, mean_latency=0.01, peak_checked_out=3) == 3
+    # Growth stops at the upper bound
+    assert controller.decide(8, 2, mean_wait=0.05, mean_latency=0.01, peak_checked_out=10) == 9
+    # The database itself is slow: shrink even though requests wait
+    assert controller.decide(7, 2, mean_wait=0.05, mean_latency=0.5, peak_checked_out=9) == 5
+    # Idle headroom: shrink, but not below the lower bound
+    assert controller.decide(5, 2, mean_wait=0.0, mean_latency=0.01, peak_checked_out=2) == 3
+    assert controller.decide(2, 2, mean_wait=0.0, mean_latency=0.01, peak_checked_out=0) == 1
+    # No wait but the headroom is in use: hold
+    assert controller.decide(5, 2, mean_wait=0.0, mean_latency=0.01, peak_checked_out=7) == 5
+
+
+@pytest.mark.asyncio
+async def test_controller_adjust_applies_to_pool(engine):
+    controller = _controller(engine)
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+    engine.pool.wait_window.observe(0.5)
+
+    assert controller.adjust() == 3
+    assert engine.pool.max_overflow == 3
+    assert engine.pool.wait_window.count == 0
@@ -0,0 +1,101 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.infrastructure.persistence.replicas import READ_SESSIONS, Replica, ReplicaRouter
+
+
+async def _create_database(path, name):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE origin (name TEXT)"))
+        await conn.execute(text("INSERT INTO origin VALUES (:name)"), {"name": name})
+    return engine
+
+
+@pytest_asyncio.fixture
+async def databases(tmp_path):
+    engines = {
+        name: await _create_database(tmp_path / f"{name}.db", name)
+        for name in ("primary", "replica0", "replica1")
+    }
+    yield engines
+    for engine in engines.values():
+        await engine.dispose()
+
+
+def _router(databases, replica_names=("replica0", "replica1"), **kwargs) -> ReplicaRouter:
+    return ReplicaRouter(
+        async_sessionmaker(databases["primary"], class_=AsyncSession, expire_on_commit=False),
+        replicas=[Replica(name, databases[name]) for name in replica_names],
+        **kwargs,
+    )
+
+
+async def _read_origin(router: ReplicaRouter) -> str:
+    async with router.session() as session:
+        return await session.scalar(text("SELECT name FROM origin"))
+
+
+@pytest.mark.asyncio
+async def test_round_robin_across_replicas(databases):
+    router = _router(databases)
+
+    assert [await _read_origin(router) for _ in range(4)] == [
+        "replica0", "replica1", "replica0", "replica1",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_least_connections_prefers_idle_replica(databases):
+    router = _router(databases, strategy="least_connections")
+
+    async with router.session() as busy:
+        assert await busy.scalar(text("SELECT name FROM origin")) == "replica0"
+        assert await _read_origin(router) == "replica1"
+
+
+@pytest.mark.asyncio
+async def test_no_replicas_uses_primary(databases):
+    router = _router(databases, replica_names=())
+    before = READ_SESSIONS.value(("primary",))
+
+    assert await _read_origin(router) == "primary"
+    assert READ_SESSIONS.value(("primary",)) == before + 1
+
+
+@pytest.mark.asyncio
+async def test_stale_and_unhealthy_replicas_are_skipped(databases):
+    router = _router(databases, max_staleness_seconds=5)
+    router.replicas[0].lag_seconds = 30
+    router.replicas[1].mark_unhealthy()
+
+    assert await _read_origin(router) == "primary"
+
+    await router.check_all()
+
+    # Health checks on SQLite report no lag and recover both replicas
+    assert all(replica.healthy and replica.lag_seconds == 0 for replica in router.replicas)
+    assert {await _read_origin(router) for _ in range(2)} == {"replica0", "replica1"}
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back_to_primary(databases, tmp_path):
+    unreachable = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")
+    router = ReplicaRouter(
+        async_sessionmaker(databases["primary"], class_=AsyncSession, expire_on_commit=False),
+        replicas=[Replica("down", unreachable)],
+    )
+
+    assert await _read_origin(router) == "primary"
+    assert router.replicas[0].healthy is False
+
+    await router.check(router.replicas[0])
+    assert router.replicas[0].healthy is False
+    await unreachable.dispose()
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        ReplicaRouter(None, strategy="random")
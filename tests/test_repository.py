@@ -4,48 +4,27 @@ from uuid import uuid4
 
 import pytest
 import pytest_asyncio
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.entities.transaction import Transaction
 from app.domain.value_objects.money import Money
 from app.domain.value_objects.payment_method import PaymentMethod
 from app.domain.value_objects.additional_item import AdditionalItem, CourierService
+from app.infrastructure.persistence.models import HourlySalesRollupModel, TransactionModel
 from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
     SqlAlchemyTransactionRepository,
 )
+from tests.conftest import create_transaction
 
 @pytest_asyncio.fixture
 async def repository(async_session: AsyncSession):
     return SqlAlchemyTransactionRepository(async_session)
 
 
-def _create_transaction(
-    customer_id: str = "customer123",
-    price: str = "100.00",
-    price_modifier: str = "0.95",
-    payment_method: PaymentMethod = PaymentMethod.CASH,
-    transaction_datetime: datetime = None,
-    final_price: str = "95.00",
-    points: int = 5,
-    additional_item: AdditionalItem = None,
-) -> Transaction:
-    if transaction_datetime is None:
-        transaction_datetime = datetime(2024, 1, 15, 10, 30, 0, tzinfo=timezone.utc)
-    
-    return Transaction(
-        customer_id=customer_id,
-        price=Money.from_string(price),
-        price_modifier=Decimal(price_modifier),
-        payment_method=payment_method,
-        transaction_datetime=transaction_datetime,
-        final_price=Money.from_string(final_price),
-        points=points,
-        additional_item=additional_item,
-    )
-
 @pytest.mark.asyncio
 async def test_save_transaction(repository, async_session):
-    transaction = _create_transaction()
+    transaction = create_transaction()
 
     saved = await repository.save(transaction)
 
@@ -55,7 +34,7 @@ async def test_save_transaction(repository, async_session):
 @pytest.mark.asyncio
 async def test_save_transaction_with_additional_item(repository, async_session):
     additional_item = AdditionalItem(last4="1234")
-    transaction = _create_transaction(
+    transaction = create_transaction(
         payment_method=PaymentMethod.VISA,
         additional_item=additional_item,
     )
@@ -65,12 +44,25 @@ async def test_save_transaction_with_additional_item(repository, async_session):
     assert saved.additional_item is not None
     assert saved.additional_item.last4 == "1234"
 
+@pytest.mark.asyncio
+async def test_save_bypasses_the_unit_of_work(repository, async_session):
+    transaction = create_transaction(additional_item=AdditionalItem(last4="1234"))
+
+    await repository.save(transaction)
+
+    assert len(async_session.identity_map) == 0
+    model = (await async_session.execute(
+        select(TransactionModel).where(TransactionModel.id == transaction.id)
+    )).scalar_one()
+    assert model.final_price_cents == 9500
+    assert (model.last4, model.courier) == ("1234", None)
+
 @pytest.mark.asyncio
 async def test_save_multiple_transactions(repository, async_session):
     transactions = [
-        _create_transaction(customer_id="customer1"),
-        _create_transaction(customer_id="customer2"),
-        _create_transaction(customer_id="customer3"),
+        create_transaction(customer_id="customer1"),
+        create_transaction(customer_id="customer2"),
+        create_transaction(customer_id="customer3"),
     ]
 
     for t in transactions:
@@ -78,18 +70,44 @@ async def test_save_multiple_transactions(repository, async_session):
 
     await async_session.commit()
 
+@pytest.mark.asyncio
+async def test_save_many_transactions(repository, async_session):
+    transactions = [
+        create_transaction(customer_id="c1", final_price="100.00", points=5),
+        create_transaction(customer_id="c2", final_price="200.00", points=10),
+        create_transaction(customer_id="c3", final_price="300.00", points=15),
+    ]
+
+    saved = await repository.save_many(transactions)
+    await async_session.commit()
+
+    assert saved == transactions
+
+    result = await repository.get_hourly_sales(
+        start_datetime=datetime(2024, 1, 15, 0, 0, 0, tzinfo=timezone.utc),
+        end_datetime=datetime(2024, 1, 15, 23, 59, 59, tzinfo=timezone.utc),
+    )
+
+    assert len(result) == 1
+    assert result[0]["sales"] == Decimal("600.00")
+    assert result[0]["points"] == 30
+
+@pytest.mark.asyncio
+async def test_save_many_empty_batch(repository, async_session):
+    assert await repository.save_many([]) == []
+
 @pytest.mark.asyncio
 async def test_get_hourly_sales_single_hour(repository, async_session):
     """Test getting hourly sales for a single hour"""
     # Create transactions in the same hour
-    t1 = _create_transaction(
+    t1 = create_transaction(
         customer_id="c1",
         price="100.00",
         final_price="95.00",
         points=5,
         transaction_datetime=datetime(2024, 1, 15, 10, 15, 0, tzinfo=timezone.utc),
     )
-    t2 = _create_transaction(
+    t2 = create_transaction(
         customer_id="c2",
         price="200.00",
         final_price="190.00",
@@ -113,19 +131,19 @@ async def test_get_hourly_sales_single_hour(repository, async_session):
 @pytest.mark.asyncio
 async def test_get_hourly_sales_multiple_hours(repository, async_session):
     # Create transactions in different hours
-    t1 = _create_transaction(
+    t1 = create_transaction(
         customer_id="c1",
         final_price="100.00",
         points=5,
         transaction_datetime=datetime(2024, 1, 15, 10, 0, 0, tzinfo=timezone.utc),
     )
-    t2 = _create_transaction(
+    t2 = create_transaction(
         customer_id="c2",
         final_price="200.00",
         points=10,
         transaction_datetime=datetime(2024, 1, 15, 11, 0, 0, tzinfo=timezone.utc),
     )
-    t3 = _create_transaction(
+    t3 = create_transaction(
         customer_id="c3",
         final_price="300.00",
         points=15,
@@ -147,7 +165,7 @@ async def test_get_hourly_sales_multiple_hours(repository, async_session):
 @pytest.mark.asyncio
 async def test_get_hourly_sales_empty_range(repository, async_session):
     # Create a transaction outside the query range
-    t = _create_transaction(
+    t = create_transaction(
         transaction_datetime=datetime(2024, 1, 10, 10, 0, 0, tzinfo=timezone.utc),
     )
     await repository.save(t)
@@ -163,17 +181,17 @@ async def test_get_hourly_sales_empty_range(repository, async_session):
 @pytest.mark.asyncio
 async def test_get_hourly_sales_filters_by_date_range(repository, async_session):
     # Create transactions: 2 in range, 1 outside
-    t1 = _create_transaction(
+    t1 = create_transaction(
         customer_id="c1",
         final_price="100.00",
         transaction_datetime=datetime(2024, 1, 14, 10, 0, 0, tzinfo=timezone.utc),
     )
-    t2 = _create_transaction(
+    t2 = create_transaction(
         customer_id="c2",
         final_price="200.00",
         transaction_datetime=datetime(2024, 1, 15, 10, 0, 0, tzinfo=timezone.utc),
     )
-    t3 = _create_transaction(
+    t3 = create_transaction(
         customer_id="c3",
         final_price="300.00",
         transaction_datetime=datetime(2024, 1, 16, 10, 0, 0, tzinfo=timezone.utc),
@@ -196,17 +214,17 @@ async def test_get_hourly_sales_filters_by_date_range(repository, async_session)
 @pytest.mark.asyncio
 async def test_get_hourly_sales_ordered_by_hour(repository, async_session):
     # Create transactions in reverse order
-    t1 = _create_transaction(
+    t1 = create_transaction(
         customer_id="c1",
         final_price="100.00",
         transaction_datetime=datetime(2024, 1, 15, 14, 0, 0, tzinfo=timezone.utc),
     )
-    t2 = _create_transaction(
+    t2 = create_transaction(
         customer_id="c2",
         final_price="200.00",
         transaction_datetime=datetime(2024, 1, 15, 10, 0, 0, tzinfo=timezone.utc),
     )
-    t3 = _create_transaction(
+    t3 = create_transaction(
         customer_id="c3",
         final_price="300.00",
         transaction_datetime=datetime(2024, 1, 15, 12, 0, 0, tzinfo=timezone.utc),
@@ -234,6 +252,162 @@ async def test_get_hourly_sales_ordered_by_hour(repository, async_session):
     assert get_hour(result[2]["datetime"]) == 14
 
 
+@pytest.mark.asyncio
+async def test_save_updates_hourly_rollup(repository, async_session):
+    await repository.save(create_transaction(
+        final_price="95.00",
+        points=5,
+        transaction_datetime=datetime(2024, 1, 15, 10, 15, 0, tzinfo=timezone.utc),
+    ))
+    await repository.save_many([
+        create_transaction(
+            final_price="190.00",
+            points=10,
+            transaction_datetime=datetime(2024, 1, 15, 10, 45, 0, tzinfo=timezone.utc),
+        ),
+        create_transaction(
+            final_price="50.00",
+            points=2,
+            transaction_datetime=datetime(2024, 1, 15, 11, 5, 0, tzinfo=timezone.utc),
+        ),
+    ])
+    await async_session.commit()
+
+    rows = (await async_session.execute(
+        select(HourlySalesRollupModel).order_by(HourlySalesRollupModel.hour_bucket)
+    )).scalars().all()
+
+    assert len(rows) == 2
+    assert rows[0].sales == Decimal("285.00")
+    assert rows[0].points == 15
+    assert rows[0].transaction_count == 2
+    assert rows[1].transaction_count == 1
+
+@pytest.mark.asyncio
+async def test_get_hourly_sales_partial_edge_hours_use_raw_rows(repository, async_session):
+    for minute in (10, 40):
+        for hour in (10, 11, 12):
+            await repository.save(create_transaction(
+                final_price="10.00",
+                points=1,
+                transaction_datetime=datetime(2024, 1, 15, hour, minute, 0, tzinfo=timezone.utc),
+            ))
+    await async_session.commit()
+
+    result = await repository.get_hourly_sales(
+        start_datetime=datetime(2024, 1, 15, 10, 30, 0, tzinfo=timezone.utc),
+        end_datetime=datetime(2024, 1, 15, 12, 30, 0, tzinfo=timezone.utc),
+    )
+
+    assert [r["datetime"].hour for r in result] == [10, 11, 12]
+    assert [r["sales"] for r in result] == [Decimal("10.00"), Decimal("20.00"), Decimal("10.00")]
+
+@pytest.mark.asyncio
+async def test_get_hourly_sales_normalizes_offsets_to_utc(repository, async_session):
+    await repository.save(create_transaction(
+        final_price="10.00",
+        transaction_datetime=datetime.fromisoformat("2024-01-15T19:30:00+09:00"),
+    ))
+    await async_session.commit()
+
+    result = await repository.get_hourly_sales(
+        start_datetime=datetime(2024, 1, 15, 0, 0, 0, tzinfo=timezone.utc),
+        end_datetime=datetime(2024, 1, 15, 23, 59, 59, tzinfo=timezone.utc),
+    )
+
+    assert len(result) == 1
+    assert result[0]["datetime"] == datetime(2024, 1, 15, 10, 0, 0, tzinfo=timezone.utc)
+
+@pytest.mark.asyncio
+async def test_rebuild_hourly_sales_rollup(repository, async_session):
+    await repository.save_many([
+        create_transaction(
+            final_price="100.00",
+            points=5,
+            transaction_datetime=datetime(2024, 1, 15, 10, 15, 0, tzinfo=timezone.utc),
+        ),
+        create_transaction(
+            final_price="200.00",
+            points=10,
+            transaction_datetime=datetime(2024, 1, 15, 12, 15, 0, tzinfo=timezone.utc),
+        ),
+    ])
+    await async_session.commit()
+    expected = await repository.get_hourly_sales(
+        start_datetime=datetime(2024, 1, 15, 0, 0, 0, tzinfo=timezone.utc),
+        end_datetime=datetime(2024, 1, 15, 23, 59, 59, tzinfo=timezone.utc),
+    )
+
+    await repository.rebuild_hourly_sales_rollup()
+    await async_session.commit()
+
+    result = await repository.get_hourly_sales(
+        start_datetime=datetime(2024, 1, 15, 0, 0, 0, tzinfo=timezone.utc),
+        end_datetime=datetime(2024, 1, 15, 23, 59, 59, tzinfo=timezone.utc),
+    )
+    assert result == expected
+    assert len(result) == 2
+
+@pytest.mark.asyncio
+async def test_get_hourly_sales_limit(repository, async_session):
+    for hour in (9, 10, 11, 12):
+        await repository.save(create_transaction(
+            transaction_datetime=datetime(2024, 1, 15, hour, 30, 0, tzinfo=timezone.utc),
+        ))
+    await async_session.commit()
+
+    result = await repository.get_hourly_sales(
+        start_datetime=datetime(2024, 1, 15, 9, 45, 0, tzinfo=timezone.utc),
+        end_datetime=datetime(2024, 1, 15, 23, 59, 59, tzinfo=timezone.utc),
+        limit=2,
+    )
+
+    assert [r["datetime"].hour for r in result] == [10, 11]
+
+@pytest.mark.asyncio
+async def test_stream_hourly_sales_matches_get_hourly_sales(repository, async_session):
+    for hour in (9, 10, 11, 12):
+        await repository.save(create_transaction(
+            transaction_datetime=datetime(2024, 1, 15, hour, 30, 0, tzinfo=timezone.utc),
+        ))
+    await async_session.commit()
+    start = datetime(2024, 1, 15, 9, 0, 0, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 15, 12, 45, 0, tzinfo=timezone.utc)
+
+    streamed = [hour async for hour in repository.stream_hourly_sales(start, end, batch_size=1)]
+
+    assert streamed == await repository.get_hourly_sales(start, end)
+    assert len(streamed) == 4
+
+
+@pytest.mark.asyncio
+async def test_compact_columns_round_trip(repository, async_session):
+    transaction = create_transaction(
+        price="1234.56",
+        payment_method=PaymentMethod.CASH_ON_DELIVERY,
+        final_price="1234.56",
+        additional_item=AdditionalItem(courier=CourierService.SAGAWA),
+    )
+    await repository.save(transaction)
+
+    model = (await async_session.execute(
+        select(TransactionModel).where(TransactionModel.id == transaction.id)
+    )).scalar_one()
+    loaded = repository._to_entity(model)
+
+    assert (model.price_cents, model.payment_method_code, model.courier) == (123456, 2, "SAGAWA")
+    assert loaded.price == transaction.price
+    assert loaded.final_price.to_string() == "1234.56"
+    assert loaded.payment_method == PaymentMethod.CASH_ON_DELIVERY
+    assert loaded.additional_item == AdditionalItem(courier=CourierService.SAGAWA)
+
+
+def test_amounts_are_stored_rounded_half_up_to_the_cent(repository):
+    row = repository._to_row(create_transaction(price="10.005", final_price="7"))
+
+    assert (row["price_cents"], row["final_price_cents"]) == (1001, 700)
+
+
 @pytest.mark.asyncio
 async def test_to_model_preserves_all_fields(repository, async_session):
     transaction_id = uuid4()
@@ -260,11 +434,12 @@ async def test_to_model_preserves_all_fields(repository, async_session):
 
     assert model.id == transaction_id
     assert model.customer_id == "customer123"
-    assert model.price == Decimal("100.00")
+    assert model.price_cents == 10000
     assert model.price_modifier == Decimal("0.95")
-    assert model.payment_method == "VISA"
-    assert model.final_price == Decimal("95.00")
+    assert model.payment_method_code == 3
+    assert model.final_price_cents == 9500
     assert model.points == 3
-    assert model.additional_item is not None
-    assert model.additional_item["last4"] == "1234"
+    assert (model.last4, model.courier, model.bank, model.account_number, model.cheque_number) == (
+        "1234", "YAMATO", "Test Bank", "123456", "CHQ001"
+    )
 
@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.transaction import Transaction
+from app.domain.value_objects.money import Money
+from app.domain.value_objects.payment_method import PaymentMethod
+from app.infrastructure.cache.hourly_sales_cache import (
+    MISSING,
+    SALES_CACHE_EVENTS,
+    HourlySalesCache,
+)
+from app.infrastructure.repositories.cached_transaction_repository import (
+    CachedTransactionRepository,
+)
+from app.infrastructure.repositories.sqlalchemy_transaction_repository import (
+    SqlAlchemyTransactionRepository,
+)
+
+
+NOW = datetime(2024, 1, 15, 12, 30, 0, tzinfo=timezone.utc)
+
+
+def _hour(hour: int) -> datetime:
+    return datetime(2024, 1, 15, hour, 0, 0, tzinfo=timezone.utc)
+
+
+def _row(hour: int, sales: str = "100.00", points: int = 5) -> dict:
+    return {"datetime": _hour(hour), "sales": Decimal(sales), "points": points}
+
+
+@pytest.fixture
+def cache():
+    return HourlySalesCache(max_entries=100, grace_seconds=600, clock=lambda: NOW)
+
+
+@pytest.fixture
+def inner():
+    repository = AsyncMock()
+    repository.get_hourly_sales = AsyncMock(return_value=[_row(8), _row(10)])
+    return repository
+
+
+@pytest.fixture
+def repository(inner, cache):
+    return CachedTransactionRepository(inner, cache)
+
+
+def test_only_hours_past_grace_window_are_closed(cache):
+    assert cache.is_closed(_hour(11))
+    assert not cache.is_closed(_hour(12))
+    assert not HourlySalesCache(grace_seconds=3600, clock=lambda: NOW).is_closed(_hour(11))
+
+def test_lru_eviction(cache):
+    evictions = SALES_CACHE_EVENTS.value(("eviction",))
+    hits = SALES_CACHE_EVENTS.value(("hit",))
+    small = HourlySalesCache(max_entries=2, clock=lambda: NOW)
+    small.put(_hour(1), None)
+    small.put(_hour(2), None)
+    small.get(_hour(1))
+    small.put(_hour(3), None)
+
+    assert small.get(_hour(2)) is MISSING
+    assert small.get(_hour(1)) is None
+    assert small.stats.evictions == 1
+    assert SALES_CACHE_EVENTS.value(("eviction",)) == evictions + 1
+    assert SALES_CACHE_EVENTS.value(("hit",)) == hits + 2
+
+def test_cached_hours_expire_after_ttl():
+    now = [NOW]
+    cache = HourlySalesCache(ttl_seconds=60, clock=lambda: now[0])
+    cache.put(_hour(9), None)
+    assert cache.get(_hour(9)) is None
+
+    now[0] += timedelta(seconds=60)
+    assert cache.get(_hour(9)) is MISSING
+    assert cache.stats.expiries == 1
+    assert len(cache) == 0
+
+    cache = HourlySalesCache(ttl_seconds=0, clock=lambda: now[0])
+    cache.put(_hour(9), None)
+    now[0] += timedelta(days=30)
+    assert cache.get(_hour(9)) is None
+
+@pytest.mark.asyncio
+async def test_closed_hours_served_from_cache(repository, inner, cache):
+    first = await repository.get_hourly_sales(_hour(8), _hour(11) - timedelta(microseconds=1))
+    second = await repository.get_hourly_sales(_hour(8), _hour(11) - timedelta(microseconds=1))
+
+    assert first == second == [_row(8), _row(10)]
+    inner.get_hourly_sales.assert_called_once()
+    assert len(cache) == 3  # hour 9 cached as empty
+    assert cache.stats.hits == 3
+
+@pytest.mark.asyncio
+async def test_open_hour_is_always_recomputed(repository, inner, cache):
+    await repository.get_hourly_sales(_hour(8), NOW)
+    inner.get_hourly_sales.reset_mock()
+    inner.get_hourly_sales.return_value = [_row(12, "7.00", 1)]
+
+    result = await repository.get_hourly_sales(_hour(8), NOW)
+
+    inner.get_hourly_sales.assert_called_once_with(
+        start_datetime=_hour(12), end_datetime=NOW, limit=None
+    )
+    assert result == [_row(8), _row(10), _row(12, "7.00", 1)]
+
+@pytest.mark.asyncio
+async def test_partial_edge_hours_are_not_cached(repository, inner, cache):
+    await repository.get_hourly_sales(_hour(8) + timedelta(minutes=30), _hour(10) + timedelta(minutes=30))
+
+    assert cache.get(_hour(8)) is MISSING
+    assert cache.get(_hour(9)) is None
+    assert cache.get(_hour(10)) is MISSING
+
+def _transaction_at(hour: int) -> Transaction:
+    return Transaction(
+        customer_id="customer123",
+        price=Money.from_string("10.00"),
+        price_modifier=Decimal("1.0"),
+        payment_method=PaymentMethod.CASH,
+        transaction_datetime=_hour(hour) + timedelta(minutes=5),
+        final_price=Money.from_string("10.00"),
+        points=0,
+    )
+
+@pytest.mark.asyncio
+async def test_save_invalidates_cached_hour(repository, inner, cache):
+    await repository.get_hourly_sales(_hour(8), _hour(11) - timedelta(microseconds=1))
+    transaction = _transaction_at(9)
+
+    await repository.save(transaction)
+
+    inner.save.assert_called_once_with(transaction)
+    assert cache.get(_hour(9)) is MISSING
+    assert cache.stats.invalidations == 1
+
+@pytest.mark.asyncio
+async def test_rollup_rebuild_invalidates_every_hour(repository, inner, cache):
+    before = cache.write_token()
+    await repository.get_hourly_sales(_hour(8), _hour(11) - timedelta(microseconds=1))
+
+    await repository.rebuild_hourly_sales_rollup()
+
+    inner.rebuild_hourly_sales_rollup.assert_called_once()
+    assert len(cache) == 0
+    # Reads started before the rebuild are not cached
+    cache.put(_hour(8), _row(8), before)
+    assert cache.get(_hour(8)) is MISSING
+
+def test_reads_overlapping_a_write_are_not_cached(cache):
+    before = cache.write_token()
+    cache.begin_write({_hour(9)})
+    cache.put(_hour(9), _row(9), cache.write_token())
+    assert cache.get(_hour(9)) is MISSING
+
+    cache.end_write({_hour(9)})
+    # Read before the write committed
+    cache.put(_hour(9), _row(9), before)
+    assert cache.get(_hour(9)) is MISSING
+    # Another hour is unaffected
+    cache.put(_hour(8), _row(8), before)
+    assert cache.get(_hour(8)) == _row(8)
+
+    cache.put(_hour(9), _row(9, "110.00"), cache.write_token())
+    assert cache.get(_hour(9)) == _row(9, "110.00")
+
+@pytest.mark.asyncio
+async def test_written_hour_is_not_cached_until_commit(async_engine, cache):
+    async with AsyncSession(async_engine) as session:
+        repository = CachedTransactionRepository(SqlAlchemyTransactionRepository(session), cache, session)
+        await repository.save(_transaction_at(9))
+
+        # A concurrent report reads the pre-commit aggregate
+        cache.put(_hour(9), _row(9), cache.write_token())
+        assert cache.get(_hour(9)) is MISSING
+
+        await session.commit()
+
+    cache.put(_hour(9), _row(9, "110.00"), cache.write_token())
+    assert cache.get(_hour(9)) == _row(9, "110.00")
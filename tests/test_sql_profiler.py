@@ -0,0 +1,118 @@
+import json
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from sqlalchemy import text
+
+from app.infrastructure.monitoring.sql_profiler import (
+    QUERY_NAME_OPTION,
+    SqlProfiler,
+    current_profile,
+    explain_prefix,
+    parameter_shapes,
+    profile_queries,
+)
+from app.presentation.profiling import QueryProfileMiddleware
+
+
+class TestParameterShapes:
+
+    def test_dict_parameters_keep_only_types(self):
+        assert parameter_shapes({"last4": "1234", "price": 1.5}) == {"last4": "str", "price": "float"}
+
+    def test_positional_parameters(self):
+        assert parameter_shapes(("1234", 3)) == ["str", "int"]
+
+    def test_executemany_reports_row_count(self):
+        shapes = parameter_shapes([("a", 1), ("b", 2)], executemany=True)
+        assert shapes == {"rows": 2, "row": ["str", "int"]}
+
+
+class TestSqlProfiler:
+
+    @pytest.mark.asyncio
+    async def test_profiles_statements_in_block(self, async_engine):
+        SqlProfiler(slow_query_threshold_ms=10_000).install(async_engine.sync_engine)
+
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with profile_queries() as profile:
+                await conn.execute(text("SELECT 2"))
+                await conn.execute(text("SELECT 3"))
+
+        assert profile.statement_count == 2
+        assert profile.total_seconds >= profile.slowest_seconds > 0
+        assert profile.slowest_statement in ("SELECT 2", "SELECT 3")
+        assert current_profile() is None
+
+    @pytest.mark.asyncio
+    async def test_logs_slow_queries_with_parameter_shapes(self, async_engine, caplog):
+        SqlProfiler(slow_query_threshold_ms=0).install(async_engine.sync_engine)
+
+        with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+            async with async_engine.connect() as conn:
+                await conn.execute(
+                    text("SELECT :card").execution_options(**{QUERY_NAME_OPTION: "card"}),
+                    {"card": "4242"},
+                )
+
+        entry = json.loads(caplog.records[-1].getMessage())
+        assert entry["event"] == "slow_query"
+        assert entry["query_name"] == "card"
+        assert entry["parameters"] == ["str"]
+        assert "4242" not in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_captures_plans_of_named_queries(self, async_engine, caplog):
+        SqlProfiler(
+            slow_query_threshold_ms=10_000,
+            explain_queries=frozenset({"hourly_sales_rollup"}),
+        ).install(async_engine.sync_engine)
+
+        with caplog.at_level(logging.INFO, logger="app.sql.plan"):
+            async with async_engine.connect() as conn:
+                with profile_queries() as profile:
+                    await conn.execute(
+                        text("SELECT * FROM hourly_sales_rollup WHERE hour_bucket >= :start")
+                        .execution_options(**{QUERY_NAME_OPTION: "hourly_sales_rollup"}),
+                        {"start": "2024-01-01"},
+                    )
+                    await conn.execute(text("SELECT 1"))
+
+        plans = [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.sql.plan"]
+        assert len(plans) == 1
+        assert plans[0]["query_name"] == "hourly_sales_rollup"
+        assert plans[0]["plan"]
+        # The EXPLAIN itself is not counted against the request
+        assert profile.statement_count == 2
+
+
+def test_only_selects_are_explained_with_analyze():
+    assert explain_prefix("postgresql", "  select * from transactions") == "EXPLAIN (ANALYZE, BUFFERS) "
+    assert explain_prefix("postgresql", "INSERT INTO hourly_sales_rollup VALUES (1)") == "EXPLAIN "
+    assert explain_prefix("sqlite", "SELECT 1") == "EXPLAIN QUERY PLAN "
+    assert explain_prefix("mysql", "SELECT 1") is None
+
+
+class TestQueryProfileMiddleware:
+
+    @pytest.mark.asyncio
+    async def test_attaches_profile_and_server_timing(self, async_engine):
+        SqlProfiler(slow_query_threshold_ms=10_000).install(async_engine.sync_engine)
+        app = FastAPI()
+        app.add_middleware(QueryProfileMiddleware)
+
+        @app.get("/count")
+        async def count(request: Request):
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return {"statements": request.state.query_profile.statement_count}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/count")
+
+        assert response.json() == {"statements": 1}
+        assert 'desc="1 statements"' in response.headers["server-timing"]
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from uuid import uuid4
 
@@ -102,6 +102,19 @@ def test_hour_bucket_at_exact_hour():
     
     assert transaction.hour_bucket == datetime(2024, 1, 15, 14, 0, 0)
 
+def test_hour_bucket_normalizes_aware_datetime_to_utc():
+    transaction = Transaction(
+        customer_id="customer123",
+        price=Money.from_string("100.00"),
+        price_modifier=Decimal("1.0"),
+        payment_method=PaymentMethod.CASH,
+        transaction_datetime=datetime.fromisoformat("2024-01-15T14:15:00+05:30"),
+        final_price=Money.from_string("100.00"),
+        points=5,
+    )
+    
+    assert transaction.hour_bucket == datetime(2024, 1, 15, 8, 0, 0, tzinfo=timezone.utc)
+
 
 def test_transactions_equal_by_id():
     shared_id = uuid4()
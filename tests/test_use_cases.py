@@ -1,13 +1,19 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 import pytest_asyncio
 
-from app.application.dto.payment_dto import PaymentRequest, SalesRequest
+from app.application.dto.payment_dto import (
+    PaymentRequest,
+    SalesRequest,
+    decode_cursor,
+    encode_cursor,
+)
 from app.application.use_cases.process_payment import ProcessPaymentUseCase
 from app.application.use_cases.get_sales_report import GetSalesReportUseCase
+from app.application.use_cases.process_payments_batch import ProcessPaymentsBatchUseCase
 from app.domain.entities.transaction import Transaction
 from app.domain.exceptions import (
     ValidationException,
@@ -23,6 +29,7 @@ from app.domain.value_objects.payment_method import PaymentMethod
 def mock_repository():
     repository = AsyncMock()
     repository.save = AsyncMock(side_effect=lambda t: t)
+    repository.save_many = AsyncMock(side_effect=lambda ts: ts)
     return repository
 
 @pytest.fixture
@@ -33,6 +40,10 @@ def payment_service():
 def payment_use_case(mock_repository, payment_service):
     return ProcessPaymentUseCase(mock_repository, payment_service)
 
+@pytest.fixture
+def batch_use_case(mock_repository, payment_service):
+    return ProcessPaymentsBatchUseCase(mock_repository, payment_service)
+
 @pytest.fixture
 def sales_use_case(mock_repository):
     return GetSalesReportUseCase(mock_repository)
@@ -202,6 +213,107 @@ async def test_transaction_saved_with_correct_data(payment_use_case, mock_reposi
     assert saved_transaction.points == 5
 
 
+@pytest.mark.asyncio
+async def test_price_with_more_than_two_decimals_is_priced_in_decimal(payment_use_case, mock_repository):
+    request = PaymentRequest(
+        customer_id="customer123",
+        price="10.015",
+        price_modifier=1.0,
+        payment_method=PaymentMethod.CASH,
+        datetime="2024-01-15T10:30:00Z",
+    )
+
+    response = await payment_use_case.execute(request)
+
+    assert response.final_price == "10.02"
+    assert response.points == 0
+    assert mock_repository.save.call_args[0][0].price.amount == Decimal("10.015")
+
+
+@pytest.mark.asyncio
+async def test_process_payments_batch_saves_valid_items_in_one_call(batch_use_case, mock_repository):
+    requests = [
+        PaymentRequest(
+            customer_id="customer1",
+            price="100.00",
+            price_modifier=0.95,
+            payment_method="CASH",
+            datetime="2024-01-15T10:30:00Z",
+        ),
+        PaymentRequest(
+            customer_id="customer2",
+            price="100.00",
+            price_modifier=0.95,
+            payment_method="VISA",
+            datetime="2024-01-15T10:31:00Z",
+        ),
+        PaymentRequest(
+            customer_id="customer3",
+            price="200.00",
+            price_modifier=1.0,
+            payment_method="LINE_PAY",
+            datetime="2024-01-15T10:32:00Z",
+        ),
+    ]
+
+    results = await batch_use_case.execute(requests)
+
+    assert len(results) == 3
+    assert results[0].final_price == "95.00"
+    assert isinstance(results[1], ValidationException)
+    assert results[2].final_price == "200.00"
+    assert results[2].points == 2
+
+    mock_repository.save.assert_not_called()
+    mock_repository.save_many.assert_called_once()
+    saved = mock_repository.save_many.call_args[0][0]
+    assert [t.customer_id for t in saved] == ["customer1", "customer3"]
+
+@pytest.mark.asyncio
+async def test_process_payments_batch_reports_unsupported_method(batch_use_case, mock_repository):
+    requests = [
+        PaymentRequest(
+            customer_id="customer1",
+            price="100.00",
+            price_modifier=1.0,
+            payment_method="INVALID",
+            datetime="2024-01-15T10:30:00Z",
+        ),
+    ]
+
+    results = await batch_use_case.execute(requests)
+
+    assert isinstance(results[0], PaymentMethodNotSupportedException)
+    assert mock_repository.save_many.call_args[0][0] == []
+
+@pytest.mark.asyncio
+async def test_process_payments_batch_rejects_only_the_malformed_datetime(batch_use_case, mock_repository):
+    requests = [
+        PaymentRequest(
+            customer_id="customer1",
+            price="100.00",
+            price_modifier=1.0,
+            payment_method="CASH",
+            datetime="2024-01-15T10:30:00Z",
+        ),
+        PaymentRequest(
+            customer_id="customer2",
+            price="100.00",
+            price_modifier=1.0,
+            payment_method="CASH",
+            datetime="not-a-date",
+        ),
+    ]
+
+    results = await batch_use_case.execute(requests)
+
+    assert results[0].final_price == "100.00"
+    assert isinstance(results[1], ValidationException)
+    assert results[1].errors[0]["field"] == "datetime"
+    saved = mock_repository.save_many.call_args[0][0]
+    assert [t.customer_id for t in saved] == ["customer1"]
+
+
 @pytest.mark.asyncio
 async def test_get_sales_report_success(sales_use_case, mock_repository):
     mock_repository.get_hourly_sales.return_value = [
@@ -273,3 +385,76 @@ async def test_get_sales_report_calls_repository_with_correct_dates(
     assert end_dt.month == 1
     assert end_dt.day == 31
 
+
+
+@pytest.mark.asyncio
+async def test_get_sales_report_first_page(sales_use_case, mock_repository):
+    mock_repository.get_hourly_sales.return_value = [
+        {"datetime": datetime(2024, 1, 15, hour, 0, 0), "sales": Decimal("10.00"), "points": 1}
+        for hour in (10, 11, 12)
+    ]
+
+    request = SalesRequest(
+        start_datetime="2024-01-15T00:00:00Z",
+        end_datetime="2024-01-15T23:59:59Z",
+        first=2,
+    )
+
+    response = await sales_use_case.execute(request)
+
+    assert mock_repository.get_hourly_sales.call_args.kwargs["limit"] == 3
+    assert [hour.datetime for hour in response.sales] == [
+        "2024-01-15T10:00:00Z",
+        "2024-01-15T11:00:00Z",
+    ]
+    assert response.has_next_page is True
+    assert decode_cursor(response.end_cursor) == datetime(2024, 1, 15, 11, 0, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_get_sales_report_after_cursor_moves_start(sales_use_case, mock_repository):
+    mock_repository.get_hourly_sales.return_value = []
+
+    request = SalesRequest(
+        start_datetime="2024-01-15T00:00:00Z",
+        end_datetime="2024-01-15T23:59:59Z",
+        first=2,
+        after=encode_cursor("2024-01-15T11:00:00Z"),
+    )
+
+    response = await sales_use_case.execute(request)
+
+    start_dt = mock_repository.get_hourly_sales.call_args.kwargs["start_datetime"]
+    assert start_dt == datetime(2024, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
+    assert response.has_next_page is False
+    assert response.end_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_get_sales_report_invalid_cursor(sales_use_case):
+    request = SalesRequest(
+        start_datetime="2024-01-15T00:00:00Z",
+        end_datetime="2024-01-15T23:59:59Z",
+        after="not-a-cursor",
+    )
+
+    with pytest.raises(ValueError):
+        await sales_use_case.execute(request)
+
+
+@pytest.mark.asyncio
+async def test_stream_sales_report(sales_use_case, mock_repository):
+    async def stream(start_datetime, end_datetime):
+        for hour in (10, 11):
+            yield {"datetime": datetime(2024, 1, 15, hour, 0, 0), "sales": Decimal("10.00"), "points": 1}
+
+    mock_repository.stream_hourly_sales = stream
+
+    request = SalesRequest(
+        start_datetime="2024-01-15T00:00:00Z",
+        end_datetime="2024-01-15T23:59:59Z",
+    )
+
+    hours = [hour async for hour in sales_use_case.stream(request)]
+
+    assert [hour.datetime for hour in hours] == ["2024-01-15T10:00:00Z", "2024-01-15T11:00:00Z"]
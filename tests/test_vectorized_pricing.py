@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st
+
+from app.domain.services.payment_service import PaymentService
+from app.domain.services.vectorized_pricing import (
+    MODIFIER_SCALE,
+    price_batch,
+    to_modifier_units,
+)
+from app.domain.value_objects.money import Money
+from app.domain.value_objects.payment_method import (
+    PAYMENT_METHOD_CODES,
+    PAYMENT_METHODS_BY_CODE,
+    get_payment_config,
+)
+
+
+rows = st.lists(
+    st.tuples(
+        st.integers(min_value=0, max_value=10**12),
+        st.integers(min_value=0, max_value=2 * MODIFIER_SCALE),
+        st.sampled_from(sorted(PAYMENT_METHODS_BY_CODE)),
+    ),
+    min_size=1,
+    max_size=50,
+)
+
+
+@given(rows=rows)
+def test_matches_scalar_payment_service(rows):
+    prices, modifiers, codes = (np.array(column, dtype=np.int64) for column in zip(*rows))
+    result = price_batch(prices, modifiers, codes)
+    service = PaymentService()
+
+    for i, (cents, units, code) in enumerate(rows):
+        method = PAYMENT_METHODS_BY_CODE[code]
+        price = Money.from_string(f"{cents // 100}.{cents % 100:02d}")
+        modifier = Decimal(units) / MODIFIER_SCALE
+
+        final_price = service.calculate_final_price(price, modifier)
+        assert Decimal(int(result.final_price_cents[i])).scaleb(-2) == final_price.amount
+        assert result.points[i] == service.calculate_points(price, method)
+        assert result.invalid_modifier[i] == (not get_payment_config(method).is_valid_price_modifier(modifier))
+
+
+def test_out_of_range_modifiers_are_masked():
+    codes = [PAYMENT_METHOD_CODES[m] for m in PAYMENT_METHOD_CODES][:2]
+    result = price_batch(
+        np.array([10000, 10000]),
+        to_modifier_units([Decimal("0.5"), Decimal("1.01")]),
+        np.array(codes),
+    )
+
+    # CASH allows 0.9-1.0, CASH_ON_DELIVERY allows 1.0-1.02
+    assert result.invalid_modifier.tolist() == [True, False]
+    assert result.final_price_cents.tolist() == [5000, 10100]
+
+
+def test_empty_batch():
+    result = price_batch(np.array([]), np.array([]), np.array([]))
+    assert result.final_price_cents.size == 0
+
+
+def test_unknown_method_code_raises():
+    with pytest.raises(ValueError):
+        price_batch(np.array([100]), np.array([MODIFIER_SCALE]), np.array([99]))
+
+
+def test_modifier_finer_than_scale_raises():
+    with pytest.raises(ValueError):
+        to_modifier_units([Decimal("0.123456789")])
+
+
+def test_overflow_is_refused():
+    with pytest.raises(ValueError):
+        price_batch(np.array([2**61]), np.array([MODIFIER_SCALE]), np.array([1]))